@@ -1,13 +1,17 @@
 import logging
 import os
+import time
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 
-from flask import Flask, request, session
+from flask import Flask, g, request, session
 from flask_babel import Babel
 
 from config import Config
-from .routes import weather_bp
+from .routes import weather_bp, api_bp, metrics_bp
+from .services.metrics import REQUEST_SECONDS
+from .services.prefetch_service import get_prefetch_scheduler
+from .services.profiling import PROFILED_ENDPOINTS, RequestProfile, profiling_requested, profiling_sampled
 
 
 def create_app():
@@ -50,5 +54,62 @@ def create_app():
     Babel(app, locale_selector=get_locale)
 
     app.register_blueprint(weather_bp)
+    app.register_blueprint(api_bp)
+    if app.config['METRICS_ENABLED']:
+        app.register_blueprint(metrics_bp)
+
+        @app.before_request
+        def start_request_timer():
+            g.request_started = time.perf_counter()
+
+        @app.after_request
+        def observe_request_time(response):
+            # Для потоковых ответов это время до первого байта, а не до конца потока
+            started = g.pop('request_started', None)
+            if started is not None:
+                route = request.url_rule.rule if request.url_rule else 'unmatched'
+                REQUEST_SECONDS.observe(time.perf_counter() - started, route, str(response.status_code))
+            return response
+
+    # Профиль запроса /weather по заголовку X-Profile или ?profile=1, либо случайной доле таких запросов
+    if app.config['PROFILING_ENABLED'] or app.debug or app.config['PROFILING_SAMPLE_RATE'] > 0:
+        @app.before_request
+        def start_request_profile():
+            if request.endpoint not in PROFILED_ENDPOINTS:
+                return
+            requested = profiling_requested(app, request)
+            if requested or profiling_sampled(app):
+                g.request_profile = RequestProfile(sampled=not requested)
+                g.request_profile.start()
+
+        @app.after_request
+        def write_request_profile(response):
+            profile = g.pop('request_profile', None)
+            if profile is None:
+                return response
+            duration = profile.stop()
+            try:
+                path = profile.write(app.config['PROFILING_DIR'], request.method, request.full_path.rstrip('?'),
+                                     response.status_code, duration, keep=app.config['PROFILING_MAX_FILES'])
+                app.logger.info(f"Request profile written to {path}")
+            except OSError as e:
+                app.logger.warning(f"Unable to write request profile {profile.id}: {str(e)}")
+            response.headers['X-Profile-Id'] = profile.id
+            return response
+
+        @app.teardown_request
+        def discard_request_profile(exc):
+            # after_request не вызывается при необработанном исключении
+            profile = g.pop('request_profile', None)
+            if profile is not None:
+                profile.stop()
+
+    # Фоновое обновление кэша для самых запрашиваемых городов. Поток запускается с первым запросом:
+    # к этому моменту TESTING уже выставлен, и CLI с тестами фоновых потоков не получают
+    if app.config['PREFETCH_ENABLED']:
+        @app.before_request
+        def start_prefetch():
+            if not app.testing:
+                get_prefetch_scheduler().start()
 
     return app
@@ -1,2 +1,3 @@
 from .geocoding_model import *
 from .openweather_model import *
+from .forecast_columns import *
@@ -0,0 +1,156 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+
+def precipitation_rate(precipitation: Any) -> float:
+    """Precipitation in mm/h: the 1h value, or the 3h forecast value spread over three hours.
+
+    ``precipitation`` is a raw ``rain``/``snow`` dict or a parsed ``Rain``/``Snow`` model.
+    """
+    if not precipitation:
+        return np.nan
+    if isinstance(precipitation, dict):
+        one_h, three_h = precipitation.get('1h'), precipitation.get('3h')
+    else:
+        one_h, three_h = precipitation.one_h, precipitation.three_h
+    if one_h:
+        return one_h
+    if three_h:
+        return three_h / 3
+    return np.nan
+
+
+class HourlyForecast:
+    """Column-oriented /forecast response.
+
+    Built straight from the raw JSON without creating a pydantic model per
+    slot. Numeric columns are NumPy arrays and are returned as is, without
+    copying; formatted times are computed once. Iterating or indexing yields
+    lightweight ``ForecastRow`` views for templates.
+    """
+
+    __slots__ = ('dt', 'pretty_dt', 'temp', 'feels_like', 'humidity', 'pressure', 'wind_speed',
+                 'rain', 'snow', 'visibility', 'description', 'icon', 'city_name')
+
+    def __init__(self, dt: np.ndarray, pretty_dt: List[Optional[str]], temp: np.ndarray, feels_like: np.ndarray,
+                 humidity: np.ndarray, pressure: np.ndarray, wind_speed: np.ndarray, rain: np.ndarray,
+                 snow: np.ndarray, visibility: np.ndarray, description: List[str], icon: List[str],
+                 city_name: Optional[str] = None):
+        self.dt = dt
+        self.pretty_dt = pretty_dt
+        self.temp = temp
+        self.feels_like = feels_like
+        self.humidity = humidity
+        self.pressure = pressure
+        self.wind_speed = wind_speed
+        self.rain = rain
+        self.snow = snow
+        self.visibility = visibility
+        self.description = description
+        self.icon = icon
+        self.city_name = city_name
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any]) -> 'HourlyForecast':
+        """Build columns from a decoded /forecast payload; raises ValueError on malformed data"""
+        try:
+            entries = data.get('list') or []
+            n = len(entries)
+            dt = np.fromiter((entry.get('dt') or 0 for entry in entries), dtype=np.int64, count=n)
+            main = [entry['main'] for entry in entries]
+            weather = [(entry.get('weather') or [{}])[0] for entry in entries]
+            return cls(
+                dt=dt,
+                pretty_dt=[datetime.fromtimestamp(ts).strftime('%d.%m %H:%M') if ts else None for ts in dt.tolist()],
+                temp=np.fromiter((m['temp'] for m in main), dtype=np.float64, count=n),
+                feels_like=np.fromiter((m['feels_like'] for m in main), dtype=np.float64, count=n),
+                humidity=np.fromiter((m['humidity'] for m in main), dtype=np.int16, count=n),
+                pressure=np.fromiter((m['pressure'] for m in main), dtype=np.int32, count=n),
+                wind_speed=np.fromiter((entry['wind']['speed'] for entry in entries), dtype=np.float64, count=n),
+                rain=np.fromiter((precipitation_rate(entry.get('rain')) for entry in entries), dtype=np.float64, count=n),
+                snow=np.fromiter((precipitation_rate(entry.get('snow')) for entry in entries), dtype=np.float64, count=n),
+                visibility=np.fromiter((entry.get('visibility') or np.nan for entry in entries), dtype=np.float64, count=n),
+                description=[w.get('description', '') for w in weather],
+                icon=[w.get('icon', '') for w in weather],
+                city_name=(data.get('city') or {}).get('name')
+            )
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            raise ValueError(f"Malformed forecast payload: {e!r}")
+
+    @classmethod
+    def from_json(cls, raw: bytes | str) -> 'HourlyForecast':
+        """Build columns from the raw /forecast response body in a single decode"""
+        try:
+            data = json.loads(raw)
+        except ValueError as e:
+            raise ValueError(f"Malformed forecast payload: {e!r}")
+        if not isinstance(data, dict):
+            raise ValueError(f"Malformed forecast payload: {type(data).__name__}")
+        return cls.from_payload(data)
+
+    def __len__(self) -> int:
+        return len(self.dt)
+
+    def __getitem__(self, index: int) -> 'ForecastRow':
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return ForecastRow(self, index)
+
+    def __iter__(self) -> Iterator['ForecastRow']:
+        for index in range(len(self)):
+            yield ForecastRow(self, index)
+
+
+class ForecastRow:
+    """Lazy view of one forecast slot; values are read from the columns on access"""
+
+    __slots__ = ('_forecast', '_index')
+
+    def __init__(self, forecast: HourlyForecast, index: int):
+        self._forecast = forecast
+        self._index = index
+
+    @property
+    def dt(self) -> int:
+        return int(self._forecast.dt[self._index])
+
+    @property
+    def pretty_dt(self) -> Optional[str]:
+        return self._forecast.pretty_dt[self._index]
+
+    @property
+    def temp(self) -> float:
+        return float(self._forecast.temp[self._index])
+
+    @property
+    def rounded_temp(self) -> int:
+        return int(round(self.temp))
+
+    @property
+    def feels_like(self) -> float:
+        return float(self._forecast.feels_like[self._index])
+
+    @property
+    def humidity(self) -> int:
+        return int(self._forecast.humidity[self._index])
+
+    @property
+    def pressure(self) -> int:
+        return int(self._forecast.pressure[self._index])
+
+    @property
+    def wind_speed(self) -> float:
+        return float(self._forecast.wind_speed[self._index])
+
+    @property
+    def description(self) -> str:
+        return self._forecast.description[self._index]
+
+    @property
+    def icon(self) -> str:
+        return self._forecast.icon[self._index]
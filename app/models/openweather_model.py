@@ -1,8 +1,11 @@
 from datetime import datetime, timedelta
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 
+from .forecast_columns import HourlyForecast
+from .geocoding_model import GeocodingResponse
+
 class Coord(BaseModel):
     lon: float
     lat: float
@@ -37,9 +40,11 @@ class Clouds(BaseModel):
 
 class Rain(BaseModel):
     one_h: Optional[float] = Field(None, alias='1h')
+    three_h: Optional[float] = Field(None, alias='3h')  # в прогнозе осадки за 3 часа
 
 class Snow(BaseModel):
     one_h: Optional[float] = Field(None, alias='1h')
+    three_h: Optional[float] = Field(None, alias='3h')
 
 class OpenWeatherResponse(BaseModel):
     coord: Optional[Coord] = None
@@ -80,3 +85,10 @@ class OpenWeatherHourlyResponse(BaseModel):
     cnt: Optional[int] = None
     list: Optional[List[OpenWeatherResponse]] = None
     city: Optional[City] = None
+
+class WeatherBundle(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    location: GeocodingResponse
+    current: OpenWeatherResponse
+    hourly: HourlyForecast
@@ -1 +1,3 @@
-from .weather_routes import weather_bp
\ No newline at end of file
+from .weather_routes import weather_bp
+from .api_routes import api_bp
+from .metrics_routes import metrics_bp
@@ -0,0 +1,237 @@
+import hashlib
+import math
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import List, Optional
+
+from flask import Blueprint, Response, current_app, jsonify, request, copy_current_request_context
+from flask_babel import gettext as _, get_locale
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from ..models import WeatherBundle
+from ..services.batch_service import ResultWriter, RouteBatchJob, get_batch_pool, read_routes
+from ..services.geocoding_service import GeocodingAPICityNotFound
+from ..services.prefetch_service import get_prefetch_scheduler
+from ..services.route_corridor_service import RouteCorridorService
+from ..services.weather_analyzer_service import WeatherAnalyzerService, WeatherWarning, ForecastAnalysis
+from ..services.weather_service import WeatherService
+
+API_VERSION = 'v1'
+
+api_bp = Blueprint('api', __name__, url_prefix=f'/api/{API_VERSION}')
+
+
+@api_bp.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    """Bodies over ``MAX_CONTENT_LENGTH`` are refused before they are read"""
+    return jsonify(error=_("Request body too large")), 413
+
+
+def _requested_cities() -> List[str]:
+    """Cities from ``?cities=A,B`` or repeated ``?cities=`` parameters, in request order"""
+    cities = []
+    for value in request.args.getlist('cities'):
+        cities.extend(city.strip() for city in value.split(',') if city.strip())
+    return cities
+
+
+def _fetch_bundles(weather_service: WeatherService, cities: List[str], lang: str) -> List[WeatherBundle]:
+    max_workers = min(current_app.config['WEATHER_MAX_WORKERS'], len(cities))
+    if max_workers <= 1:
+        return [weather_service.get_weather_bundle_by_city(city, lang) for city in cities]
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='api-weather') as executor:
+        fetch = copy_current_request_context(weather_service.get_weather_bundle_by_city)
+        futures = [executor.submit(fetch, city, lang) for city in cities]
+        return [future.result() for future in futures]
+
+
+def _etag(cities: List[str], bundles: List[WeatherBundle], lang: str) -> str:
+    """Strong validator built from what the response is derived from.
+
+    A current observation is immutable for a given ``dt``; the forecast has no
+    issue time, so its slot times and the columns the body reports are hashed
+    as raw bytes. No JSON is built to compute the tag.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{API_VERSION}|{lang}'.encode('utf-8'))
+    for city, bundle in zip(cities, bundles):
+        hourly = bundle.hourly
+        digest.update(f'|{city}|{bundle.location.lat}|{bundle.location.lon}|{bundle.current.dt}|'.encode('utf-8'))
+        for column in (hourly.dt, hourly.temp, hourly.wind_speed, hourly.rain, hourly.snow, hourly.visibility):
+            digest.update(column.tobytes())
+    return digest.hexdigest()
+
+
+def _warning_json(warning: WeatherWarning | ForecastAnalysis) -> dict:
+    return {
+        'severity': warning.severity.name.lower(),
+        'conditions': warning.conditions,
+        'description': warning.description,
+    }
+
+
+def _city_json(city: str, bundle: WeatherBundle, analyzer: WeatherAnalyzerService) -> dict:
+    current = bundle.current
+    hourly = bundle.hourly
+    forecast_warning = analyzer.analyze_forecast(hourly)
+    worst_window = forecast_warning.worst_window
+
+    forecast_json = _warning_json(forecast_warning)
+    forecast_json['worst_window'] = {
+        'start_dt': worst_window.start_dt,
+        'end_dt': worst_window.end_dt,
+        'severity': worst_window.severity.name.lower(),
+        'conditions': worst_window.conditions,
+    } if worst_window else None
+
+    return {
+        'query': city,
+        'location': bundle.location.model_dump(include={'name', 'lat', 'lon', 'country', 'state'}),
+        'current': {
+            'dt': current.dt,
+            'temp': current.main.temp,
+            'feels_like': current.main.feels_like,
+            'humidity': current.main.humidity,
+            'pressure': current.main.pressure,
+            'wind_speed': current.wind.speed,
+            'description': current.weather[0].description if current.weather else None,
+        },
+        'warning': _warning_json(analyzer.analyze_weather(current)),
+        'forecast_warning': forecast_json,
+        'forecast': {
+            'dt': hourly.dt.tolist(),
+            'temp': hourly.temp.round(1).tolist(),
+            'wind_speed': hourly.wind_speed.round(1).tolist(),
+            'severity': forecast_warning.timeline,
+        },
+    }
+
+
+def _cache_control(fresh_for: Optional[float]) -> str:
+    if not fresh_for:
+        return 'no-cache'
+    return f"public, max-age={int(math.floor(fresh_for))}, stale-while-revalidate={current_app.config['WEATHER_CACHE_STALE_TTL']}"
+
+
+@api_bp.route('/route-weather', methods=['GET'])
+def route_weather():
+    """Current conditions, warnings and forecast series for the cities of a route.
+
+    Responses carry a strong ETag and a ``Cache-Control`` lifetime bounded by
+    the freshest-to-expire cached upstream response; ``If-None-Match`` with the
+    current tag is answered with 304 before any analysis or serialization.
+    """
+    cities = _requested_cities()
+    if not cities:
+        return jsonify(error=_("No cities given")), 400
+    if len(cities) > current_app.config['API_MAX_CITIES']:
+        return jsonify(error=_("Too many cities")), 400
+
+    lang = str(get_locale())
+    get_prefetch_scheduler().record(cities, lang)
+    weather_service = WeatherService()
+    try:
+        bundles = _fetch_bundles(weather_service, cities, lang)
+    except GeocodingAPICityNotFound as e:
+        return jsonify(error=str(e)), 404
+    except Exception as e:
+        current_app.logger.error(f"Error in route weather API: {e}")
+        return jsonify(error=_("Unable to fetch weather data")), 502
+
+    etag = _etag(cities, bundles, lang)
+    cache_control = _cache_control(min(weather_service.get_bundle_fresh_for(bundle, lang) for bundle in bundles))
+
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        analyzer = WeatherAnalyzerService()
+        response = jsonify(
+            version=API_VERSION,
+            lang=lang,
+            cities=[_city_json(city, bundle, analyzer) for city, bundle in zip(cities, bundles)]
+        )
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    if not request.args.get('lang'):
+        # Without ?lang= the locale comes from the session cookie or Accept-Language
+        response.vary.update(('Accept-Language', 'Cookie'))
+    return response
+
+
+@api_bp.route('/route-corridor', methods=['GET'])
+def route_corridor():
+    """Weather at grid-snapped waypoints along the great-circle path from ``start`` to ``end``"""
+    start = request.args.get('start', '').strip()
+    end = request.args.get('end', '').strip()
+    if not start or not end:
+        return jsonify(error=_("No cities given")), 400
+    spacing_km = request.args.get('spacing_km', type=float)
+    if spacing_km is not None and not (math.isfinite(spacing_km) and spacing_km > 0):
+        return jsonify(error=_("Invalid spacing")), 400
+
+    try:
+        corridor = RouteCorridorService().get_corridor_weather(start, end, str(get_locale()), spacing_km)
+    except GeocodingAPICityNotFound as e:
+        return jsonify(error=str(e)), 404
+    except Exception as e:
+        current_app.logger.error(f"Error in route corridor API: {e}")
+        return jsonify(error=_("Unable to fetch weather data")), 502
+
+    analysis = corridor.analysis
+    analysis_json = _warning_json(analysis)
+    window = analysis.worst_window
+    analysis_json['worst_segment'] = {
+        'from_km': round(corridor.points[window.start].distance_km, 1),
+        'to_km': round(corridor.points[window.end].distance_km, 1),
+        'conditions': window.conditions,
+    } if window else None
+
+    return jsonify(
+        version=API_VERSION,
+        start=corridor.start.model_dump(include={'name', 'lat', 'lon', 'country'}),
+        end=corridor.end.model_dump(include={'name', 'lat', 'lon', 'country'}),
+        distance_km=round(corridor.distance_km, 1),
+        points=[
+            {
+                'lat': point.lat,
+                'lon': point.lon,
+                'distance_km': round(point.distance_km, 1),
+                'temp': weather.main.temp,
+                'wind_speed': weather.wind.speed,
+                'description': weather.weather[0].description if weather.weather else None,
+                'severity': severity,
+            }
+            for point, weather, severity in zip(corridor.points, corridor.weather, analysis.timeline)
+        ],
+        skipped_points=corridor.skipped,
+        analysis=analysis_json
+    )
+
+
+@api_bp.route('/batch-routes', methods=['POST'])
+def batch_routes():
+    """Evaluate a CSV body of ``start,end`` routes, streaming results as JSONL (default) or CSV.
+
+    Results are sent chunk by chunk as the process pool finishes them; for
+    files larger than ``BATCH_API_MAX_ROUTES`` use ``batch_routes.py``.
+    """
+    fmt = request.args.get('format', 'jsonl')
+    if fmt not in ('jsonl', 'csv'):
+        return jsonify(error=_("Unknown format")), 400
+    max_routes = current_app.config['BATCH_API_MAX_ROUTES']
+    routes = list(islice(read_routes(request.get_data(as_text=True).splitlines()), max_routes + 1))
+    if not routes:
+        return jsonify(error=_("No routes given")), 400
+    if len(routes) > max_routes:
+        return jsonify(error=_("Too many routes")), 400
+
+    job = RouteBatchJob(lang=str(get_locale()), pool=get_batch_pool())
+    writer = ResultWriter(None, fmt)
+
+    def generate():
+        for results in job.evaluate(routes):
+            yield writer.encode(results)
+
+    mimetype = 'application/x-ndjson' if fmt == 'jsonl' else 'text/csv'
+    return Response(generate(), mimetype=mimetype)
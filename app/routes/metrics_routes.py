@@ -0,0 +1,13 @@
+from flask import Blueprint, Response, current_app, request
+
+from ..services.metrics import CONTENT_TYPE, authorized, registry
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics')
+def metrics():
+    """Stage timings, upstream and cache counters in the Prometheus text format"""
+    if not authorized(request.headers.get('Authorization'), current_app.config['METRICS_TOKEN']):
+        return Response(status=401, headers={'WWW-Authenticate': 'Bearer'})
+    return Response(registry.render(), content_type=CONTENT_TYPE)
@@ -1,11 +1,186 @@
-from flask import Blueprint, render_template, current_app, request, jsonify
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from flask import (Blueprint, Response, render_template, current_app, request, jsonify, copy_current_request_context,
+                   stream_with_context)
 from flask_babel import gettext as _, get_locale
-from ..services.plot_service import create_weather_plot_temp, create_weather_plot_wind
+from ..services.plot_service import (create_weather_plots, create_weather_plot_series, PLOT_MODE_JSON, PLOT_MODE_PNG,
+                                     PLOT_MODES)
+from ..services.metrics import timed
+from ..services.prefetch_service import get_prefetch_scheduler
+from ..services.profiling import current_profile
 from ..services.weather_analyzer_service import WeatherAnalyzerService
 from ..services.weather_service import WeatherService
 
 weather_bp = Blueprint('weather', __name__)
 
+
+def _build_city_weather(weather_service: WeatherService, analyzer: WeatherAnalyzerService, city: str, lang: str) -> dict:
+    """Fetch and analyze weather for a single city"""
+    # Get weather data for the city
+    bundle = weather_service.get_weather_bundle_by_city(city, lang)
+    weather_data = bundle.current
+    hourly_weather_data = bundle.hourly
+
+    # Analyze weather conditions for the city
+    warning = analyzer.analyze_weather(weather_data)
+    forecast_warning = analyzer.analyze_forecast(hourly_weather_data)
+
+    # Format data for display for the city. Weather is fetched for the centre of
+    # the city's cache cell, so its name may be a neighbour's: take the geocoded one
+    location = bundle.location
+    weather_info = {
+        'city': (location.local_names or {}).get(lang, location.name),
+        'temperature': round(weather_data.main.temp),
+        'feels_like': round(weather_data.main.feels_like),
+        'description': weather_data.weather[0].description,
+        'humidity': weather_data.main.humidity,
+        'wind_speed': round(weather_data.wind.speed),
+        'pressure': weather_data.main.pressure,
+        'warning': warning,
+        'forecast_warning': forecast_warning,
+        'hourly_weather': hourly_weather_data
+    }
+
+    # Extract data for plotting
+    dates = hourly_weather_data.pretty_dt
+    temperatures = hourly_weather_data.temp
+    wind_speeds = hourly_weather_data.wind_speed
+
+    # Series for plotting: rasterized in one batch by the route or drawn by the browser
+    weather_info['plot_series'] = create_weather_plot_series(dates, temperatures, wind_speeds)
+
+    return weather_info
+
+
+def _resolve_plot_mode(data: dict) -> str:
+    """Plot mode from the request body or query string, falling back to ``PLOT_MODE``"""
+    plot_mode = data.get('plot_mode') or request.args.get('plot_mode')
+    if plot_mode in PLOT_MODES:
+        return plot_mode
+    return current_app.config['PLOT_MODE']
+
+
+def _render_plots(cities_weather: list[dict]) -> None:
+    """Rasterize temperature and wind plots of every city in one pass over the renderer pool"""
+    plots = []
+    for weather_info in cities_weather:
+        series = weather_info['plot_series']
+        plots.append(('temp', series['dates'], series['temp']))
+        plots.append(('wind', series['dates'], series['wind']))
+
+    images = create_weather_plots(plots)
+    for weather_info, plot_url_temp, plot_url_wind in zip(cities_weather, images[0::2], images[1::2]):
+        weather_info['plot_url_temp'] = plot_url_temp
+        weather_info['plot_url_wind'] = plot_url_wind
+
+
+def _collect_cities_weather(cities: list[str], lang: str) -> list[dict]:
+    """Build weather info for every city, keeping the order of the input list.
+
+    Cities are processed concurrently on a bounded thread pool; the limit comes
+    from ``WEATHER_MAX_WORKERS``. A limit of 1 keeps the old sequential behaviour.
+    """
+    get_prefetch_scheduler().record(cities, lang)
+    weather_service = WeatherService()
+    analyzer = WeatherAnalyzerService()
+
+    max_workers = min(current_app.config['WEATHER_MAX_WORKERS'], len(cities))
+    if max_workers <= 1:
+        return [_build_city_weather(weather_service, analyzer, city, lang) for city in cities]
+
+    profile = current_profile()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='weather') as executor:
+        # Each task gets its own copy of the request context so that
+        # flask_babel can resolve the locale inside worker threads
+        futures = []
+        for city in cities:
+            task = copy_current_request_context(_build_city_weather)
+            if profile is not None:
+                # cProfile only sees its own thread: every task gets a profiler of its own
+                task = profile.wrap(task)
+            futures.append(executor.submit(task, weather_service, analyzer, city, lang))
+        return [future.result() for future in futures]
+
+
+def _build_city_card(weather_service: WeatherService, analyzer: WeatherAnalyzerService, city: str, lang: str,
+                     plot_mode: str) -> dict:
+    """Weather info for one city with its plots, ready to be rendered as a card"""
+    weather_info = _build_city_weather(weather_service, analyzer, city, lang)
+    if plot_mode == PLOT_MODE_PNG:
+        _render_plots([weather_info])
+    return weather_info
+
+
+def _sse(event: str, data: dict) -> str:
+    """One server-sent event; JSON keeps the payload on a single data line"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@weather_bp.route('/weather/stream', methods=['POST'])
+def weather_stream():
+    """Stream city cards as server-sent events in completion order.
+
+    Every ``card`` event carries the city's index in the request (1-based) so
+    the page can put it in place; a failed city gets a ``card-error`` event
+    instead, and ``done`` closes the stream. ``cities`` must be a list of
+    non-empty names, at most ``API_MAX_CITIES`` of them; otherwise 400.
+    """
+    data = request.get_json(silent=True)
+    cities = data.get('cities') if isinstance(data, dict) else None
+    if not isinstance(cities, list) or not cities \
+            or not all(isinstance(city, str) and city.strip() for city in cities):
+        return jsonify(error=_("No cities given")), 400
+    if len(cities) > current_app.config['API_MAX_CITIES']:
+        return jsonify(error=_("Too many cities")), 400
+
+    plot_mode = _resolve_plot_mode(data)
+    lang = str(get_locale())
+    get_prefetch_scheduler().record(cities, lang)
+    max_workers = max(1, min(current_app.config['WEATHER_MAX_WORKERS'], len(cities)))
+
+    @stream_with_context
+    def generate():
+        weather_service = WeatherService()
+        analyzer = WeatherAnalyzerService()
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='weather-stream')
+        try:
+            futures = {
+                executor.submit(copy_current_request_context(_build_city_card),
+                                weather_service, analyzer, city, lang, plot_mode): index
+                for index, city in enumerate(cities, start=1)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    weather_info = future.result()
+                except Exception as e:
+                    current_app.logger.error(f"Error streaming weather for {cities[index - 1]}: {e}")
+                    yield _sse('card-error', {
+                        'index': index,
+                        'city': cities[index - 1],
+                        'message': _("Unable to fetch weather data")
+                    })
+                    continue
+
+                with timed('template'):
+                    html = render_template('_city_card.html', city_weather=weather_info, city_id=index,
+                                           plot_mode=plot_mode)
+                card = {'index': index, 'html': html}
+                if plot_mode == PLOT_MODE_JSON:
+                    card['series'] = weather_info['plot_series']
+                yield _sse('card', card)
+            yield _sse('done', {'count': len(cities)})
+        finally:
+            # The client may have gone away: do not wait for the remaining cities
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # keep nginx from buffering the stream
+    })
+
+
 @weather_bp.route('/weather', methods=['GET', 'POST'])
 def weather():
     try:
@@ -14,48 +189,18 @@ def weather():
             cities = data.get('cities', [])
 
             if not cities:
-                return render_template('weather.html')
-
-            weather_service = WeatherService()
-            analyzer = WeatherAnalyzerService()
-            cities_weather = []
-
-            for city in cities:
-                # Get weather data for the city
-                weather_data = weather_service.get_weather_by_city(city, str(get_locale()))
-                hourly_weather_data = weather_service.get_weather_hourly_by_city(city, str(get_locale()))
-
-                # Analyze weather conditions for the city
-                warning = analyzer.analyze_weather(weather_data)
-
-                # Format data for display for the city
-                weather_info = {
-                    'city': weather_data.name,
-                    'temperature': round(weather_data.main.temp),
-                    'feels_like': round(weather_data.main.feels_like),
-                    'description': weather_data.weather[0].description,
-                    'humidity': weather_data.main.humidity,
-                    'wind_speed': round(weather_data.wind.speed),
-                    'pressure': weather_data.main.pressure,
-                    'warning': warning,
-                    'hourly_weather': hourly_weather_data.list
-                }
-
-                # Extract data for plotting
-                dates = [entry.pretty_dt for entry in hourly_weather_data.list]
-                temperatures = [entry.main.temp for entry in hourly_weather_data.list]
-                wind_speeds = [entry.wind.speed for entry in hourly_weather_data.list]
-
-                # Create plot
-                weather_info['plot_url_temp'] = create_weather_plot_temp(dates, temperatures)
-                weather_info['plot_url_wind'] = create_weather_plot_wind(dates, wind_speeds)
-
-                cities_weather.append(weather_info)
-
-            return render_template('weather.html', cities_weather=cities_weather)
+                return render_template('weather.html', plot_mode=_resolve_plot_mode(data))
+
+            plot_mode = _resolve_plot_mode(data)
+            cities_weather = _collect_cities_weather(cities, str(get_locale()))
+            if plot_mode == PLOT_MODE_PNG:
+                _render_plots(cities_weather)
+
+            with timed('template'):
+                return render_template('weather.html', cities_weather=cities_weather, plot_mode=plot_mode)
 
         # Если метод GET, просто отобразить пустую форму
-        return render_template('weather.html')
+        return render_template('weather.html', plot_mode=_resolve_plot_mode({}))
 
     except Exception as e:
         current_app.logger.error(f"Error in weather route: {e}")
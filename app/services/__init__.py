@@ -1,4 +1,6 @@
 from .weather_service import WeatherService
 from .weather_analyzer_service import WeatherAnalyzerService
 from .geocoding_service import GeocodingService
-from .plot_service import create_weather_plot_temp, create_weather_plot_wind
+from .plot_service import create_weather_plot_temp, create_weather_plot_wind, create_weather_plot_series
+from .async_weather_service import AsyncWeatherService
+from .async_geocoding_service import AsyncGeocodingService
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from typing import Dict, NoReturn, Optional
+
+import aiohttp
+
+from config import Config
+from .async_http_client import async_http_get
+from .metrics import timed
+from .rate_limiter import RateLimitExceeded, get_rate_limiter
+from .cache import MISSING
+from .geocoding_cache import GeocodingCache, get_geocoding_cache, normalize_city_name
+from .geocoding_service import GeocodingAPIException, GeocodingAPICityNotFound, parse_geocoding_results
+from .singleflight import AsyncSingleFlight
+from ..models.geocoding_model import GeocodingResponse
+
+_inflight = AsyncSingleFlight()
+
+
+class AsyncGeocodingService:
+    """Non-blocking counterpart of ``GeocodingService`` sharing its cache and exceptions"""
+
+    def __init__(self, cache: Optional[GeocodingCache] = None):
+        self.base_url = f"{Config.OPENWEATHER_BASE_URL}/geo/1.0"
+        self.api_key = Config.OPENWEATHER_API_KEY
+        self.cache = cache if cache is not None else get_geocoding_cache()
+
+    async def _make_request(self, endpoint: str, params: Dict) -> bytes | NoReturn:
+        """Make request to OpenWeather Geocoding API and return the raw response body"""
+        try:
+            await get_rate_limiter().acquire_async('geo')
+            params['appid'] = self.api_key
+            return await async_http_get(f"{self.base_url}/{endpoint}", params)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.error(f"API request failed: {str(e)}")
+            raise GeocodingAPIException(f"Failed to fetch geocoding data: {str(e)}")
+        except RateLimitExceeded as e:
+            logging.warning(f"API request throttled: {str(e)}")
+            raise GeocodingAPIException(f"Failed to fetch geocoding data: {str(e)}")
+
+    async def get_coordinates_by_city_name(self, city_name: str) -> GeocodingResponse | NoReturn:
+        """Get coordinates for a given city name"""
+        with timed('geocoding'):
+            cached = self.cache.get(city_name)
+            if cached is not MISSING:
+                if cached is None:
+                    raise GeocodingAPICityNotFound(f"No data found for city: {city_name}")
+                return cached
+
+            return await _inflight.do(normalize_city_name(city_name), lambda: self._fetch_coordinates(city_name))
+
+    async def _fetch_coordinates(self, city_name: str) -> GeocodingResponse | NoReturn:
+        """Request coordinates from the Geocoding API and store the outcome in the cache"""
+        params = {
+            'q': city_name,
+            'limit': 1
+        }
+
+        raw = await self._make_request('direct', params)
+        data = parse_geocoding_results(raw)
+
+        if not data:
+            self.cache.set_not_found(city_name)
+            raise GeocodingAPICityNotFound(f"No data found for city: {city_name}")
+
+        self.cache.set(city_name, data[0])
+        return data[0]
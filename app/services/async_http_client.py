@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import random
+from typing import Dict, Optional
+
+import aiohttp
+
+from config import Config
+from .http_client import QUOTA_ENDPOINTS
+from .metrics import UPSTREAM_RESPONSES, UPSTREAM_RETRIES, timed, upstream_endpoint
+from .rate_limiter import RateLimitExceeded, get_rate_limiter
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_async_session() -> aiohttp.ClientSession:
+    """Keep-alive connection pool shared by the async OpenWeather clients of the running loop"""
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=Config.HTTP_POOL_SIZE),
+            timeout=aiohttp.ClientTimeout(
+                sock_connect=Config.HTTP_CONNECT_TIMEOUT,
+                sock_read=Config.HTTP_READ_TIMEOUT
+            )
+        )
+        _session_loop = loop
+    return _session
+
+
+async def close_async_session() -> None:
+    global _session, _session_loop
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    _session_loop = None
+
+
+def _retry_delay(attempt: int, retry_after: Optional[str]) -> float:
+    """Same policy as the sync client: Retry-After when given, else jittered exponential backoff"""
+    if retry_after is not None:
+        try:
+            return min(max(float(retry_after), 0.0), Config.HTTP_RETRY_AFTER_MAX)
+        except ValueError:
+            pass
+    return Config.HTTP_BACKOFF_FACTOR * (2 ** attempt) + random.uniform(0, Config.HTTP_BACKOFF_JITTER)
+
+
+async def _retry_quota_available(endpoint: str) -> bool:
+    """Take a limiter token for one more attempt at ``endpoint``; False if the quota does not allow it"""
+    try:
+        await get_rate_limiter().acquire_async(QUOTA_ENDPOINTS.get(endpoint, endpoint))
+        return True
+    except RateLimitExceeded:
+        return False
+
+
+async def async_http_get(url: str, params: Dict) -> bytes:
+    """GET a response body with timeouts and retries on connection errors, 429 and 5xx.
+
+    The caller takes the rate limiter token for the first attempt; each retry
+    takes its own, and without one the retries are over. Raises
+    ``aiohttp.ClientError`` or ``asyncio.TimeoutError`` once retries are exhausted.
+    """
+    session = get_async_session()
+    endpoint = upstream_endpoint(url)
+    with timed(f'http_{endpoint}'):
+        for attempt in range(Config.HTTP_RETRIES + 1):
+            last_attempt = attempt == Config.HTTP_RETRIES
+            try:
+                async with session.get(url, params=params) as response:
+                    # Токен лимитера ждём, вернув соединение в пул
+                    if response.status in RETRY_STATUSES and not last_attempt:
+                        response.release()
+                        if await _retry_quota_available(endpoint):
+                            delay = _retry_delay(attempt, response.headers.get('Retry-After'))
+                            logging.warning(f"Retrying {url} after HTTP {response.status} in {delay:.2f}s")
+                            UPSTREAM_RETRIES.inc(endpoint)
+                            await asyncio.sleep(delay)
+                            continue
+                    UPSTREAM_RESPONSES.inc(endpoint, str(response.status))
+                    response.raise_for_status()
+                    return await response.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if last_attempt or not await _retry_quota_available(endpoint):
+                    UPSTREAM_RESPONSES.inc(endpoint, 'error')
+                    raise
+                UPSTREAM_RETRIES.inc(endpoint)
+                await asyncio.sleep(_retry_delay(attempt, None))
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import logging
+from typing import Dict, NoReturn, Optional
+
+import aiohttp
+from pydantic import ValidationError
+
+from config import Config
+from .async_geocoding_service import AsyncGeocodingService
+from .async_http_client import async_http_get
+from .metrics import timed
+from .rate_limiter import RateLimitExceeded, get_rate_limiter
+from .geocoding_service import GeocodingAPIException, GeocodingAPICityNotFound
+from .weather_cache import WeatherResponseCache, get_weather_cache
+from .weather_service import WeatherAPIException
+from ..models import OpenWeatherResponse, OpenWeatherHourlyResponse, WeatherBundle, HourlyForecast
+
+
+class AsyncWeatherService:
+    """Non-blocking counterpart of ``WeatherService`` for the Telegram bot's event loop.
+
+    Returns the same models, raises the same exceptions and shares the response cache.
+    """
+
+    def __init__(self, cache: Optional[WeatherResponseCache] = None):
+        self.base_url = f"{Config.OPENWEATHER_BASE_URL}/data/2.5"
+        self.api_key = Config.OPENWEATHER_API_KEY
+        self.cache = cache if cache is not None else get_weather_cache()
+
+    async def _make_request(self, endpoint: str, params: Dict) -> bytes | NoReturn:
+        """Make request to OpenWeather API and return the raw response body"""
+        try:
+            await get_rate_limiter().acquire_async(endpoint)
+            params['appid'] = self.api_key
+            return await async_http_get(f"{self.base_url}/{endpoint}", params)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.error(f"API request failed: {str(e)}")
+            raise WeatherAPIException(f"Failed to fetch weather data: {str(e)}")
+        except RateLimitExceeded as e:
+            logging.warning(f"API request throttled: {str(e)}")
+            raise WeatherAPIException(f"Failed to fetch weather data: {str(e)}")
+
+    async def get_weather_by_coordinates(self, lat: float, lon: float, lang: str = 'en') -> OpenWeatherResponse | NoReturn:
+        """Get current weather for given coordinates"""
+        return await self.cache.get_or_fetch_async(
+            'weather', lat, lon, lang, lambda: self._fetch_weather(*self.cache.cell_center(lat, lon), lang)
+        )
+
+    async def _fetch_weather(self, lat: float, lon: float, lang: str) -> OpenWeatherResponse | NoReturn:
+        params = {
+            'lat': lat,
+            'lon': lon,
+            'lang': lang,
+            'units': 'metric'
+        }
+
+        raw = await self._make_request('weather', params)
+
+        try:
+            with timed('parse_weather'):
+                return OpenWeatherResponse.model_validate_json(raw)
+        except ValidationError as e:
+            raise ValueError(f"Data validation error: {e.errors()}")
+
+    async def get_weather_hourly_by_coordinates(self, lat: float, lon: float, lang: str = 'en') -> OpenWeatherHourlyResponse | NoReturn:
+        """Get hourly weather forecast for given coordinates"""
+        return await self.cache.get_or_fetch_async(
+            'forecast', lat, lon, lang, lambda: self._fetch_weather_hourly(*self.cache.cell_center(lat, lon), lang)
+        )
+
+    async def _fetch_weather_hourly(self, lat: float, lon: float, lang: str) -> OpenWeatherHourlyResponse | NoReturn:
+        params = {
+            'lat': lat,
+            'lon': lon,
+            'lang': lang,
+            'units': 'metric'
+        }
+
+        raw = await self._make_request('forecast', params)
+
+        try:
+            with timed('parse_forecast'):
+                return OpenWeatherHourlyResponse.model_validate(json.loads(raw))
+        except ValidationError as e:
+            raise ValueError(f"Data validation error: {e.errors()}")
+
+    async def get_forecast_columns_by_coordinates(self, lat: float, lon: float, lang: str = 'en') -> HourlyForecast | NoReturn:
+        """Get hourly weather forecast for given coordinates as columns, without per-slot models"""
+        return await self.cache.get_or_fetch_async(
+            'forecast', lat, lon, lang, lambda: self._fetch_forecast_columns(*self.cache.cell_center(lat, lon), lang), variant='columns'
+        )
+
+    async def _fetch_forecast_columns(self, lat: float, lon: float, lang: str) -> HourlyForecast | NoReturn:
+        params = {
+            'lat': lat,
+            'lon': lon,
+            'lang': lang,
+            'units': 'metric'
+        }
+
+        raw = await self._make_request('forecast', params)
+
+        try:
+            with timed('parse_forecast'):
+                return HourlyForecast.from_json(raw)
+        except ValueError as e:
+            raise ValueError(f"Data validation error: {e}")
+
+    async def get_weather_bundle_by_city(self, city_name: str, lang: str = 'en') -> WeatherBundle | NoReturn:
+        """Get current weather and hourly forecast for a given city name, geocoding it only once"""
+        geocoding_service = AsyncGeocodingService()
+
+        try:
+            geocoding_response = await geocoding_service.get_coordinates_by_city_name(city_name)
+            lat = geocoding_response.lat
+            lon = geocoding_response.lon
+            current, hourly = await asyncio.gather(
+                self.get_weather_by_coordinates(lat, lon, lang),
+                self.get_forecast_columns_by_coordinates(lat, lon, lang)
+            )
+            return WeatherBundle(location=geocoding_response, current=current, hourly=hourly)
+        except GeocodingAPICityNotFound as e:
+            logging.error(f"Can't found city with name {city_name}: {str(e)}")
+            raise GeocodingAPICityNotFound(f"No data found for city: {city_name}")
+        except (GeocodingAPIException, ValueError) as e:
+            logging.error(f"Failed to get weather bundle for city {city_name}: {str(e)}")
+            raise GeocodingAPIException(f"Failed to get weather bundle for city {city_name}: {str(e)}")
@@ -0,0 +1,274 @@
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from config import Config
+from .geocoding_cache import normalize_city_name
+from .rate_limiter import Priority, RateLimitExceeded, is_throttled, request_priority
+from .weather_analyzer_service import WeatherAnalyzerService, WeatherSeverity, describe_warning
+from .weather_service import WeatherService
+from ..models import WeatherBundle
+
+RESULT_FIELDS = ('line', 'start', 'end', 'status', 'severity', 'conditions', 'description', 'error')
+
+
+@dataclass(frozen=True)
+class Route:
+    line: int  # номер строки во входном файле, считая с 1
+    start: str
+    end: str
+
+
+def read_routes(lines: Iterable[str]) -> Iterator[Route]:
+    """Routes from CSV lines ``start,end``, read lazily; a ``start,end`` header and blank rows are skipped"""
+    for line, row in enumerate(csv.reader(lines), start=1):
+        if len(row) < 2 or not row[0].strip() or not row[1].strip():
+            continue
+        start, end = row[0].strip(), row[1].strip()
+        if line == 1 and (start.lower(), end.lower()) == ('start', 'end'):
+            continue
+        yield Route(line=line, start=start, end=end)
+
+
+# Анализатор создаётся один раз в каждом процессе пула
+_analyzer: Optional[WeatherAnalyzerService] = None
+
+
+def evaluate_route(task: Tuple[Route, object, object, str, Optional[str]]) -> dict:
+    """Analyze one route from its cities' bundles (or error messages); runs in a pool process"""
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = WeatherAnalyzerService()
+    route, start, end, lang, plots_dir = task
+
+    result = {'line': route.line, 'start': route.start, 'end': route.end}
+    errors = [f"{city}: {data}" for city, data in ((route.start, start), (route.end, end)) if isinstance(data, str)]
+    if errors:
+        result.update(status='error', error='; '.join(errors))
+        return result
+
+    severity = WeatherSeverity.NORMAL
+    conditions = []
+    for bundle in (start, end):
+        for warning in (_analyzer.analyze_weather(bundle.current), _analyzer.analyze_forecast(bundle.hourly)):
+            severity = max(severity, warning.severity)
+            conditions.extend(condition for condition in warning.conditions if condition not in conditions)
+
+    result.update(
+        status='ok',
+        severity=severity.name.lower(),
+        conditions=conditions,
+        description=describe_warning(severity, conditions, lang)
+    )
+    if plots_dir:
+        _write_route_plots(plots_dir, route, start, end)
+    return result
+
+
+def _new_pool(max_workers: int) -> ProcessPoolExecutor:
+    # spawn, а не fork: веб-процесс многопоточный, и форк унаследовал бы занятые блокировки
+    # лимитера, кэшей и HTTP-сессий
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def _write_route_plots(plots_dir: str, route: Route, start: WeatherBundle, end: WeatherBundle) -> None:
+    import plotly.io as pio
+    from .plot_service import _build_temp_figure, _build_wind_figure
+
+    for suffix, bundle in (('start', start), ('end', end)):
+        hourly = bundle.hourly
+        prefix = os.path.join(plots_dir, f'{route.line}-{suffix}')
+        pio.write_image(_build_temp_figure(hourly.pretty_dt, hourly.temp), f'{prefix}-temp.png')
+        pio.write_image(_build_wind_figure(hourly.pretty_dt, hourly.wind_speed), f'{prefix}-wind.png')
+
+
+class _Checkpoint:
+    """Input rows consumed and output size at the last flush, stored next to the output"""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+
+    def load(self) -> Tuple[int, int]:
+        if not self.path or not os.path.exists(self.path):
+            return 0, 0
+        with open(self.path, encoding='utf-8') as f:
+            state = json.load(f)
+        return state['lines'], state['output_bytes']
+
+    def save(self, lines: int, output_bytes: int) -> None:
+        if not self.path:
+            return
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'lines': lines, 'output_bytes': output_bytes}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)  # запись контрольной точки атомарна
+
+
+class RouteBatchJob:
+    """Evaluate a large list of routes with a bounded number of upstream calls.
+
+    Routes are read in chunks. Each city is fetched once per batch, no matter
+    how many routes mention it, on a thread pool of ``concurrency`` workers;
+    analysis (and optional plotting) of the chunk runs on a process pool.
+    Results keep the input order. At most ``max_cities`` fetched cities are
+    kept between chunks; beyond that they are dropped and fetched again (from
+    the weather cache, usually) when a later chunk needs them.
+
+    A city that found no OpenWeather quota is not a result: it is fetched
+    again, up to ``BATCH_THROTTLE_RETRIES`` times, and after that the job
+    stops with ``RateLimitExceeded`` before the chunk is written, so that a
+    resumed run tries it once more.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, processes: Optional[int] = None,
+                 chunk_size: Optional[int] = None, lang: str = 'en', plots_dir: Optional[str] = None,
+                 weather_service: Optional[WeatherService] = None, pool: Optional[ProcessPoolExecutor] = None,
+                 max_cities: Optional[int] = None):
+        self.concurrency = concurrency or Config.BATCH_CONCURRENCY
+        self.processes = processes or Config.BATCH_PROCESSES or os.cpu_count() or 1
+        self.chunk_size = chunk_size or Config.BATCH_CHUNK_SIZE
+        self.lang = lang
+        self.plots_dir = plots_dir
+        self.weather_service = weather_service or WeatherService()
+        self.pool = pool
+        self.max_cities = max_cities or Config.BATCH_MAX_CITIES
+        self.cities: Dict[str, object] = {}  # город -> WeatherBundle или текст ошибки
+        self.upstream_cities = 0
+
+    def _fetch_city(self, city: str) -> object:
+        """The city's bundle or error message; ``None`` if it got no quota and has to be fetched again"""
+        try:
+            # Пакет уступает квоту OpenWeather запросам пользователей
+            with request_priority(Priority.BATCH):
+                return self.weather_service.get_weather_bundle_by_city(city, self.lang)
+        except Exception as e:
+            if is_throttled(e):
+                return None
+            logging.warning(f"Batch: failed to get weather for {city}: {str(e)}")
+            return str(e)
+
+    def _fetch_cities(self, routes: List[Route]) -> None:
+        if len(self.cities) > self.max_cities:
+            needed = {normalize_city_name(city) for route in routes for city in (route.start, route.end)}
+            self.cities = {key: data for key, data in self.cities.items() if key in needed}
+        missing = {}
+        for route in routes:
+            for city in (route.start, route.end):
+                key = normalize_city_name(city)
+                if key not in self.cities:
+                    missing.setdefault(key, city)
+        self.upstream_cities += len(missing)
+        for attempt in range(Config.BATCH_THROTTLE_RETRIES + 1):
+            if not missing:
+                return
+            if attempt:
+                logging.warning(f"Batch: {len(missing)} cities got no OpenWeather quota, fetching them again")
+            throttled = {}
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(missing)), thread_name_prefix='batch') as executor:
+                for (key, city), data in zip(missing.items(), executor.map(self._fetch_city, missing.values())):
+                    if data is None:
+                        throttled[key] = city
+                    else:
+                        self.cities[key] = data
+            missing = throttled
+        if missing:
+            raise RateLimitExceeded(f"No OpenWeather quota for {len(missing)} batch cities")
+
+    def evaluate(self, routes: Iterable[Route]) -> Iterator[List[dict]]:
+        """Yield the results chunk by chunk"""
+        pool = self.pool or _new_pool(self.processes)
+        try:
+            routes = iter(routes)
+            while chunk := list(islice(routes, self.chunk_size)):
+                self._fetch_cities(chunk)
+                tasks = [
+                    (route, self.cities[normalize_city_name(route.start)], self.cities[normalize_city_name(route.end)],
+                     self.lang, self.plots_dir)
+                    for route in chunk
+                ]
+                yield list(pool.map(evaluate_route, tasks, chunksize=max(1, len(tasks) // (self.processes * 4))))
+        finally:
+            if pool is not self.pool:
+                pool.shutdown()
+
+    def run(self, routes_path: str, output_path: str, fmt: str = 'jsonl',
+            checkpoint_path: Optional[str] = None) -> int:
+        """Evaluate the routes file into ``output_path``, resuming from the checkpoint if there is one.
+
+        Output is flushed and the checkpoint saved after every chunk; on resume,
+        a partially written chunk is cut off the output before continuing.
+        Returns the number of routes written by this run.
+        """
+        checkpoint = _Checkpoint(checkpoint_path)
+        skip_lines, output_bytes = checkpoint.load()
+        if skip_lines and (not os.path.exists(output_path) or os.path.getsize(output_path) < output_bytes):
+            raise ValueError(f"Checkpoint {checkpoint_path} does not match {output_path}")
+        written = 0
+
+        with open(routes_path, newline='', encoding='utf-8') as routes_file, \
+                open(output_path, 'a+b' if skip_lines else 'w+b') as output:
+            output.truncate(output_bytes)
+            output.seek(output_bytes)
+            writer = ResultWriter(output, fmt, header=output_bytes == 0)
+            routes = (route for route in read_routes(routes_file) if route.line > skip_lines)
+            last_line = skip_lines
+            for results in self.evaluate(routes):
+                writer.write(results)
+                output.flush()
+                os.fsync(output.fileno())
+                written += len(results)
+                last_line = results[-1]['line']
+                checkpoint.save(last_line, output.tell())
+                logging.info(f"Batch: {written} routes written, up to input line {last_line}")
+        return written
+
+
+class ResultWriter:
+    """Encode result rows as JSONL or CSV into a binary stream"""
+
+    def __init__(self, output: IO[bytes], fmt: str = 'jsonl', header: bool = True):
+        if fmt not in ('jsonl', 'csv'):
+            raise ValueError(f"Unknown batch output format: {fmt}")
+        self.output = output
+        self.fmt = fmt
+        self.header = header
+
+    def encode(self, results: List[dict]) -> bytes:
+        if self.fmt == 'jsonl':
+            return ''.join(json.dumps(result, ensure_ascii=False) + '\n' for result in results).encode('utf-8')
+
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=RESULT_FIELDS)
+        if self.header:
+            writer.writeheader()
+            self.header = False
+        for result in results:
+            writer.writerow({**result, 'conditions': ' '.join(result.get('conditions', []))})
+        return buffer.getvalue().encode('utf-8')
+
+    def write(self, results: List[dict]) -> None:
+        self.output.write(self.encode(results))
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_batch_pool() -> ProcessPoolExecutor:
+    """Process pool shared by batch requests of the web app"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _new_pool(Config.BATCH_PROCESSES or os.cpu_count() or 1)
+    return _pool
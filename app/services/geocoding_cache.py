@@ -0,0 +1,158 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional
+
+from config import Config
+from .cache import LRUCache, MISSING
+from ..models.geocoding_model import GeocodingResponse
+
+
+def normalize_city_name(city_name: str) -> str:
+    """Cache key for a city name: NFKC form, case-folded, single spaces"""
+    return ' '.join(unicodedata.normalize('NFKC', city_name).casefold().split())
+
+
+class GeocodingCache:
+    """Two-tier cache for geocoding results.
+
+    The first tier is an in-process LRU, the optional second tier is a SQLite
+    file that survives restarts. ``None`` is cached for cities the API does not
+    know (negative caching) with its own, shorter TTL. With ``trusted`` set,
+    disk rows are loaded without re-validation: they were validated before
+    being written.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 30 * 24 * 60 * 60,
+                 negative_ttl: float = 60 * 60, path: Optional[str] = None, trusted: bool = True):
+        self.ttl = ttl
+        self.trusted = trusted
+        self.negative_ttl = negative_ttl
+        self.memory = LRUCache(max_size, ttl)
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.negative_hits = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if path:
+            self._open_db(path)
+
+    def _open_db(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db_lock, self._db:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS geocoding ('
+                'key TEXT PRIMARY KEY, payload TEXT, expires_at REAL NOT NULL)'
+            )
+            self._db.execute('DELETE FROM geocoding WHERE expires_at <= ?', (time.time(),))
+
+    def _disk_get(self, key: str) -> Any:
+        if self._db is None:
+            return MISSING
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    'SELECT payload, expires_at FROM geocoding WHERE key = ?', (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"Geocoding cache read failed: {str(e)}")
+            return MISSING
+        if row is None:
+            return MISSING
+        payload, expires_at = row
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            return MISSING
+        value = self._load(payload) if payload is not None else None
+        # Поднимаем запись в память с оставшимся сроком жизни
+        self.memory.set(key, value, remaining)
+        return value
+
+    def _load(self, payload: str) -> GeocodingResponse:
+        if self.trusted:
+            return GeocodingResponse.model_construct(**json.loads(payload))
+        return GeocodingResponse.model_validate_json(payload)
+
+    def _disk_set(self, key: str, value: Optional[GeocodingResponse], ttl: float) -> None:
+        if self._db is None:
+            return
+        payload = value.model_dump_json() if value is not None else None
+        try:
+            with self._db_lock, self._db:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO geocoding (key, payload, expires_at) VALUES (?, ?, ?)',
+                    (key, payload, time.time() + ttl)
+                )
+        except sqlite3.Error as e:
+            logging.error(f"Geocoding cache write failed: {str(e)}")
+
+    def get(self, city_name: str) -> Any:
+        """Return a cached ``GeocodingResponse``, ``None`` for a known-missing city or ``MISSING``"""
+        key = normalize_city_name(city_name)
+        value = self.memory.get(key)
+        if value is MISSING:
+            value = self._disk_get(key)
+            if value is not MISSING:
+                self.disk_hits += 1
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            if value is None:
+                self.negative_hits += 1
+        return value
+
+    def set(self, city_name: str, value: GeocodingResponse) -> None:
+        key = normalize_city_name(city_name)
+        self.memory.set(key, value, self.ttl)
+        self._disk_set(key, value, self.ttl)
+
+    def set_not_found(self, city_name: str) -> None:
+        key = normalize_city_name(city_name)
+        self.memory.set(key, None, self.negative_ttl)
+        self._disk_set(key, None, self.negative_ttl)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.hits = self.misses = self.disk_hits = self.negative_hits = 0
+        if self._db is not None:
+            with self._db_lock, self._db:
+                self._db.execute('DELETE FROM geocoding')
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self.memory),
+            'hits': self.hits,
+            'misses': self.misses,
+            'disk_hits': self.disk_hits,
+            'negative_hits': self.negative_hits,
+            'evictions': self.memory.evictions,
+        }
+
+
+_cache: Optional[GeocodingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_geocoding_cache() -> GeocodingCache:
+    """Process-wide geocoding cache configured from ``Config``"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = GeocodingCache(
+                    max_size=Config.GEOCODING_CACHE_SIZE,
+                    ttl=Config.GEOCODING_CACHE_TTL,
+                    negative_ttl=Config.GEOCODING_CACHE_NEGATIVE_TTL,
+                    path=Config.GEOCODING_CACHE_PATH,
+                    trusted=Config.GEOCODING_CACHE_TRUSTED
+                )
+    return _cache
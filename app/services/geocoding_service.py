@@ -1,15 +1,34 @@
 import requests
-from typing import Dict, NoReturn
+from typing import Dict, List, NoReturn, Optional
 
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 
 import logging
 
 from config import Config
+from .cache import MISSING
+from .geocoding_cache import GeocodingCache, get_geocoding_cache, normalize_city_name
+from .http_client import http_get
+from .metrics import timed
+from .rate_limiter import RateLimitExceeded, get_rate_limiter
+from .singleflight import SingleFlight
 from ..models.geocoding_model import GeocodingResponse
 
 
+# Валидатор строится один раз при импорте, а не на каждый ответ
+_geocoding_results = TypeAdapter(List[GeocodingResponse])
+
+
+def parse_geocoding_results(raw: bytes) -> List[GeocodingResponse] | NoReturn:
+    """Validate a raw /direct response body into models in one pass"""
+    try:
+        with timed('parse_geocoding'):
+            return _geocoding_results.validate_json(raw)
+    except ValidationError as e:
+        raise ValueError(f"Data validation error: {e.errors()}")
+
+
 class GeocodingAPIException(Exception):
     """Custom exception for geocoding API errors"""
     pass
@@ -19,40 +38,59 @@ class GeocodingAPICityNotFound(GeocodingAPIException):
     """Custom exception for geocoding API if city not found"""
 
 
+# Общий для процесса: одновременные запросы одного города делят один вызов API
+_inflight = SingleFlight()
+
+
 class GeocodingService:
-    def __init__(self):
-        self.base_url = "https://api.openweathermap.org/geo/1.0"
+    def __init__(self, cache: Optional[GeocodingCache] = None):
+        self.base_url = f"{Config.OPENWEATHER_BASE_URL}/geo/1.0"
         self.api_key = Config.OPENWEATHER_API_KEY
+        self.cache = cache if cache is not None else get_geocoding_cache()
 
-    def _make_request(self, endpoint: str, params: Dict) -> Dict | NoReturn:
-        """Make request to OpenWeather Geocoding API"""
+    def _make_request(self, endpoint: str, params: Dict) -> bytes | NoReturn:
+        """Make request to OpenWeather Geocoding API and return the raw response body"""
         try:
+            get_rate_limiter().acquire('geo')
             params['appid'] = self.api_key
-            response = requests.get(f"{self.base_url}/{endpoint}", params=params)
+            response = http_get(f"{self.base_url}/{endpoint}", params)
             response.raise_for_status()
-            return response.json()
+            return response.content
 
         except requests.RequestException as e:
             logging.error(f"API request failed: {str(e)}")
             raise GeocodingAPIException(f"Failed to fetch geocoding data: {str(e)}")
+        except RateLimitExceeded as e:
+            logging.warning(f"API request throttled: {str(e)}")
+            raise GeocodingAPIException(f"Failed to fetch geocoding data: {str(e)}")
 
+    @timed('geocoding')
     def get_coordinates_by_city_name(self, city_name: str) -> GeocodingResponse | NoReturn:
         """Get coordinates for a given city name"""
+        cached = self.cache.get(city_name)
+        if cached is not MISSING:
+            if cached is None:
+                raise GeocodingAPICityNotFound(f"No data found for city: {city_name}")
+            return cached
+
+        return _inflight.do(normalize_city_name(city_name), lambda: self._fetch_coordinates(city_name))
+
+    def _fetch_coordinates(self, city_name: str) -> GeocodingResponse | NoReturn:
+        """Request coordinates from the Geocoding API and store the outcome in the cache"""
         params = {
             'q': city_name,
             'limit': 1
         }
 
-        data = self._make_request('direct', params)
+        raw = self._make_request('direct', params)
+        data = parse_geocoding_results(raw)
 
         if not data:
+            self.cache.set_not_found(city_name)
             raise GeocodingAPICityNotFound(f"No data found for city: {city_name}")
 
-        try:
-            weather_data = GeocodingResponse(**(data[0]))
-            return weather_data
-        except ValidationError as e:
-            raise ValueError(f"Data validation error: {e.errors()}")
+        self.cache.set(city_name, data[0])
+        return data[0]
 
 
 if __name__ == '__main__':
@@ -0,0 +1,73 @@
+from typing import List, Tuple
+
+# Алфавит geohash: base32 без a, i, l, o
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_DECODE = {char: index for index, char in enumerate(_BASE32)}
+
+
+def encode(lat: float, lon: float, precision: int) -> str:
+    """Geohash of the cell containing the point, ``precision`` characters long"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # биты чередуются: долгота, широта, долгота, ...
+    while len(chars) < precision:
+        target, coordinate = (lon_range, lon) if even else (lat_range, lat)
+        middle = (target[0] + target[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            target[0] = middle
+        else:
+            target[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """``(min_lat, min_lon, max_lat, max_lon)`` of the cell"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            target = lon_range if even else lat_range
+            middle = (target[0] + target[1]) / 2
+            if value >> shift & 1:
+                target[0] = middle
+            else:
+                target[1] = middle
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def decode(geohash: str) -> Tuple[float, float]:
+    """Centre of the cell as ``(lat, lon)``"""
+    min_lat, min_lon, max_lat, max_lon = bounds(geohash)
+    return (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+
+
+def neighbors(geohash: str) -> List[str]:
+    """The eight cells around ``geohash`` at the same precision; cells past the poles are skipped"""
+    min_lat, min_lon, max_lat, max_lon = bounds(geohash)
+    lat_step, lon_step = max_lat - min_lat, max_lon - min_lon
+    lat, lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+    cells = []
+    for d_lat in (-1, 0, 1):
+        for d_lon in (-1, 0, 1):
+            if d_lat == d_lon == 0:
+                continue
+            neighbor_lat = lat + d_lat * lat_step
+            if not -90 < neighbor_lat < 90:
+                continue
+            neighbor_lon = (lon + d_lon * lon_step + 180) % 360 - 180
+            cells.append(encode(neighbor_lat, neighbor_lon, len(geohash)))
+    return cells
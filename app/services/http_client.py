@@ -0,0 +1,119 @@
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError
+from urllib3.util.retry import Retry
+
+from config import Config
+from .metrics import UPSTREAM_RESPONSES, UPSTREAM_RETRIES, timed, upstream_endpoint
+from .rate_limiter import RateLimitExceeded, get_rate_limiter
+
+# Очередь лимитера для сегмента пути, если они называются по-разному
+QUOTA_ENDPOINTS = {'direct': 'geo', 'reverse': 'geo'}
+
+
+def retry_quota_available(endpoint: str) -> bool:
+    """Take a limiter token for one more attempt at ``endpoint``; False if the quota does not allow it"""
+    try:
+        get_rate_limiter().acquire(QUOTA_ENDPOINTS.get(endpoint, endpoint))
+        return True
+    except RateLimitExceeded:
+        return False
+
+
+class _CappedRetry(Retry):
+    """Retry policy that never sleeps longer than ``Config.HTTP_RETRY_AFTER_MAX`` on Retry-After.
+
+    Every retry takes its own rate limiter token, so a retried 429 or 5xx
+    counts against the quota like the first attempt; without a token the
+    retries are over.
+    """
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, Config.HTTP_RETRY_AFTER_MAX)
+
+    def increment(self, method=None, url=None, *args, **kwargs):
+        retry = super().increment(method, url, *args, **kwargs)
+        # Сюда попадаем только если попытки ещё остались: исчерпанный лимит бросает исключение выше
+        endpoint = upstream_endpoint(url or '')
+        response = kwargs.get('response')
+        if response is not None:
+            # Токен лимитера ждём, вернув соединение в пул
+            response.drain_conn()
+        if not retry_quota_available(endpoint):
+            # Как исчерпанные попытки: последний ответ с ошибкой уходит вызывающему
+            raise MaxRetryError(kwargs.get('_pool'), url, kwargs.get('error'))
+        UPSTREAM_RETRIES.inc(endpoint)
+        return retry
+
+
+def _build_session() -> requests.Session:
+    retry = _CappedRetry(
+        total=Config.HTTP_RETRIES,
+        connect=Config.HTTP_RETRIES,
+        read=Config.HTTP_RETRIES,
+        status=Config.HTTP_RETRIES,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET'}),
+        backoff_factor=Config.HTTP_BACKOFF_FACTOR,
+        backoff_jitter=Config.HTTP_BACKOFF_JITTER,
+        respect_retry_after_header=True,
+        # Последний ответ с ошибкой возвращаем вызывающему, raise_for_status разберётся
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=Config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=Config.HTTP_POOL_SIZE,
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Process-wide session with a keep-alive connection pool shared by all OpenWeather clients"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def close_session() -> None:
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def http_get(url: str, params: Dict) -> requests.Response:
+    """GET through the shared pool with connect/read timeouts and retries on 429/5xx.
+
+    The caller takes the rate limiter token for the first attempt; each retry takes its own.
+    """
+    endpoint = upstream_endpoint(url)
+    try:
+        with timed(f'http_{endpoint}'):
+            response = get_session().get(
+                url,
+                params=params,
+                timeout=(Config.HTTP_CONNECT_TIMEOUT, Config.HTTP_READ_TIMEOUT)
+            )
+    except requests.RequestException:
+        UPSTREAM_RESPONSES.inc(endpoint, 'error')
+        raise
+    UPSTREAM_RESPONSES.inc(endpoint, str(response.status_code))
+    return response
@@ -0,0 +1,311 @@
+import bisect
+import hmac
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from config import Config
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Границы корзин гистограмм, секунд: от попаданий в кэш до медленных вызовов OpenWeather
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+Sample = Tuple[str, Dict[str, str], float]  # имя, метки, значение
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Tuple[str, ...]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(label) for label in labels)
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic count per label set"""
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    """Observations per label set counted into cumulative ``le`` buckets"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}  # метки -> [корзины..., +Inf, сумма]
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observe the duration of the enclosed block, also when it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def count(self, *labels: str) -> int:
+        counts = self._values.get(self._key(labels))
+        return int(sum(counts[:-1])) if counts else 0
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = [(key, list(counts)) for key, counts in self._values.items()]
+        for key, counts in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                yield f'{self.name}_bucket', {**labels, 'le': _format_value(bound)}, cumulative
+            yield f'{self.name}_sum', labels, counts[-1]
+            yield f'{self.name}_count', labels, cumulative
+
+
+class Registry:
+    """Metrics of the process plus collectors that read other components' stats at scrape time"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Iterable[Sample]]]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, Iterable[Sample]]]]) -> None:
+        """``collector`` yields ``(name, type, help, samples)`` families; it must be cheap and must not block"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        families = [(metric.name, metric.kind, metric.documentation, metric.samples())
+                    for metric in list(self._metrics.values())]
+        for collector in list(self._collectors):
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logging.warning(f"Metrics collector failed: {str(e)}")
+
+        lines = []
+        for name, kind, documentation, samples in families:
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} {kind}')
+            for sample_name, labels, value in samples:
+                lines.append(f'{sample_name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    'weather_stage_seconds', 'Time spent in each stage of serving a route', ['stage']
+)
+UPSTREAM_RESPONSES = registry.counter(
+    'openweather_responses_total', 'OpenWeather responses by endpoint and HTTP status', ['endpoint', 'status']
+)
+UPSTREAM_RETRIES = registry.counter(
+    'openweather_retries_total', 'OpenWeather calls retried after an error, 429 or 5xx', ['endpoint']
+)
+REQUEST_SECONDS = registry.histogram(
+    'app_request_seconds', 'Time to serve a request by route and status', ['route', 'status']
+)
+
+
+# Длительности этапов текущего запроса, если он профилируется
+_request_stages: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar('request_stages', default=None)
+
+
+@contextmanager
+def collect_stages() -> Iterator[Dict[str, List[float]]]:
+    """Collect every ``timed`` stage of the enclosed block (and of contexts copied from it) into a dict"""
+    stages: Dict[str, List[float]] = {}
+    token = _request_stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _request_stages.reset(token)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Observe the enclosed block in ``weather_stage_seconds``; a no-op with metrics disabled"""
+    stages = _request_stages.get()
+    if not Config.METRICS_ENABLED and stages is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        if Config.METRICS_ENABLED:
+            STAGE_SECONDS.observe(elapsed, stage)
+        if stages is not None:
+            stages.setdefault(stage, []).append(elapsed)
+
+
+def authorized(authorization: Optional[str], token: Optional[str]) -> bool:
+    """Whether an ``Authorization`` header value grants access to metrics protected by ``token``"""
+    if not token:
+        return True
+    expected = f'Bearer {token}'.encode('utf-8')
+    return hmac.compare_digest((authorization or '').encode('utf-8'), expected)
+
+
+def upstream_endpoint(url: str) -> str:
+    """Metric label for an OpenWeather URL: the last path segment (``direct``, ``weather``, ``forecast``)"""
+    return url.rsplit('?', 1)[0].rstrip('/').rsplit('/', 1)[-1]
+
+
+def _cache_families() -> Iterable[Tuple[str, str, str, Iterable[Sample]]]:
+    from .geocoding_cache import get_geocoding_cache
+    from .plot_service import plot_cache
+    from .weather_cache import get_weather_cache
+
+    caches = {
+        'weather': get_weather_cache().stats(),
+        'geocoding': get_geocoding_cache().stats(),
+        'plot': plot_cache.stats(),
+    }
+    for field, kind, documentation in (('hits', 'counter', 'Cache hits'),
+                                       ('misses', 'counter', 'Cache misses'),
+                                       ('evictions', 'counter', 'Entries evicted to stay within size limits'),
+                                       ('size', 'gauge', 'Entries currently cached')):
+        name = f'cache_{field}_total' if kind == 'counter' else f'cache_{field}'
+        yield name, kind, documentation, [(name, {'cache': cache}, stats[field]) for cache, stats in caches.items()]
+
+    ratios = []
+    for cache, stats in caches.items():
+        lookups = stats['hits'] + stats['misses']
+        ratios.append(('cache_hit_ratio', {'cache': cache}, stats['hits'] / lookups if lookups else 0.0))
+    yield 'cache_hit_ratio', 'gauge', 'Share of lookups served from the cache since start', ratios
+
+    weather = caches['weather']
+    yield 'weather_cache_stale_hits_total', 'counter', 'Stale responses served while refreshing', \
+        [('weather_cache_stale_hits_total', {}, weather['stale_hits'])]
+    yield 'weather_cache_coalesced_total', 'counter', 'Upstream calls saved by sharing an in-flight call', \
+        [('weather_cache_coalesced_total', {}, weather['coalesced'])]
+
+
+def _limiter_families() -> Iterable[Tuple[str, str, str, Iterable[Sample]]]:
+    from .rate_limiter import get_rate_limiter
+
+    stats = get_rate_limiter().stats()
+    yield 'openweather_quota_waiting', 'gauge', 'Calls waiting for OpenWeather quota', \
+        [('openweather_quota_waiting', {}, stats['waiting'])]
+    yield 'openweather_quota_waited_total', 'counter', 'Calls that had to wait for quota', \
+        [('openweather_quota_waited_total', {}, stats['waited'])]
+    yield 'openweather_quota_rejected_total', 'counter', 'Calls refused for lack of quota', \
+        [('openweather_quota_rejected_total', {}, stats['rejected'])]
+
+
+registry.add_collector(_cache_families)
+registry.add_collector(_limiter_families)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        if not authorized(self.headers.get('Authorization'), self.server.token):
+            self.send_response(401)
+            self.send_header('WWW-Authenticate', 'Bearer')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # опросы Prometheus не засоряют лог
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1', token: Optional[str] = None) -> ThreadingHTTPServer:
+    """Serve ``/metrics`` from a daemon thread, for processes without Flask such as the Telegram bot.
+
+    Listens on localhost unless another ``host`` is given; with ``token`` a
+    bearer token is required, as for the app's ``/metrics``.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    server.token = token
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
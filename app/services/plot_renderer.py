@@ -0,0 +1,197 @@
+import contextvars
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Optional, Sequence
+
+import plotly
+import plotly.graph_objs as go
+import plotly.io as pio
+
+from config import Config
+from .metrics import timed
+
+try:
+    from kaleido.scopes.plotly import PlotlyScope
+except ImportError:
+    PlotlyScope = None
+
+_PLOTLYJS_PATH = os.path.join(os.path.dirname(os.path.abspath(plotly.__file__)), 'package_data', 'plotly.min.js')
+
+
+class PlotRenderTimeout(Exception):
+    """Raised when a figure is not rendered within the renderer timeout"""
+    pass
+
+
+class _Job:
+    __slots__ = ('scope', 'started')
+
+    def __init__(self):
+        self.scope = None
+        self.started: Optional[float] = None  # момент, когда рендер получил процесс
+
+
+class KaleidoRendererPool:
+    """Pool of warm kaleido subprocesses for PNG export.
+
+    ``pio.to_image`` pushes every figure through one global kaleido process
+    guarded by a lock, so concurrent renders queue up behind each other. The
+    pool keeps ``size`` independent scopes alive and hands each render to a
+    free one. The timeout applies to each render from the moment it gets a
+    subprocess, so a large batch is not failed for merely waiting in the
+    queue. A render that exceeds it gets its subprocess killed and replaced
+    on next use.
+
+    kaleido 0.2 has no public API to stop a subprocess. Its ``_proc`` and
+    ``_shutdown_kaleido`` are looked up defensively, and the version is
+    pinned in ``requirements.txt``.
+    """
+
+    def __init__(self, size: int, timeout: float):
+        self.size = size
+        self.timeout = timeout
+        self._scopes: queue.Queue = queue.Queue()
+        for _ in range(size):
+            self._scopes.put(None)  # Процессы создаются лениво или при прогреве
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix='kaleido')
+
+    @staticmethod
+    def _new_scope():
+        return PlotlyScope(plotlyjs=_PLOTLYJS_PATH, mathjax=False)
+
+    @staticmethod
+    def _kill(scope) -> None:
+        """Kill the subprocess from another thread; the render blocked on it fails at once"""
+        proc = getattr(scope, '_proc', None)
+        try:
+            if proc is not None and proc.poll() is None:
+                proc.kill()
+                proc.wait(timeout=2)  # иначе _shutdown_kaleido ещё считает процесс живым и пишет в закрытый канал
+        except Exception as e:
+            logging.warning(f"Failed to kill kaleido process: {str(e)}")
+
+    @staticmethod
+    def _close(scope) -> None:
+        shutdown = getattr(scope, '_shutdown_kaleido', None)
+        try:
+            if shutdown is not None:
+                shutdown()
+        except Exception as e:
+            logging.warning(f"Failed to stop kaleido process: {str(e)}")
+
+    def _render_one(self, job: _Job, fig_dict: dict, fmt: str) -> bytes:
+        scope = self._scopes.get()
+        try:
+            if scope is None:
+                scope = self._new_scope()
+            job.scope = scope
+            job.started = time.monotonic()
+            with timed('plot_render'):
+                image = scope.transform(fig_dict, format=fmt)
+        except BaseException:
+            # Процесс мог зависнуть или быть убит по таймауту: заменяем его
+            if scope is not None:
+                self._close(scope)
+            self._scopes.put(None)
+            raise
+        self._scopes.put(scope)
+        return image
+
+    def _result(self, job: _Job, future, timeout: float) -> bytes:
+        """Wait for a render, counting the timeout only from the moment it got a subprocess"""
+        while True:
+            remaining = timeout if job.started is None else job.started + timeout - time.monotonic()
+            if remaining <= 0:
+                raise FutureTimeoutError()
+            try:
+                return future.result(timeout=max(remaining, 0.001))
+            except FutureTimeoutError:
+                continue
+
+    def render_many(self, figures: Sequence[go.Figure], fmt: str = 'png', timeout: Optional[float] = None) -> List[bytes]:
+        """Render all figures in one pass over the pool, preserving order"""
+        if PlotlyScope is None:
+            images = []
+            for fig in figures:
+                with timed('plot_render'):
+                    images.append(pio.to_image(fig, format=fmt))
+            return images
+
+        timeout = self.timeout if timeout is None else timeout
+        jobs = []
+        for fig in figures:
+            job = _Job()
+            # Копия контекста: тайминги рендера попадают в профиль запроса
+            jobs.append((job, self._executor.submit(contextvars.copy_context().run, self._render_one, job,
+                                                    fig.to_dict(), fmt)))
+
+        images = []
+        for job, future in jobs:
+            try:
+                images.append(self._result(job, future, timeout))
+            except FutureTimeoutError:
+                self._kill(job.scope)
+                # Ждущие в очереди рендеры не запускаем; уже идущие доработают и вернут процессы в пул
+                for _, pending in jobs:
+                    pending.cancel()
+                raise PlotRenderTimeout(f"Plot rendering exceeded {timeout} s")
+        return images
+
+    def render(self, fig: go.Figure, fmt: str = 'png') -> bytes:
+        return self.render_many([fig], fmt)[0]
+
+    def _warm_one(self, fig_dict: dict) -> None:
+        scope = self._scopes.get()
+        try:
+            if scope is None:
+                scope = self._new_scope()
+            scope.transform(fig_dict, format='png')
+        except BaseException:
+            if scope is not None:
+                self._close(scope)
+            self._scopes.put(None)
+            raise
+        # Прогретый процесс сразу возвращается в пул и доступен запросам
+        self._scopes.put(scope)
+
+    def warm_up(self) -> None:
+        """Start the kaleido subprocesses in parallel by rendering a tiny figure on each"""
+        if PlotlyScope is None:
+            return
+        started = time.monotonic()
+        fig_dict = go.Figure().to_dict()
+        for future in [self._executor.submit(self._warm_one, fig_dict) for _ in range(self.size)]:
+            future.result()
+        logging.info(f"Warmed up {self.size} kaleido renderers in {time.monotonic() - started:.2f}s")
+
+
+_pool: Optional[KaleidoRendererPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_renderer_pool() -> KaleidoRendererPool:
+    """Process-wide renderer pool sized from ``Config``"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = KaleidoRendererPool(
+                    size=Config.PLOT_RENDERER_WORKERS or os.cpu_count() or 1,
+                    timeout=Config.PLOT_RENDERER_TIMEOUT
+                )
+    return _pool
+
+
+def warm_up_renderer_pool() -> None:
+    """Warm the pool in the background so application startup is not delayed"""
+    def warm_up():
+        try:
+            get_renderer_pool().warm_up()
+        except Exception as e:
+            logging.error(f"Kaleido warm-up failed: {str(e)}")
+
+    threading.Thread(target=warm_up, name='kaleido-warm-up', daemon=True).start()
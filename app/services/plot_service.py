@@ -1,27 +1,118 @@
+import hashlib
+import json
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
 import plotly.graph_objs as go
-import plotly.io as pio
 import base64
-from flask_babel import gettext as _
+from flask_babel import gettext as _, get_locale
 
+from config import Config
+from .cache import MISSING, SizedLRUCache
+from .plot_renderer import get_renderer_pool
+from .singleflight import SingleFlight
 
-def create_weather_plot_wind(dates, wind_speeds):
+# Режимы отрисовки: PNG на сервере или данные рядов для Plotly.js в браузере
+PLOT_MODE_PNG = 'png'
+PLOT_MODE_JSON = 'json'
+PLOT_MODES = (PLOT_MODE_PNG, PLOT_MODE_JSON)
+
+# Готовые картинки по хэшу содержимого графика: прогноз города не меняется до 3 часов
+plot_cache = SizedLRUCache(
+    max_size=Config.PLOT_CACHE_SIZE,
+    max_bytes=Config.PLOT_CACHE_MAX_BYTES,
+    ttl=Config.PLOT_CACHE_TTL
+)
+_inflight = SingleFlight()
+
+
+def _plot_key(kind: str, dates, values) -> str:
+    """Content address of a plot: kind, locale and the plotted series"""
+    payload = json.dumps([kind, str(get_locale()), list(dates), np.asarray(values, dtype=np.float64).tolist()], ensure_ascii=False)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _render(fig: go.Figure) -> str:
+    img_bytes = get_renderer_pool().render(fig)
+    img_base64 = base64.b64encode(img_bytes).decode('utf-8')
+    return img_base64
+
+
+def _cached_render(kind: str, dates, values, build: Callable[[], go.Figure]) -> str:
+    key = _plot_key(kind, dates, values)
+    img_base64 = plot_cache.get(key)
+    if img_base64 is not MISSING:
+        return img_base64
+
+    def render():
+        image = _render(build())
+        plot_cache.set(key, image)
+        return image
+
+    return _inflight.do(key, render)
+
+
+def _build_wind_figure(dates, wind_speeds) -> go.Figure:
     fig = go.Figure()
 
     fig.add_trace(go.Scatter(x=dates, y=wind_speeds, mode='lines+markers', name='Wind Speed (m/s)'))
 
     fig.update_layout(xaxis_title=_('Date'), yaxis_title=_('Value, (m/s)'), title='')
+    return fig
 
-    img_bytes = pio.to_image(fig, format='png')
-    img_base64 = base64.b64encode(img_bytes).decode('utf-8')
-    return img_base64
 
-def create_weather_plot_temp(dates, temperatures):
+def _build_temp_figure(dates, temperatures) -> go.Figure:
     fig = go.Figure()
 
     fig.add_trace(go.Scatter(x=dates, y=temperatures, mode='lines+markers', name='Temperature (°C)', line=dict(color='red')))
 
     fig.update_layout(xaxis_title=_('Date'), yaxis_title=_('Value, (°C)'), title='')
+    return fig
 
-    img_bytes = pio.to_image(fig, format='png')
-    img_base64 = base64.b64encode(img_bytes).decode('utf-8')
-    return img_base64
\ No newline at end of file
+
+_FIGURE_BUILDERS = {
+    'temp': _build_temp_figure,
+    'wind': _build_wind_figure,
+}
+
+
+def create_weather_plots(plots: Sequence[Tuple[str, Sequence, Sequence]]) -> List[str]:
+    """Render a batch of ``(kind, dates, values)`` plots, e.g. every plot of a request.
+
+    Cached plots are returned as is; the rest are rasterized together in one
+    pass over the renderer pool.
+    """
+    keys = [_plot_key(kind, dates, values) for kind, dates, values in plots]
+    images = [plot_cache.get(key) for key in keys]
+
+    # Одинаковые графики в пакете (например, повторённый город) рисуем один раз
+    missing = {}
+    for i, image in enumerate(images):
+        if image is MISSING:
+            missing.setdefault(keys[i], i)
+    if not missing:
+        return images
+
+    figures = [_FIGURE_BUILDERS[plots[i][0]](plots[i][1], plots[i][2]) for i in missing.values()]
+    rendered = {}
+    for key, img_bytes in zip(missing, get_renderer_pool().render_many(figures)):
+        rendered[key] = base64.b64encode(img_bytes).decode('utf-8')
+        plot_cache.set(key, rendered[key])
+    return [rendered[key] if image is MISSING else image for key, image in zip(keys, images)]
+
+
+def create_weather_plot_wind(dates, wind_speeds):
+    return _cached_render('wind', dates, wind_speeds, lambda: _build_wind_figure(dates, wind_speeds))
+
+
+def create_weather_plot_temp(dates, temperatures):
+    return _cached_render('temp', dates, temperatures, lambda: _build_temp_figure(dates, temperatures))
+
+
+def create_weather_plot_series(dates, temperatures, wind_speeds) -> dict:
+    """Compact series for client-side rendering; both plots share the date axis"""
+    return {
+        'dates': list(dates),
+        'temp': np.round(np.asarray(temperatures, dtype=np.float64), 1).tolist(),
+        'wind': np.round(np.asarray(wind_speeds, dtype=np.float64), 1).tolist(),
+    }
@@ -0,0 +1,184 @@
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from config import Config
+from .geocoding_cache import normalize_city_name
+from .rate_limiter import Priority, request_priority
+from .weather_service import WeatherService
+
+
+class DecayingCounter:
+    """Request counts that halve every ``half_life`` seconds, so recent popularity wins.
+
+    Keeps at most ``max_keys`` keys; when full, the least popular half is dropped.
+    """
+
+    def __init__(self, half_life: float, max_keys: int = 10000, clock: Callable[[], float] = time.time):
+        self.half_life = half_life
+        self.max_keys = max_keys
+        self.clock = clock
+        self._scores: Dict[Hashable, Tuple[float, float]] = {}  # ключ -> (счёт, момент последнего обновления)
+        self._lock = threading.Lock()
+
+    def _decayed(self, score: float, updated_at: float, now: float) -> float:
+        return score * math.pow(2.0, -(now - updated_at) / self.half_life)
+
+    def hit(self, key: Hashable, weight: float = 1.0) -> None:
+        now = self.clock()
+        with self._lock:
+            score, updated_at = self._scores.get(key, (0.0, now))
+            self._scores[key] = (self._decayed(score, updated_at, now) + weight, now)
+            if len(self._scores) > self.max_keys:
+                ranked = sorted(self._scores.items(), key=lambda item: self._decayed(*item[1], now), reverse=True)
+                self._scores = dict(ranked[:self.max_keys // 2])
+
+    def top(self, n: int) -> List[Tuple[Hashable, float]]:
+        """The ``n`` most popular keys with their current scores, most popular first"""
+        now = self.clock()
+        with self._lock:
+            scores = [(key, self._decayed(score, updated_at, now)) for key, (score, updated_at) in self._scores.items()]
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores[:n]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._scores
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+class PrefetchScheduler:
+    """Keep the weather of popular cities warm in the response cache.
+
+    Routes report requested cities with ``record``. Every ``interval`` seconds
+    the ``top_n`` cities by decayed request count get their current weather
+    and forecast re-fetched if they expire within ``lead_time`` seconds. At
+    most ``calls_per_minute`` upstream calls per minute are spent on this;
+    cities that do not fit wait for the next round. Each process runs its own
+    scheduler.
+    """
+
+    # Геокодирование обычно из кэша, поэтому город стоит не больше двух вызовов
+    CALLS_PER_CITY = 2
+
+    def __init__(self, weather_service: Optional[WeatherService] = None, counter: Optional[DecayingCounter] = None,
+                 top_n: int = 20, interval: float = 60, lead_time: float = 120, calls_per_minute: float = 12,
+                 clock: Callable[[], float] = time.time):
+        self.weather_service = weather_service or WeatherService()
+        # Пустой счётчик ложен из-за __len__, поэтому сравниваем с None
+        self.counter = counter if counter is not None else DecayingCounter(half_life=60 * 60, clock=clock)
+        self.top_n = top_n
+        self.interval = interval
+        self.lead_time = lead_time
+        self.calls_per_minute = calls_per_minute
+        self.clock = clock
+        self.prefetched = 0
+        self.upstream_calls = 0
+        self.deferred = 0
+        self._names: Dict[Hashable, str] = {}  # ключ счётчика -> название города, как его ввёл пользователь
+        self._names_lock = threading.Lock()
+        self._window_start = clock()
+        self._window_calls = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    def record(self, cities: Iterable[str], lang: str) -> None:
+        """Count a user request for each of ``cities``"""
+        for city in cities:
+            key = (normalize_city_name(city), lang)
+            with self._names_lock:
+                self._names.setdefault(key, city)
+            self.counter.hit(key)
+
+        # Счётчик вытесняет непопулярные города; вместе с ними забываем и их названия
+        if len(self._names) > len(self.counter):
+            with self._names_lock:
+                self._names = {key: name for key, name in self._names.items() if key in self.counter}
+
+    def _budget(self) -> float:
+        now = self.clock()
+        if now - self._window_start >= 60:
+            self._window_start = now
+            self._window_calls = 0
+        return self.calls_per_minute - self._window_calls
+
+    def run_once(self) -> int:
+        """One prefetch round; returns the number of upstream calls made"""
+        with request_priority(Priority.BACKGROUND):
+            calls = self._prefetch_top()
+        self.upstream_calls += calls
+        return calls
+
+    def _prefetch_top(self) -> int:
+        calls = 0
+        for key, _score in self.counter.top(self.top_n):
+            if self._budget() < self.CALLS_PER_CITY:
+                self.deferred += 1
+                continue
+            city = self._names.get(key)
+            if city is None:
+                continue
+            # Квота списывается до вызова: сбой посреди обновления тоже мог потратить запросы
+            self._window_calls += self.CALLS_PER_CITY
+            try:
+                made = self.weather_service.prefetch_city(city, key[1], self.lead_time)
+            except Exception as e:
+                logging.warning(f"Prefetch of {city} failed: {str(e)}")
+                continue
+            if made:
+                self.prefetched += 1
+            self._window_calls += made - self.CALLS_PER_CITY
+            calls += made
+        return calls
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logging.error(f"Prefetch round failed: {str(e)}")
+
+    def start(self) -> None:
+        """Start the background thread unless it is already running; cheap to call on every request"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, name='weather-prefetch', daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'tracked': len(self.counter),
+            'prefetched': self.prefetched,
+            'upstream_calls': self.upstream_calls,
+            'deferred': self.deferred,
+        }
+
+
+_scheduler: Optional[PrefetchScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_prefetch_scheduler() -> PrefetchScheduler:
+    """Process-wide scheduler configured from ``Config``; ``create_app`` starts its thread on the first request"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = PrefetchScheduler(
+                    counter=DecayingCounter(half_life=Config.PREFETCH_HALF_LIFE),
+                    top_n=Config.PREFETCH_TOP_N,
+                    interval=Config.PREFETCH_INTERVAL,
+                    lead_time=Config.PREFETCH_LEAD_TIME,
+                    calls_per_minute=Config.OPENWEATHER_CALLS_PER_MINUTE * Config.PREFETCH_QUOTA_SHARE
+                )
+    return _scheduler
@@ -0,0 +1,174 @@
+import contextvars
+import cProfile
+import functools
+import glob
+import hmac
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+from typing import Callable, Dict, List, Optional
+
+from flask import Flask, Request, g
+
+from .metrics import collect_stages
+
+# Сколько самых дорогих функций попадает в JSON-сводку
+TOP_FUNCTIONS = 20
+
+# Профилируются только страницы погоды: у потоковых ответов и API профиль охватил бы лишь первый байт
+PROFILED_ENDPOINTS = frozenset({'weather.weather'})
+
+
+def profiling_requested(app: Flask, request: Request) -> bool:
+    """Whether the client asked to profile this request with ``X-Profile`` or ``?profile=``.
+
+    Honoured only with ``PROFILING_ENABLED`` or in debug mode. When
+    ``PROFILING_TOKEN`` is set the value must match it, otherwise ``1`` or ``true``.
+    """
+    if not (app.config['PROFILING_ENABLED'] or app.debug):
+        return False
+    value = request.headers.get('X-Profile') or request.args.get('profile')
+    if not value:
+        return False
+    token = app.config['PROFILING_TOKEN']
+    if token:
+        return hmac.compare_digest(value.encode('utf-8'), token.encode('utf-8'))
+    return value.lower() in ('1', 'true')
+
+
+def profiling_sampled(app: Flask) -> bool:
+    """Whether this request falls into the ``PROFILING_SAMPLE_RATE`` share of always-profiled requests"""
+    rate = app.config['PROFILING_SAMPLE_RATE']
+    return rate > 0 and random.random() < rate
+
+
+def current_profile() -> Optional['RequestProfile']:
+    """Profile of the current request, or None when it is not profiled"""
+    return g.get('request_profile')
+
+
+def prune_profiles(directory: str, keep: int) -> None:
+    """Delete the oldest profiles so that at most ``keep`` remain in ``directory``"""
+    summaries = sorted(glob.glob(os.path.join(directory, '*.json')), key=os.path.getmtime, reverse=True)
+    for summary in summaries[keep:]:
+        for path in (summary, summary[:-len('.json')] + '.prof'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class RequestProfile:
+    """cProfile run and per-stage timings of one request, written to ``<directory>/<id>.prof`` and ``<id>.json``"""
+
+    def __init__(self, sampled: bool = False):
+        self.id = uuid.uuid4().hex
+        self.sampled = sampled
+        self.stages: Dict[str, List[float]] = {}
+        self._profiler: Optional[cProfile.Profile] = cProfile.Profile()
+        self._worker_profilers: List[cProfile.Profile] = []
+        self._workers_lock = threading.Lock()
+        self._stack = ExitStack()
+        self._started = 0.0
+
+    def start(self) -> None:
+        self.stages = self._stack.enter_context(collect_stages())
+        self._started = time.perf_counter()
+        try:
+            self._profiler.enable()
+        except ValueError as e:
+            # В потоке уже работает другой профилировщик: остаются только тайминги этапов
+            logging.warning(f"Request {self.id} is not profiled with cProfile: {str(e)}")
+            self._profiler = None
+
+    def wrap(self, fn: Callable) -> Callable:
+        """Run ``fn`` in a worker thread under its own profiler, merged into this profile when written.
+
+        Call it in the request thread: the stage timings of the worker reach
+        this request through a copy of the caller's context.
+        """
+        context = contextvars.copy_context()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                return context.run(fn, *args, **kwargs)
+            try:
+                return context.run(fn, *args, **kwargs)
+            finally:
+                profiler.disable()
+                with self._workers_lock:
+                    self._worker_profilers.append(profiler)
+
+        return wrapper
+
+    def stop(self) -> float:
+        """Stop profiling; returns the request duration in seconds"""
+        duration = time.perf_counter() - self._started
+        if self._profiler is not None:
+            self._profiler.disable()
+        self._stack.close()
+        return duration
+
+    def stage_summary(self) -> Dict[str, dict]:
+        return {
+            stage: {'calls': len(samples), 'total_ms': sum(samples) * 1000, 'max_ms': max(samples) * 1000}
+            for stage, samples in sorted(self.stages.items(), key=lambda item: -sum(item[1]))
+        }
+
+    def _stats(self) -> Optional[pstats.Stats]:
+        """Request thread and worker threads together"""
+        # Потоки работают одновременно, поэтому сумма времени функций может превышать длительность запроса
+        profilers = ([self._profiler] if self._profiler is not None else []) + self._worker_profilers
+        return pstats.Stats(*profilers) if profilers else None
+
+    def top_functions(self, stats: Optional[pstats.Stats], limit: int = TOP_FUNCTIONS) -> List[dict]:
+        if stats is None:
+            return []
+        stats.sort_stats(pstats.SortKey.CUMULATIVE)
+        rows = []
+        for func in stats.fcn_list[:limit]:
+            _, calls, own, cumulative, _ = stats.stats[func]
+            rows.append({'function': pstats.func_std_string(func), 'calls': calls,
+                         'own_ms': own * 1000, 'cumulative_ms': cumulative * 1000})
+        return rows
+
+    def write(self, directory: str, method: str, path: str, status: int, duration: float,
+              keep: Optional[int] = None) -> str:
+        """Write the profile and its JSON summary; returns the summary path.
+
+        With ``keep`` the oldest profiles beyond that number are deleted.
+        """
+        os.makedirs(directory, exist_ok=True)
+        stats = self._stats()
+        summary = {
+            'id': self.id,
+            'method': method,
+            'path': path,
+            'status': status,
+            'sampled': self.sampled,
+            'duration_ms': duration * 1000,
+            'stages': self.stage_summary(),
+            'worker_threads': len(self._worker_profilers),
+            'top_functions': self.top_functions(stats),
+            'profile': None,
+        }
+        if stats is not None:
+            summary['profile'] = os.path.join(directory, f'{self.id}.prof')
+            stats.dump_stats(summary['profile'])
+
+        summary_path = os.path.join(directory, f'{self.id}.json')
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        if keep is not None:
+            prune_profiles(directory, keep)
+        return summary_path
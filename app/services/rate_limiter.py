@@ -0,0 +1,237 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from config import Config
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call cannot get an OpenWeather quota slot in time or the wait queue is full"""
+    pass
+
+
+class Priority(IntEnum):
+    """Lanes of the limiter queue; lower values are served first"""
+    INTERACTIVE = 0  # запросы пользователей: страница, API, бот
+    BACKGROUND = 1  # фоновое обновление кэша
+    BATCH = 2  # пакетная проверка маршрутов
+
+
+_priority: ContextVar[Priority] = ContextVar('openweather_priority', default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """Run the enclosed OpenWeather calls in the given lane.
+
+    The lane is a context variable: threads started inside the block do not
+    inherit it and have to enter the lane themselves.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+def is_throttled(error: BaseException) -> bool:
+    """Whether ``error`` was caused by ``RateLimitExceeded``, however many times it was re-wrapped"""
+    while error is not None:
+        if isinstance(error, RateLimitExceeded):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class TokenBucket:
+    """``capacity`` tokens refilled continuously at ``rate`` tokens per second"""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated_at = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available; 0 if one is available now"""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+class _Lane:
+    """Buckets of one endpoint and the callers waiting on them, ordered by priority then arrival"""
+
+    def __init__(self, buckets: List[TokenBucket]):
+        self.buckets = buckets
+        self.waiting: List[Tuple[int, int]] = []  # куча (приоритет, номер в очереди)
+
+    def wait_time(self) -> float:
+        return max(bucket.wait_time() for bucket in self.buckets)
+
+
+class RateLimiter:
+    """Token-bucket limiter shared by all OpenWeather clients of the process.
+
+    Every endpoint (``geo``, ``weather``, ``forecast``) has a per-minute and,
+    optionally, a per-day bucket; a call takes one token from each. Callers
+    that find no token wait in a queue ordered by ``Priority`` lane, so
+    interactive requests get the next token ahead of background and batch
+    work. At most ``max_waiting`` callers wait at once, each for at most
+    ``max_wait`` seconds (``background_max_wait`` in the background and batch
+    lanes); beyond that ``RateLimitExceeded`` is raised.
+    """
+
+    # Асинхронные вызовы не будятся условием и опрашивают очередь с этим шагом
+    ASYNC_POLL_INTERVAL = 0.05
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]], max_waiting: int = 100, max_wait: float = 10,
+                 background_max_wait: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.max_waiting = max_waiting
+        self.max_wait = max_wait
+        self.background_max_wait = max_wait if background_max_wait is None else background_max_wait
+        self.clock = clock
+        self.lanes: Dict[str, _Lane] = {}
+        for endpoint, (per_minute, per_day) in limits.items():
+            buckets = [TokenBucket(per_minute / 60, per_minute, clock)]
+            if per_day:
+                buckets.append(TokenBucket(per_day / (24 * 60 * 60), per_day, clock))
+            self.lanes[endpoint] = _Lane(buckets)
+        self.waited = 0
+        self.rejected = 0
+        self._waiting = 0
+        self._tickets = itertools.count()
+        self._condition = threading.Condition()
+
+    def _max_wait(self, priority: Priority) -> float:
+        # Фоновая и пакетная работа меняет задержку на полноту: ждёт дольше пользовательских запросов
+        return self.max_wait if priority == Priority.INTERACTIVE else self.background_max_wait
+
+    def _enqueue(self, lane: _Lane, priority: Priority) -> Tuple[int, int]:
+        if self._waiting >= self.max_waiting:
+            self.rejected += 1
+            raise RateLimitExceeded("Too many calls are waiting for the OpenWeather quota")
+        ticket = (int(priority), next(self._tickets))
+        heapq.heappush(lane.waiting, ticket)
+        self._waiting += 1
+        return ticket
+
+    def _dequeue(self, lane: _Lane, ticket: Tuple[int, int]) -> None:
+        lane.waiting.remove(ticket)
+        heapq.heapify(lane.waiting)
+        self._waiting -= 1
+        self._condition.notify_all()
+
+    def _try_take(self, lane: _Lane, ticket: Tuple[int, int]) -> Optional[float]:
+        """Take the tokens if ``ticket`` is first in line; otherwise seconds to wait (``None`` — not our turn)"""
+        if lane.waiting[0] != ticket:
+            return None
+        wait = lane.wait_time()
+        if wait:
+            return wait
+        for bucket in lane.buckets:
+            bucket.take()
+        self._dequeue(lane, ticket)
+        return 0.0
+
+    def _give_up(self, lane: _Lane, ticket: Tuple[int, int], endpoint: str, max_wait: float) -> None:
+        self._dequeue(lane, ticket)
+        self.rejected += 1
+        raise RateLimitExceeded(f"No OpenWeather quota for {endpoint} within {max_wait} seconds")
+
+    def acquire(self, endpoint: str, priority: Optional[Priority] = None) -> None:
+        """Block until the endpoint's quota allows one more call; raises ``RateLimitExceeded``"""
+        lane = self.lanes.get(endpoint)
+        if lane is None:
+            return
+        priority = current_priority() if priority is None else priority
+        max_wait = self._max_wait(priority)
+        deadline = self.clock() + max_wait
+        with self._condition:
+            ticket = self._enqueue(lane, priority)
+            waited = False
+            while True:
+                wait = self._try_take(lane, ticket)
+                if wait == 0:
+                    self.waited += int(waited)
+                    return
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    self._give_up(lane, ticket, endpoint, max_wait)
+                waited = True
+                self._condition.wait(remaining if wait is None else min(wait, remaining))
+
+    async def acquire_async(self, endpoint: str, priority: Optional[Priority] = None) -> None:
+        """``acquire`` for the event loop: waits with ``asyncio.sleep`` instead of blocking the thread"""
+        lane = self.lanes.get(endpoint)
+        if lane is None:
+            return
+        priority = current_priority() if priority is None else priority
+        max_wait = self._max_wait(priority)
+        deadline = self.clock() + max_wait
+        with self._condition:
+            ticket = self._enqueue(lane, priority)
+        waited = False
+        while True:
+            with self._condition:
+                wait = self._try_take(lane, ticket)
+                if wait == 0:
+                    self.waited += int(waited)
+                    return
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    self._give_up(lane, ticket, endpoint, max_wait)
+            waited = True
+            try:
+                await asyncio.sleep(min(self.ASYNC_POLL_INTERVAL, remaining))
+            except asyncio.CancelledError:
+                # Отменённая задача не должна держать очередь
+                with self._condition:
+                    self._dequeue(lane, ticket)
+                raise
+
+    def stats(self) -> Dict[str, int]:
+        return {'waiting': self._waiting, 'waited': self.waited, 'rejected': self.rejected}
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter configured from ``Config``"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(
+                    limits={
+                        'geo': (Config.RATE_LIMIT_GEO_PER_MINUTE, Config.RATE_LIMIT_GEO_PER_DAY),
+                        'weather': (Config.RATE_LIMIT_WEATHER_PER_MINUTE, Config.RATE_LIMIT_WEATHER_PER_DAY),
+                        'forecast': (Config.RATE_LIMIT_FORECAST_PER_MINUTE, Config.RATE_LIMIT_FORECAST_PER_DAY),
+                    },
+                    max_waiting=Config.RATE_LIMIT_MAX_WAITING,
+                    max_wait=Config.RATE_LIMIT_MAX_WAIT,
+                    background_max_wait=Config.RATE_LIMIT_BACKGROUND_MAX_WAIT
+                )
+    return _limiter
@@ -0,0 +1,180 @@
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, NoReturn, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+from config import Config
+from .geocoding_service import GeocodingService
+from .weather_analyzer_service import ForecastAnalysis, WeatherAnalyzerService
+from .weather_service import WeatherAPIException, WeatherService
+from ..models import GeocodingResponse, OpenWeatherHourlyResponse, OpenWeatherResponse
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Ошибки запроса одной точки: точка выпадает из коридора, остальные остаются
+POINT_ERRORS = (WeatherAPIException, ValueError)
+
+
+@dataclass(frozen=True)
+class CorridorPoint:
+    lat: float
+    lon: float
+    distance_km: float  # расстояние от начала маршрута до исходной (не привязанной к сетке) точки
+
+
+class CorridorWeather(BaseModel):
+    start: GeocodingResponse
+    end: GeocodingResponse
+    distance_km: float
+    points: List[CorridorPoint]
+    weather: List[OpenWeatherResponse]
+    analysis: ForecastAnalysis  # timeline идёт по точкам маршрута, а не по времени
+    skipped: int = 0  # точки, погоду для которых получить не удалось
+
+
+def _unit_vector(lat: float, lon: float) -> np.ndarray:
+    lat, lon = math.radians(lat), math.radians(lon)
+    return np.array([math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat)])
+
+
+def great_circle_distance_km(start: Tuple[float, float], end: Tuple[float, float]) -> float:
+    a, b = _unit_vector(*start), _unit_vector(*end)
+    return EARTH_RADIUS_KM * math.atan2(np.linalg.norm(np.cross(a, b)), float(np.dot(a, b)))
+
+
+def sample_great_circle(start: Tuple[float, float], end: Tuple[float, float],
+                        spacing_km: float, max_points: int) -> List[CorridorPoint]:
+    """Evenly spaced points on the great circle from ``start`` to ``end``, both included.
+
+    Spacing is widened when the route would otherwise need more than
+    ``max_points`` samples, so the number of points is bounded.
+    """
+    distance = great_circle_distance_km(start, end)
+    segments = min(max(1, math.ceil(distance / spacing_km)), max(1, max_points - 1))
+
+    a, b = _unit_vector(*start), _unit_vector(*end)
+    omega = distance / EARTH_RADIUS_KM
+    fractions = np.linspace(0.0, 1.0, segments + 1)
+    if omega < 1e-9:
+        vectors = np.repeat(a[np.newaxis, :], len(fractions), axis=0)
+    else:
+        # Сферическая линейная интерполяция между концами маршрута
+        weights_a = np.sin((1 - fractions) * omega) / math.sin(omega)
+        weights_b = np.sin(fractions * omega) / math.sin(omega)
+        vectors = weights_a[:, np.newaxis] * a + weights_b[:, np.newaxis] * b
+
+    lats = np.degrees(np.arcsin(np.clip(vectors[:, 2], -1.0, 1.0)))
+    lons = np.degrees(np.arctan2(vectors[:, 1], vectors[:, 0]))
+    return [
+        CorridorPoint(lat=float(lat), lon=float(lon), distance_km=float(fraction * distance))
+        for lat, lon, fraction in zip(lats, lons, fractions)
+    ]
+
+
+def snap_to_grid(points: Sequence[CorridorPoint], grid_deg: float) -> List[CorridorPoint]:
+    """Move points to the centres of ``grid_deg`` cells and drop points that land in an already used cell"""
+    snapped = []
+    seen = set()
+    for point in points:
+        cell = (math.floor(point.lat / grid_deg), math.floor(point.lon / grid_deg))
+        if cell in seen:
+            continue
+        seen.add(cell)
+        snapped.append(CorridorPoint(
+            lat=round((cell[0] + 0.5) * grid_deg, 6),
+            lon=round((cell[1] + 0.5) * grid_deg, 6),
+            distance_km=point.distance_km
+        ))
+    return snapped
+
+
+def plan_corridor(start: GeocodingResponse, end: GeocodingResponse, spacing_km: Optional[float] = None,
+                  grid_deg: Optional[float] = None, max_points: Optional[int] = None) -> List[CorridorPoint]:
+    """Grid-snapped waypoints between two geocoded places, settings defaulting to ``Config``.
+
+    The number of points also stays within the per-minute ``weather`` quota
+    left after the current weather of both cities.
+    """
+    max_points = min(max_points or Config.CORRIDOR_MAX_POINTS, max(2, Config.RATE_LIMIT_WEATHER_PER_MINUTE - 2))
+    points = sample_great_circle(
+        (start.lat, start.lon), (end.lat, end.lon),
+        spacing_km=spacing_km or Config.CORRIDOR_SPACING_KM,
+        max_points=max_points
+    )
+    return snap_to_grid(points, grid_deg or Config.CORRIDOR_GRID_DEG)
+
+
+def drop_failed_points(points: Sequence[CorridorPoint], results: Sequence[Union[OpenWeatherResponse, BaseException]]
+                       ) -> Tuple[List[CorridorPoint], List[OpenWeatherResponse]]:
+    """Keep the waypoints whose weather was fetched; ``results`` holds a response or the point's exception.
+
+    Exceptions other than ``POINT_ERRORS`` are re-raised, and so is the first
+    error when no waypoint could be fetched at all.
+    """
+    kept_points, weather, errors = [], [], []
+    for point, result in zip(points, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, POINT_ERRORS):
+                raise result
+            errors.append(result)
+            continue
+        kept_points.append(point)
+        weather.append(result)
+
+    if errors:
+        if not weather:
+            raise errors[0]
+        logging.warning(f"Corridor weather skipped for {len(errors)} of {len(points)} points: {str(errors[0])}")
+    return kept_points, weather
+
+
+def analyze_corridor(analyzer: WeatherAnalyzerService, weather: List[OpenWeatherResponse]) -> ForecastAnalysis:
+    """Run the vectorized rules over all waypoints at once; the timeline is indexed by waypoint"""
+    return analyzer.analyze_forecast(OpenWeatherHourlyResponse(cod='200', cnt=len(weather), list=weather))
+
+
+class RouteCorridorService:
+    """Weather along the great-circle path between two cities, not just at its ends"""
+
+    def __init__(self, weather_service: Optional[WeatherService] = None,
+                 geocoding_service: Optional[GeocodingService] = None,
+                 analyzer: Optional[WeatherAnalyzerService] = None):
+        self.weather_service = weather_service or WeatherService()
+        self.geocoding_service = geocoding_service or GeocodingService()
+        self.analyzer = analyzer or WeatherAnalyzerService()
+
+    def get_corridor_weather(self, start_city: str, end_city: str, lang: str = 'en',
+                             spacing_km: Optional[float] = None) -> CorridorWeather | NoReturn:
+        """Geocode both ends, sample the corridor and fetch every waypoint concurrently.
+
+        Waypoints whose weather cannot be fetched, e.g. for lack of quota, are
+        left out. Raises the geocoding and weather service exceptions unchanged.
+        """
+        start = self.geocoding_service.get_coordinates_by_city_name(start_city)
+        end = self.geocoding_service.get_coordinates_by_city_name(end_city)
+        points = plan_corridor(start, end, spacing_km)
+
+        def fetch(point: CorridorPoint) -> Union[OpenWeatherResponse, BaseException]:
+            try:
+                return self.weather_service.get_weather_by_coordinates(point.lat, point.lon, lang)
+            except POINT_ERRORS as e:
+                return e
+
+        max_workers = max(1, min(Config.WEATHER_MAX_WORKERS, len(points)))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='corridor') as executor:
+            results = list(executor.map(fetch, points))
+        fetched_points, weather = drop_failed_points(points, results)
+
+        return CorridorWeather(
+            start=start,
+            end=end,
+            distance_km=great_circle_distance_km((start.lat, start.lon), (end.lat, end.lon)),
+            points=fetched_points,
+            weather=weather,
+            analysis=analyze_corridor(self.analyzer, weather),
+            skipped=len(points) - len(fetched_points)
+        )
@@ -1,11 +1,18 @@
+import os
+import threading
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional, List
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, NamedTuple, Optional, List, Tuple, Union
 
-from flask_babel import gettext as _
+import numpy as np
+from babel.support import Translations
+from flask_babel import gettext as _, get_locale
 from pydantic import BaseModel
 
-from ..models import OpenWeatherResponse
+from ..models import OpenWeatherResponse, OpenWeatherHourlyResponse, HourlyForecast, precipitation_rate
+from .metrics import timed
 from .weather_service import WeatherService
 
 
@@ -55,34 +62,160 @@ class WeatherWarning(BaseModel):
     description: str
 
 
+class ForecastWindow(BaseModel):
+    start: int  # индекс первого слота прогноза
+    end: int  # индекс последнего слота (включительно)
+    start_dt: Optional[int] = None
+    end_dt: Optional[int] = None
+    severity: WeatherSeverity
+    conditions: List[str]
+
+
+class ForecastAnalysis(BaseModel):
+    severity: WeatherSeverity
+    conditions: List[str]
+    description: str
+    timeline: List[int]  # значение WeatherSeverity для каждого слота
+    worst_window: Optional[ForecastWindow] = None
+
+
+# Уровень опасности каждого условия, в том же порядке, что и проверки analyze_weather
+CONDITION_SEVERITY = {
+    "extreme_cold": WeatherSeverity.SEVERE,
+    "extreme_heat": WeatherSeverity.SEVERE,
+    "extreme_wind": WeatherSeverity.EXTREME,
+    "strong_wind": WeatherSeverity.SEVERE,
+    "extreme_rain": WeatherSeverity.EXTREME,
+    "heavy_rain": WeatherSeverity.SEVERE,
+    "extreme_snow": WeatherSeverity.EXTREME,
+    "heavy_snow": WeatherSeverity.SEVERE,
+    "poor_visibility": WeatherSeverity.SEVERE,
+}
+
+
+def N_(message: str) -> str:
+    """Mark a message for extraction; it is translated later, per locale"""
+    return message
+
+
+SEVERITY_MESSAGES = {
+    WeatherSeverity.NORMAL: N_("Weather conditions are normal."),
+    WeatherSeverity.SEVERE: N_("Caution: Adverse weather conditions detected."),
+    WeatherSeverity.EXTREME: N_("Warning: Extreme weather conditions detected!")
+}
+
+CONDITION_MESSAGES = {
+    "extreme_cold": N_("Extremely low temperature"),
+    "extreme_heat": N_("Extremely high temperature"),
+    "strong_wind": N_("Strong wind"),
+    "extreme_wind": N_("Dangerous wind speed"),
+    "heavy_rain": N_("Heavy rain"),
+    "extreme_rain": N_("Extremely heavy rain"),
+    "heavy_snow": N_("Heavy snow"),
+    "extreme_snow": N_("Extremely heavy snow"),
+    "poor_visibility": N_("Poor visibility conditions")
+}
+
+
+class WarningCatalog(NamedTuple):
+    severities: Mapping[WeatherSeverity, str]
+    conditions: Mapping[str, str]
+    detected: str
+
+
+# Переведённые тексты предупреждений по локалям: строятся один раз на локаль
+_catalogs: Dict[str, WarningCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+TRANSLATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'translations')
+
+
+def _current_locale() -> str:
+    locale = get_locale()
+    return str(locale) if locale is not None else ''
+
+
+def _translator(locale: str) -> Callable[[str], str]:
+    if locale == _current_locale():
+        return _
+    # Вне запроса с этой локалью (CLI, процессы пакетной проверки) переводы читаются из каталогов напрямую
+    return Translations.load(TRANSLATIONS_DIR, [locale]).gettext
+
+
+def get_warning_catalog(locale: Optional[str] = None) -> WarningCatalog:
+    """Immutable warning texts for ``locale`` (the current one by default), translated on first use"""
+    locale = _current_locale() if locale is None else locale
+    catalog = _catalogs.get(locale)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(locale)
+            if catalog is None:
+                gettext = _translator(locale)
+                catalog = WarningCatalog(
+                    severities=MappingProxyType({severity: gettext(text)
+                                                 for severity, text in SEVERITY_MESSAGES.items()}),
+                    conditions=MappingProxyType({condition: gettext(text)
+                                                 for condition, text in CONDITION_MESSAGES.items()}),
+                    detected=gettext('Detected conditions')
+                )
+                _catalogs[locale] = catalog
+    return catalog
+
+
+@lru_cache(maxsize=1024)
+def _description(severity: WeatherSeverity, conditions: Tuple[str, ...], locale: str) -> str:
+    catalog = _catalogs[locale]
+    description = catalog.severities[severity]
+    if conditions:
+        conditions_text = ", ".join(catalog.conditions.get(condition, "") for condition in conditions)
+        description = f"{description}\n{catalog.detected}: {conditions_text}"
+    return description
+
+
+def describe_warning(severity: WeatherSeverity, conditions: List[str], locale: Optional[str] = None) -> str:
+    """Warning text for a severity and its conditions in ``locale``; works outside a request too"""
+    locale = _current_locale() if locale is None else locale
+    get_warning_catalog(locale)
+    return _description(severity, tuple(conditions), locale)
+
+
+def _forecast_arrays(forecast: Union[HourlyForecast, OpenWeatherHourlyResponse]) -> Dict[str, np.ndarray]:
+    """Load the forecast entries into column arrays; missing values become NaN"""
+    if isinstance(forecast, HourlyForecast):
+        # Колонки уже готовы: отдаём массивы без копирования
+        return {
+            'dt': forecast.dt,
+            'temp': forecast.temp,
+            'wind': forecast.wind_speed,
+            'rain': forecast.rain,
+            'snow': forecast.snow,
+            'visibility': forecast.visibility,
+        }
+    entries = forecast.list or []
+    return {
+        'dt': np.array([entry.dt or 0 for entry in entries], dtype=np.int64),
+        'temp': np.array([entry.main.temp for entry in entries], dtype=np.float64),
+        'wind': np.array([entry.wind.speed for entry in entries], dtype=np.float64),
+        'rain': np.array([precipitation_rate(entry.rain) for entry in entries], dtype=np.float64),
+        'snow': np.array([precipitation_rate(entry.snow) for entry in entries], dtype=np.float64),
+        'visibility': np.array([entry.visibility or np.nan for entry in entries], dtype=np.float64),
+    }
+
+
 class WeatherAnalyzerService:
     def __init__(self, thresholds: Optional[WeatherThresholds] = None):
         self.thresholds = thresholds or WeatherThresholds()
 
     @staticmethod
     def _get_severity_description(severity: WeatherSeverity) -> str:
-        descriptions = {
-            WeatherSeverity.NORMAL: _("Weather conditions are normal."),
-            WeatherSeverity.SEVERE: _("Caution: Adverse weather conditions detected."),
-            WeatherSeverity.EXTREME: _("Warning: Extreme weather conditions detected!")
-        }
-        return descriptions[severity]
+        return get_warning_catalog().severities[severity]
 
     @staticmethod
     def _get_condition_description(condition: str) -> str:
-        condition_descriptions = {
-            "extreme_cold": _("Extremely low temperature"),
-            "extreme_heat": _("Extremely high temperature"),
-            "strong_wind": _("Strong wind"),
-            "extreme_wind": _("Dangerous wind speed"),
-            "heavy_rain": _("Heavy rain"),
-            "extreme_rain": _("Extremely heavy rain"),
-            "heavy_snow": _("Heavy snow"),
-            "extreme_snow": _("Extremely heavy snow"),
-            "poor_visibility": _("Poor visibility conditions")
-        }
-        return condition_descriptions.get(condition, "")
+        return get_warning_catalog().conditions.get(condition, "")
 
+    @timed('analyze_weather')
     def analyze_weather(self, weather_data: OpenWeatherResponse) -> WeatherWarning:
         conditions = []
         severity = WeatherSeverity.NORMAL
@@ -125,19 +258,87 @@ class WeatherAnalyzerService:
             conditions.append("poor_visibility")
             severity = max(severity, WeatherSeverity.SEVERE)
 
-        # Формируем детальное описание
-        detailed_conditions = [self._get_condition_description(cond) for cond in conditions]
-        description = self._get_severity_description(severity)
-        if detailed_conditions:
-            conditions_text = ", ".join(detailed_conditions)
-            description = f"{description}\n{_('Detected conditions')}: {conditions_text}"
-
         return WeatherWarning(
             severity=severity,
             conditions=conditions,
-            description=description
+            description=self._describe(severity, conditions)
         )
 
+    @staticmethod
+    def _describe(severity: WeatherSeverity, conditions: List[str]) -> str:
+        # Описание зависит только от уровня, набора условий и локали — берём из кэша
+        return describe_warning(severity, conditions)
+
+    def _condition_masks(self, arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Boolean mask per condition over all forecast slots; NaN never matches"""
+        t = self.thresholds
+        temp, wind, rain, snow, visibility = (
+            arrays['temp'], arrays['wind'], arrays['rain'], arrays['snow'], arrays['visibility']
+        )
+        extreme_wind = wind >= t.wind_speed_extreme
+        extreme_rain = rain >= t.rain_extreme
+        extreme_snow = snow >= t.snow_extreme
+        return {
+            "extreme_cold": temp < t.temp_min,
+            "extreme_heat": temp > t.temp_max,
+            "extreme_wind": extreme_wind,
+            "strong_wind": (wind >= t.wind_speed_severe) & ~extreme_wind,
+            "extreme_rain": extreme_rain,
+            "heavy_rain": (rain >= t.rain_severe) & ~extreme_rain,
+            "extreme_snow": extreme_snow,
+            "heavy_snow": (snow >= t.snow_severe) & ~extreme_snow,
+            "poor_visibility": (visibility > 0) & (visibility <= t.visibility_poor),
+        }
+
+    @timed('analyze_forecast')
+    def analyze_forecast(self, forecast: Union[HourlyForecast, OpenWeatherHourlyResponse]) -> ForecastAnalysis:
+        """Apply every threshold rule to all forecast slots at once.
+
+        Returns the per-slot severity timeline, the overall worst severity with
+        the conditions seen anywhere in the forecast, and the first longest run
+        of slots at that severity.
+        """
+        arrays = _forecast_arrays(forecast)
+        masks = self._condition_masks(arrays)
+
+        timeline = np.full(arrays['temp'].shape, WeatherSeverity.NORMAL.value, dtype=np.int8)
+        for condition, mask in masks.items():
+            np.maximum(timeline, np.where(mask, CONDITION_SEVERITY[condition].value, 0), out=timeline)
+
+        worst_value = int(timeline.max()) if timeline.size else WeatherSeverity.NORMAL.value
+        severity = WeatherSeverity(worst_value)
+        conditions = [condition for condition, mask in masks.items() if mask.any()]
+
+        worst_window = None
+        if severity > WeatherSeverity.NORMAL:
+            start, end = self._longest_run(timeline == worst_value)
+            window = slice(start, end + 1)
+            worst_window = ForecastWindow(
+                start=start,
+                end=end,
+                start_dt=int(arrays['dt'][start]) or None,
+                end_dt=int(arrays['dt'][end]) or None,
+                severity=severity,
+                conditions=[condition for condition, mask in masks.items() if mask[window].any()]
+            )
+
+        return ForecastAnalysis(
+            severity=severity,
+            conditions=conditions,
+            description=self._describe(severity, conditions),
+            timeline=timeline.tolist(),
+            worst_window=worst_window
+        )
+
+    @staticmethod
+    def _longest_run(flags: np.ndarray) -> tuple[int, int]:
+        """First longest run of True values as inclusive (start, end) indices"""
+        padded = np.concatenate(([False], flags, [False])).astype(np.int8)
+        edges = np.flatnonzero(np.diff(padded))
+        starts, ends = edges[0::2], edges[1::2]
+        longest = int(np.argmax(ends - starts))
+        return int(starts[longest]), int(ends[longest]) - 1
+
 
 if __name__ == '__main__':
     # Sample test
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from config import Config
+from . import geohash
+from .cache import LRUCache, MISSING
+from .rate_limiter import Priority, request_priority
+from .singleflight import AsyncSingleFlight, SingleFlight
+
+
+class _Entry:
+    __slots__ = ('value', 'fresh_until')
+
+    def __init__(self, value: Any, fresh_until: float):
+        self.value = value
+        self.fresh_until = fresh_until
+
+
+class WeatherResponseCache:
+    """Cache of OpenWeather responses keyed on rounded coordinates, lang and endpoint.
+
+    An entry stays fresh for the endpoint's update cadence, counted from the
+    observation time (``dt``) when the response carries one. After that it may
+    be served stale for ``stale_ttl`` seconds while a background thread
+    fetches a replacement (stale-while-revalidate). Concurrent misses for the
+    same key share a single upstream call.
+
+    With ``geohash_precision`` set, coordinates are keyed on the geohash cell
+    that contains them instead of rounded degrees, so every point of a cell
+    shares one observation, and ``nearest`` can look into neighbouring cells.
+    """
+
+    # Минимальный срок жизни, если наблюдение уже старше периода обновления
+    MIN_TTL = 60
+
+    def __init__(self, ttls: Dict[str, float], max_size: int = 2048, precision: int = 2,
+                 stale_ttl: float = 300, clock: Callable[[], float] = time.time, geohash_precision: int = 0):
+        self.ttls = ttls
+        self.precision = precision
+        self.geohash_precision = geohash_precision
+        self.nearest_hits = 0
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self.entries = LRUCache(max_size, clock=clock)
+        self.stale_hits = 0
+        self.inflight = SingleFlight()
+        self.async_inflight = AsyncSingleFlight()
+        self._refreshing: set[Hashable] = set()
+        self._refreshing_lock = threading.Lock()
+
+    def key(self, endpoint: str, lat: float, lon: float, lang: str, variant: str = '') -> Hashable:
+        """``variant`` separates different representations of one endpoint's response"""
+        if self.geohash_precision:
+            return endpoint, variant, geohash.encode(lat, lon, self.geohash_precision), lang
+        return endpoint, variant, round(lat, self.precision), round(lon, self.precision), lang
+
+    def cell_center(self, lat: float, lon: float) -> Tuple[float, float]:
+        """Coordinates to request upstream for a point: the centre of its cell, or the point itself"""
+        if self.geohash_precision:
+            return geohash.decode(geohash.encode(lat, lon, self.geohash_precision))
+        return lat, lon
+
+    def nearest(self, endpoint: str, lat: float, lon: float, lang: str, variant: str = '') -> Any:
+        """Fresh cached response of the point's cell or, failing that, of the closest neighbouring cell.
+
+        Returns ``MISSING`` when none of them holds a fresh response. Without
+        geohash keying only the point's own key is checked.
+        """
+        own = self._fresh_value(self.key(endpoint, lat, lon, lang, variant))
+        if own is not MISSING or not self.geohash_precision:
+            return own
+
+        cos_lat = math.cos(math.radians(lat))
+
+        def distance(cell: str) -> float:
+            cell_lat, cell_lon = geohash.decode(cell)
+            d_lon = (cell_lon - lon + 180) % 360 - 180
+            return (cell_lat - lat) ** 2 + (d_lon * cos_lat) ** 2
+
+        for cell in sorted(geohash.neighbors(geohash.encode(lat, lon, self.geohash_precision)), key=distance):
+            value = self._fresh_value((endpoint, variant, cell, lang))
+            if value is not MISSING:
+                self.nearest_hits += 1
+                return value
+        return MISSING
+
+    def _fresh_value(self, key: Hashable) -> Any:
+        entry = self.entries.peek(key)
+        if entry is MISSING or entry.fresh_until <= self.clock():
+            return MISSING
+        return entry.value
+
+    def _fresh_until(self, endpoint: str, value: Any) -> float:
+        now = self.clock()
+        ttl = self.ttls[endpoint]
+        # Прогноз несёт dt будущих слотов, поэтому dt учитываем только для текущей погоды
+        observed_at = getattr(value, 'dt', None) if endpoint == 'weather' else None
+        if observed_at:
+            return min(now + ttl, max(observed_at + ttl, now + self.MIN_TTL))
+        return now + ttl
+
+    def put(self, key: Hashable, endpoint: str, value: Any) -> None:
+        fresh_until = self._fresh_until(endpoint, value)
+        self.entries.set(key, _Entry(value, fresh_until), fresh_until - self.clock() + self.stale_ttl)
+
+    def _fetch_and_put(self, key: Hashable, endpoint: str, fetch: Callable[[], Any]) -> Any:
+        value = fetch()
+        self.put(key, endpoint, value)
+        return value
+
+    def get_or_fetch(self, endpoint: str, lat: float, lon: float, lang: str, fetch: Callable[[], Any],
+                     variant: str = '') -> Any:
+        """Return a cached response or call ``fetch`` and cache its result"""
+        key = self.key(endpoint, lat, lon, lang, variant)
+        entry = self.entries.get(key)
+        if entry is MISSING:
+            return self.inflight.do(key, lambda: self._fetch_and_put(key, endpoint, fetch))
+
+        if entry.fresh_until <= self.clock():
+            self.stale_hits += 1
+            self._revalidate(key, endpoint, fetch)
+        return entry.value
+
+    async def _fetch_and_put_async(self, key: Hashable, endpoint: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        value = await fetch()
+        self.put(key, endpoint, value)
+        return value
+
+    async def get_or_fetch_async(self, endpoint: str, lat: float, lon: float, lang: str,
+                                 fetch: Callable[[], Awaitable[Any]], variant: str = '') -> Any:
+        """``get_or_fetch`` for coroutine fetchers; revalidation runs as a task on the current loop"""
+        key = self.key(endpoint, lat, lon, lang, variant)
+        entry = self.entries.get(key)
+        if entry is MISSING:
+            return await self.async_inflight.do(key, lambda: self._fetch_and_put_async(key, endpoint, fetch))
+
+        if entry.fresh_until <= self.clock():
+            self.stale_hits += 1
+            self._revalidate_async(key, endpoint, fetch)
+        return entry.value
+
+    def _revalidate_async(self, key: Hashable, endpoint: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                with request_priority(Priority.BACKGROUND):
+                    await self.async_inflight.do(key, lambda: self._fetch_and_put_async(key, endpoint, fetch))
+            except Exception as e:
+                logging.warning(f"Background refresh of {key} failed: {str(e)}")
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(key)
+
+        asyncio.get_running_loop().create_task(refresh())
+
+    def _revalidate(self, key: Hashable, endpoint: str, fetch: Callable[[], Any]) -> None:
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                # Пользователь уже получил устаревший ответ, обновление идёт в фоновой очереди
+                with request_priority(Priority.BACKGROUND):
+                    self.inflight.do(key, lambda: self._fetch_and_put(key, endpoint, fetch))
+            except Exception as e:
+                logging.warning(f"Background refresh of {key} failed: {str(e)}")
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name='weather-cache-refresh', daemon=True).start()
+
+    def refresh(self, endpoint: str, lat: float, lon: float, lang: str, fetch: Callable[[], Any],
+                variant: str = '') -> Any:
+        """Call ``fetch`` and replace the cached response, fresh or not; shares a call already in flight"""
+        key = self.key(endpoint, lat, lon, lang, variant)
+        return self.inflight.do(key, lambda: self._fetch_and_put(key, endpoint, fetch))
+
+    def fresh_for(self, endpoint: str, lat: float, lon: float, lang: str, variant: str = '') -> float:
+        """Seconds until the cached response stops being fresh; 0 if it is stale or absent"""
+        entry = self.entries.peek(self.key(endpoint, lat, lon, lang, variant))
+        if entry is MISSING:
+            return 0.0
+        return max(0.0, entry.fresh_until - self.clock())
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.stale_hits = 0
+        self.nearest_hits = 0
+
+    def stats(self) -> Dict[str, int]:
+        stats = self.entries.stats()
+        stats['stale_hits'] = self.stale_hits
+        stats['nearest_hits'] = self.nearest_hits
+        stats['coalesced'] = self.inflight.shared + self.async_inflight.shared
+        return stats
+
+
+_cache: Optional[WeatherResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_weather_cache() -> WeatherResponseCache:
+    """Process-wide weather response cache configured from ``Config``"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = WeatherResponseCache(
+                    ttls={
+                        'weather': Config.WEATHER_CACHE_TTL_CURRENT,
+                        'forecast': Config.WEATHER_CACHE_TTL_FORECAST,
+                    },
+                    max_size=Config.WEATHER_CACHE_SIZE,
+                    precision=Config.WEATHER_CACHE_PRECISION,
+                    stale_ttl=Config.WEATHER_CACHE_STALE_TTL,
+                    geohash_precision=Config.WEATHER_CACHE_GEOHASH_PRECISION
+                )
+    return _cache
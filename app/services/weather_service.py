@@ -1,13 +1,19 @@
+import json
 import logging
 from pprint import pprint
-from typing import Dict, NoReturn
+from typing import Dict, NoReturn, Optional
 
 import requests
 from pydantic import ValidationError
 
 from config import Config
+from .http_client import http_get
+from .metrics import timed
+from .rate_limiter import RateLimitExceeded, get_rate_limiter
 from .geocoding_service import (GeocodingService, GeocodingAPIException, GeocodingAPICityNotFound)
-from ..models import OpenWeatherResponse, OpenWeatherHourlyResponse
+from .cache import MISSING
+from .weather_cache import WeatherResponseCache, get_weather_cache
+from ..models import OpenWeatherResponse, OpenWeatherHourlyResponse, WeatherBundle, HourlyForecast
 
 
 class WeatherAPIException(Exception):
@@ -16,24 +22,37 @@ class WeatherAPIException(Exception):
 
 
 class WeatherService:
-    def __init__(self):
-        self.base_url = "https://api.openweathermap.org/data/2.5"
+    def __init__(self, cache: Optional[WeatherResponseCache] = None):
+        self.base_url = f"{Config.OPENWEATHER_BASE_URL}/data/2.5"
         self.api_key = Config.OPENWEATHER_API_KEY
+        self.cache = cache if cache is not None else get_weather_cache()
 
-    def _make_request(self, endpoint: str, params: Dict) -> Dict | NoReturn:
-        """Make request to OpenWeather API"""
+    def _make_request(self, endpoint: str, params: Dict) -> bytes | NoReturn:
+        """Make request to OpenWeather API and return the raw response body"""
         try:
+            get_rate_limiter().acquire(endpoint)
             params['appid'] = self.api_key
-            response = requests.get(f"{self.base_url}/{endpoint}", params=params)
+            response = http_get(f"{self.base_url}/{endpoint}", params)
             response.raise_for_status()
-            return response.json()
+            return response.content
 
         except requests.RequestException as e:
             logging.error(f"API request failed: {str(e)}")
             raise WeatherAPIException(f"Failed to fetch weather data: {str(e)}")
+        except RateLimitExceeded as e:
+            logging.warning(f"API request throttled: {str(e)}")
+            raise WeatherAPIException(f"Failed to fetch weather data: {str(e)}")
 
     def get_weather_by_coordinates(self, lat: float, lon: float, lang: str = 'e') -> OpenWeatherResponse | NoReturn:
-        """Get current weather for given coordinates"""
+        """Get current weather for given coordinates.
+
+        Upstream is asked about the centre of the point's cache cell, so ``name``
+        and ``coord`` of the response describe that centre, not the point.
+        """
+        return self.cache.get_or_fetch('weather', lat, lon, lang, lambda: self._fetch_weather(*self.cache.cell_center(lat, lon), lang))
+
+    def _fetch_weather(self, lat: float, lon: float, lang: str) -> OpenWeatherResponse | NoReturn:
+        """Request current weather from OpenWeather, bypassing the cache"""
         params = {
             'lat': lat,
             'lon': lon,
@@ -41,10 +60,12 @@ class WeatherService:
             'units': 'metric'  # Для получения температуры в Цельсиях
         }
 
-        data = self._make_request('weather', params)
+        raw = self._make_request('weather', params)
 
         try:
-            weather_data = OpenWeatherResponse(**data)
+            # Разбор JSON и валидация за один проход, без промежуточного dict
+            with timed('parse_weather'):
+                weather_data = OpenWeatherResponse.model_validate_json(raw)
             logging.info(f'Get weather for {lat} {lon}: {weather_data}')
             return weather_data
         except ValidationError as e:
@@ -67,6 +88,10 @@ class WeatherService:
 
     def get_weather_hourly_by_coordinates(self, lat: float, lon: float, lang: str = 'en') -> OpenWeatherHourlyResponse | NoReturn:
         """Get hourly weather forecast for given coordinates"""
+        return self.cache.get_or_fetch('forecast', lat, lon, lang, lambda: self._fetch_weather_hourly(*self.cache.cell_center(lat, lon), lang))
+
+    def _fetch_weather_hourly(self, lat: float, lon: float, lang: str) -> OpenWeatherHourlyResponse | NoReturn:
+        """Request hourly weather forecast from OpenWeather, bypassing the cache"""
         params = {
             'lat': lat,
             'lon': lon,
@@ -74,17 +99,72 @@ class WeatherService:
             'units': 'metric'
         }
 
-        data = self._make_request('forecast', params)
-
-        # print(data)
+        raw = self._make_request('forecast', params)
 
         try:
-            weather_data = OpenWeatherHourlyResponse(**data)
+            # Для 40 слотов разбор stdlib json + валидация dict быстрее model_validate_json
+            with timed('parse_forecast'):
+                weather_data = OpenWeatherHourlyResponse.model_validate(json.loads(raw))
             logging.info(f'Get hourly weather for {lat} {lon}: {weather_data}')
             return weather_data
         except ValidationError as e:
             raise ValueError(f"Data validation error: {e.errors()}")
 
+    def get_forecast_columns_by_coordinates(self, lat: float, lon: float, lang: str = 'en') -> HourlyForecast | NoReturn:
+        """Get hourly weather forecast for given coordinates as columns, without per-slot models"""
+        return self.cache.get_or_fetch(
+            'forecast', lat, lon, lang, lambda: self._fetch_forecast_columns(*self.cache.cell_center(lat, lon), lang), variant='columns'
+        )
+
+    def _fetch_forecast_columns(self, lat: float, lon: float, lang: str) -> HourlyForecast | NoReturn:
+        """Request hourly weather forecast from OpenWeather and load it into columns"""
+        params = {
+            'lat': lat,
+            'lon': lon,
+            'lang': lang,
+            'units': 'metric'
+        }
+
+        raw = self._make_request('forecast', params)
+
+        try:
+            with timed('parse_forecast'):
+                return HourlyForecast.from_json(raw)
+        except ValueError as e:
+            raise ValueError(f"Data validation error: {e}")
+
+    def get_cached_weather_nearby(self, lat: float, lon: float, lang: str = 'en') -> Optional[OpenWeatherResponse]:
+        """Fresh cached current weather of the point's cell or a neighbouring one, without calling upstream"""
+        weather = self.cache.nearest('weather', lat, lon, lang)
+        return None if weather is MISSING else weather
+
+    def get_bundle_fresh_for(self, bundle: WeatherBundle, lang: str = 'en') -> float:
+        """Seconds the cached data behind ``bundle`` stays fresh: the shorter of current weather and forecast"""
+        lat, lon = bundle.location.lat, bundle.location.lon
+        return min(
+            self.cache.fresh_for('weather', lat, lon, lang),
+            self.cache.fresh_for('forecast', lat, lon, lang, variant='columns')
+        )
+
+    def prefetch_city(self, city_name: str, lang: str = 'en', lead_time: float = 0) -> int | NoReturn:
+        """Re-fetch the city's current weather and forecast if they expire within ``lead_time`` seconds.
+
+        Returns the number of OpenWeather weather calls made (geocoding is not counted).
+        """
+        location = GeocodingService().get_coordinates_by_city_name(city_name)
+        lat, lon = location.lat, location.lon
+        center = self.cache.cell_center(lat, lon)
+        calls = 0
+        if self.cache.fresh_for('weather', lat, lon, lang) <= lead_time:
+            self.cache.refresh('weather', lat, lon, lang, lambda: self._fetch_weather(*center, lang))
+            calls += 1
+        if self.cache.fresh_for('forecast', lat, lon, lang, variant='columns') <= lead_time:
+            self.cache.refresh(
+                'forecast', lat, lon, lang, lambda: self._fetch_forecast_columns(*center, lang), variant='columns'
+            )
+            calls += 1
+        return calls
+
     def get_weather_hourly_by_city(self, city_name: str, lang: str = 'en') -> OpenWeatherHourlyResponse | NoReturn:
         """Get hourly weather forecast for a given city name"""
         geocoding_service = GeocodingService()
@@ -101,6 +181,26 @@ class WeatherService:
             logging.error(f"Failed to get hourly weather data for city {city_name}: {str(e)}")
             raise GeocodingAPIException(f"Failed to get hourly weather data for city {city_name}: {str(e)}")
 
+    def get_weather_bundle_by_city(self, city_name: str, lang: str = 'en') -> WeatherBundle | NoReturn:
+        """Get current weather and hourly forecast for a given city name, geocoding it only once"""
+        geocoding_service = GeocodingService()
+
+        try:
+            geocoding_response = geocoding_service.get_coordinates_by_city_name(city_name)
+            lat = geocoding_response.lat
+            lon = geocoding_response.lon
+            return WeatherBundle(
+                location=geocoding_response,
+                current=self.get_weather_by_coordinates(lat, lon, lang),
+                hourly=self.get_forecast_columns_by_coordinates(lat, lon, lang)
+            )
+        except GeocodingAPICityNotFound as e:
+            logging.error(f"Can't found city with name {city_name}: {str(e)}")
+            raise GeocodingAPICityNotFound(f"No data found for city: {city_name}")
+        except (GeocodingAPIException, ValueError) as e:
+            logging.error(f"Failed to get weather bundle for city {city_name}: {str(e)}")
+            raise GeocodingAPIException(f"Failed to get weather bundle for city {city_name}: {str(e)}")
+
 
 if __name__ == '__main__':
     # Sample test
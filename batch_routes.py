@@ -0,0 +1,40 @@
+"""Evaluate a CSV of routes (start,end per line) and write one result per route.
+
+    python batch_routes.py routes.csv results.jsonl
+    python batch_routes.py routes.csv results.csv --format csv --checkpoint results.ckpt
+
+With --checkpoint an interrupted run continues where it stopped.
+"""
+import argparse
+import logging
+
+from app.services.batch_service import RouteBatchJob
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('routes', help='CSV file with start,end columns')
+    parser.add_argument('output', help='JSONL or CSV file for the results')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+    parser.add_argument('--checkpoint', help='checkpoint file for resuming an interrupted run')
+    parser.add_argument('--concurrency', type=int, help='parallel upstream requests (BATCH_CONCURRENCY)')
+    parser.add_argument('--processes', type=int, help='analysis processes (BATCH_PROCESSES)')
+    parser.add_argument('--chunk-size', type=int, help='routes per checkpoint (BATCH_CHUNK_SIZE)')
+    parser.add_argument('--lang', default='en')
+    parser.add_argument('--plots-dir', help='also render temperature and wind PNGs of both ends into this directory')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    job = RouteBatchJob(
+        concurrency=args.concurrency,
+        processes=args.processes,
+        chunk_size=args.chunk_size,
+        lang=args.lang,
+        plots_dir=args.plots_dir
+    )
+    written = job.run(args.routes, args.output, args.format, args.checkpoint)
+    logging.info(f"Done: {written} routes, {job.upstream_cities} distinct cities fetched")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Cost of turning raw OpenWeather response bodies into models.
+
+Compares the old two-step path (``json.loads`` then ``Model(**data)``) with
+validating the bytes directly, and the columnar forecast loader.
+
+    python -m benchmarks.bench_parse --repeats 2000
+"""
+import argparse
+import json
+import timeit
+
+from app.models import OpenWeatherResponse, OpenWeatherHourlyResponse, HourlyForecast
+from benchmarks.payloads import current_payload, forecast_payload
+
+
+def run(repeats: int) -> list[dict]:
+    current = json.dumps(current_payload()).encode()
+    forecast = json.dumps(forecast_payload()).encode()
+
+    cases = [
+        ('current', 'loads + Model(**data)', lambda: OpenWeatherResponse(**json.loads(current))),
+        ('current', 'model_validate_json', lambda: OpenWeatherResponse.model_validate_json(current)),
+        ('forecast', 'loads + Model(**data)', lambda: OpenWeatherHourlyResponse(**json.loads(forecast))),
+        ('forecast', 'model_validate_json', lambda: OpenWeatherHourlyResponse.model_validate_json(forecast)),
+        ('forecast', 'loads + model_validate', lambda: OpenWeatherHourlyResponse.model_validate(json.loads(forecast))),
+        ('forecast', 'HourlyForecast.from_json', lambda: HourlyForecast.from_json(forecast)),
+    ]
+
+    results = []
+    for payload, method, parse in cases:
+        parse()  # прогрев
+        best = min(timeit.repeat(parse, number=repeats, repeat=5))
+        results.append({'payload': payload, 'method': method, 'us_per_parse': best / repeats * 1e6})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'payload':>9} {'method':>26} {'us/parse':>10}")
+    for row in run(args.repeats):
+        print(f"{row['payload']:>9} {row['method']:>26} {row['us_per_parse']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Latency of the /weather POST route against the number of cities.
+
+Upstream calls and plot rendering are replaced by sleeps of a fixed duration,
+so the numbers show how the route scales, not how fast OpenWeather is.
+
+    python -m benchmarks.bench_route_fanout --cities 1 2 5 10 --workers 1 8
+"""
+import argparse
+import math
+import os
+import statistics
+import time
+from unittest.mock import patch
+
+from app import create_app
+from app.models import OpenWeatherResponse, HourlyForecast, WeatherBundle, GeocodingResponse
+from benchmarks.payloads import current_payload, forecast_payload
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(city_counts: list[int], worker_counts: list[int], repeats: int, upstream_latency: float, render_latency: float) -> list[dict]:
+    current = OpenWeatherResponse(**current_payload())
+    bundle = WeatherBundle(
+        location=GeocodingResponse(name=current.name, lat=current.coord.lat, lon=current.coord.lon, country='RU'),
+        current=current,
+        hourly=HourlyForecast.from_payload(forecast_payload())
+    )
+
+    def fake_bundle(self, city_name, lang='en'):
+        time.sleep(upstream_latency * 3)  # geocoding + weather + forecast
+        return bundle
+
+    def fake_plots(plots):
+        # Пакет графиков расходится по пулу рендереров размером с число ядер
+        time.sleep(render_latency * math.ceil(len(plots) / (os.cpu_count() or 1)))
+        return [''] * len(plots)
+
+    app = create_app()
+    app.config['TESTING'] = True
+    client = app.test_client()
+
+    results = []
+    with patch('app.services.weather_service.WeatherService.get_weather_bundle_by_city', fake_bundle), \
+            patch('app.routes.weather_routes.create_weather_plots', fake_plots):
+        for workers in worker_counts:
+            app.config['WEATHER_MAX_WORKERS'] = workers
+            for count in city_counts:
+                cities = [f'City {i}' for i in range(count)]
+                samples = []
+                for _ in range(repeats):
+                    started = time.perf_counter()
+                    response = client.post('/weather', json={'cities': cities})
+                    samples.append(time.perf_counter() - started)
+                    assert response.status_code == 200
+                results.append({
+                    'workers': workers,
+                    'cities': count,
+                    'p50_ms': _percentile(samples, 50) * 1000,
+                    'p95_ms': _percentile(samples, 95) * 1000,
+                    'mean_ms': statistics.mean(samples) * 1000,
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cities', type=int, nargs='+', default=[1, 2, 5, 10])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--upstream-latency', type=float, default=0.05, help='seconds per upstream call')
+    parser.add_argument('--render-latency', type=float, default=0.02, help='seconds per plot render')
+    args = parser.parse_args()
+
+    results = run(args.cities, args.workers, args.repeats, args.upstream_latency, args.render_latency)
+
+    print(f"{'workers':>8} {'cities':>7} {'p50, ms':>10} {'p95, ms':>10}")
+    for row in results:
+        print(f"{row['workers']:>8} {row['cities']:>7} {row['p50_ms']:>10.1f} {row['p95_ms']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
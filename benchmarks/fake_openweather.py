@@ -0,0 +1,179 @@
+"""Local stand-in for the OpenWeather weather, forecast and geocoding APIs.
+
+Serves recorded payloads with configurable latency, jitter and error rate,
+so benchmarks and load tests never touch the real API or spend quota.
+Point the app at it with ``OPENWEATHER_BASE_URL``:
+
+    python -m benchmarks.fake_openweather --port 8081 --latency 0.05 --jitter 0.02 --error-rate 0.01
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8081 python run.py
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.payloads import current_payload, forecast_payload
+
+# Коды ошибок, которые отдаёт заглушка: их же повторяет HTTP-клиент
+ERROR_STATUSES = (429, 500, 502, 503)
+
+
+def _city_coordinates(city: str) -> tuple:
+    """Stable pseudo-random coordinates for a city name, so different cities land in different cache cells"""
+    digest = hashlib.blake2b(city.strip().lower().encode('utf-8'), digest_size=8).digest()
+    lat = int.from_bytes(digest[:4], 'big') / 2 ** 32 * 120 - 60
+    lon = int.from_bytes(digest[4:], 'big') / 2 ** 32 * 360 - 180
+    return round(lat, 4), round(lon, 4)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, как у настоящего API
+    disable_nagle_algorithm = True  # иначе заголовки и тело ждут delayed ACK ~40 мс
+
+    def do_GET(self):
+        server: FakeOpenWeatherServer = self.server.owner
+        url = urlparse(self.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        server.count(url.path)
+
+        delay = max(0.0, server.latency + random.uniform(-server.jitter, server.jitter))
+        if delay:
+            time.sleep(delay)
+
+        if server.error_rate and random.random() < server.error_rate:
+            self._send(random.choice(ERROR_STATUSES), {'cod': 500, 'message': 'injected error'})
+            return
+
+        body = server.respond(url.path, params)
+        if body is None:
+            self._send(404, {'cod': '404', 'message': 'Internal error'})
+            return
+        self._send(200, body)
+
+    def _send(self, status: int, body):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        if status == 429:
+            self.send_header('Retry-After', '0')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeOpenWeatherServer:
+    """Threaded HTTP server answering ``/data/2.5/weather``, ``/data/2.5/forecast`` and ``/geo/1.0/direct``.
+
+    Payloads come from ``payloads_dir`` (``weather.json``, ``forecast.json``,
+    ``direct.json``) when given, otherwise from ``benchmarks.payloads``.
+    Weather and forecast coordinates are echoed back from the request.
+    Geocoding resolves any city name to stable coordinates, except names
+    listed in ``unknown_cities``, which get an empty result.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, payloads_dir: Optional[str] = None, unknown_cities=()):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.unknown_cities = {city.strip().lower() for city in unknown_cities}
+        self.hits: Dict[str, int] = {}
+        self._hits_lock = threading.Lock()
+        self._current, self._forecast, self._direct = self._load_payloads(payloads_dir)
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.owner = self
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _load_payloads(payloads_dir: Optional[str]):
+        current, forecast, direct = current_payload(), forecast_payload(), None
+        if payloads_dir:
+            for name in ('weather', 'forecast', 'direct'):
+                path = os.path.join(payloads_dir, f'{name}.json')
+                if os.path.exists(path):
+                    with open(path, encoding='utf-8') as f:
+                        payload = json.load(f)
+                    if name == 'weather':
+                        current = payload
+                    elif name == 'forecast':
+                        forecast = payload
+                    else:
+                        direct = payload
+        return current, forecast, direct
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def count(self, path: str) -> None:
+        with self._hits_lock:
+            self.hits[path] = self.hits.get(path, 0) + 1
+
+    def respond(self, path: str, params: Dict[str, str]):
+        if path == '/geo/1.0/direct':
+            city = params.get('q', '')
+            if city.strip().lower() in self.unknown_cities:
+                return []
+            if self._direct is not None:
+                return self._direct
+            lat, lon = _city_coordinates(city)
+            return [{'name': city, 'lat': lat, 'lon': lon, 'country': 'XX'}]
+
+        if path in ('/data/2.5/weather', '/data/2.5/forecast'):
+            coord = {'lat': float(params.get('lat', 0)), 'lon': float(params.get('lon', 0))}
+            if path.endswith('weather'):
+                payload = dict(self._current, coord=coord, dt=int(time.time()))
+            else:
+                payload = dict(self._forecast, city=dict(self._forecast['city'], coord=coord))
+            return payload
+        return None
+
+    def start(self) -> 'FakeOpenWeatherServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='fake-openweather', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> 'FakeOpenWeatherServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='uniform +/- seconds added to latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of responses that fail with 429/5xx')
+    parser.add_argument('--payloads', help='directory with recorded weather.json, forecast.json, direct.json')
+    args = parser.parse_args()
+
+    server = FakeOpenWeatherServer(args.host, args.port, args.latency, args.jitter, args.error_rate, args.payloads)
+    print(f"Fake OpenWeather listening on {server.url}")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
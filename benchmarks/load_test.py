@@ -0,0 +1,278 @@
+"""Load test: how many concurrent /weather POSTs and bot conversations one instance handles.
+
+Serves the app on a local port with OpenWeather replaced by the local
+stand-in, then sweeps concurrency levels. At every level ``--concurrency``
+clients send requests back to back for ``--duration`` seconds; each
+/weather request asks for a number of cities drawn from the ``--mix``
+weights. Weather, geocoding and plot caches are emptied before every
+level, so each level starts cold. Reports throughput, latency percentiles
+and error rate per level and exits with code 1 when a level misses the SLO.
+
+    python -m benchmarks.load_test --concurrency 1 4 16 32 --mix 2:0.7 5:0.3 --slo-p99-ms 2000
+    python -m benchmarks.load_test --scenario bot --corridor --concurrency 10 50 100 --upstream-latency 0.1
+
+``--target`` load-tests an app that is already running, e.g. under
+gunicorn. That app is a separate process: start it against the stand-in
+on ``--upstream-port`` and with quotas that do not throttle the test,
+then run the load test against it. Its caches cannot be emptied from
+here, so only the first level starts cold.
+
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8081 RATE_LIMIT_WEATHER_PER_MINUTE=1000000 \
+        RATE_LIMIT_FORECAST_PER_MINUTE=1000000 RATE_LIMIT_GEO_PER_MINUTE=1000000 gunicorn run:app
+    python -m benchmarks.load_test --target http://127.0.0.1:8000 --upstream-port 8081
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+from unittest.mock import patch
+
+import requests
+from werkzeug.serving import make_server
+
+from config import Config
+from app.services import rate_limiter
+from app.services.geocoding_cache import get_geocoding_cache
+from app.services.plot_service import plot_cache
+from app.services.weather_cache import get_weather_cache
+from benchmarks.fake_openweather import FakeOpenWeatherServer
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def parse_mix(values: List[str]) -> List[Tuple[int, float]]:
+    """``['2:0.7', '5:0.3']`` -> ``[(2, 0.7), (5, 0.3)]``; a bare number has weight 1"""
+    mix = []
+    for value in values:
+        cities, _, weight = value.partition(':')
+        mix.append((int(cities), float(weight or 1)))
+    return mix
+
+
+class _Level:
+    """Latencies and errors collected at one concurrency level"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self.latencies.append(latency)
+            if not ok:
+                self.errors += 1
+
+    def summary(self, concurrency: int, elapsed: float, cache: str = 'cold') -> dict:
+        total = len(self.latencies)
+        return {
+            'concurrency': concurrency,
+            'cache': cache,
+            'requests': total,
+            'throughput_rps': total / elapsed if elapsed else 0.0,
+            'p50_ms': _percentile(self.latencies, 50) * 1000 if total else None,
+            'p95_ms': _percentile(self.latencies, 95) * 1000 if total else None,
+            'p99_ms': _percentile(self.latencies, 99) * 1000 if total else None,
+            'error_rate': self.errors / total if total else 1.0,
+        }
+
+
+def _weather_client(target: str, mix: List[Tuple[int, float]], city_pool: List[str], plot_mode: str,
+                    deadline: float, level: _Level) -> None:
+    session = requests.Session()
+    counts, weights = zip(*mix)
+    while time.monotonic() < deadline:
+        cities = random.sample(city_pool, min(len(city_pool), random.choices(counts, weights)[0]))
+        started = time.perf_counter()
+        try:
+            response = session.post(f'{target}/weather?lang=en', json={'cities': cities, 'plot_mode': plot_mode},
+                                    timeout=60)
+            # Маршрут отвечает 200 и при ошибке, поэтому ищем в странице блок с ошибкой
+            ok = response.status_code == 200 and 'role="alert"' not in response.text
+        except requests.RequestException:
+            ok = False
+        level.record(time.perf_counter() - started, ok)
+
+
+def _clear_caches() -> None:
+    get_weather_cache().clear()
+    get_geocoding_cache().clear()
+    plot_cache.clear()
+
+
+def run_weather_level(target: str, concurrency: int, duration: float, mix, city_pool, plot_mode: str,
+                      cache: str = 'cold') -> dict:
+    level = _Level()
+    deadline = time.monotonic() + duration
+    started = time.monotonic()
+    clients = [
+        threading.Thread(target=_weather_client, args=(target, mix, city_pool, plot_mode, deadline, level))
+        for _ in range(concurrency)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    return level.summary(concurrency, time.monotonic() - started, cache)
+
+
+def run_bot_level(concurrency: int, duration: float, city_pool: List[str], corridor: bool = False) -> dict:
+    """Conversations go through the bot's reply builder on one event loop, as in the bot process"""
+    from app.services.async_http_client import close_async_session
+    from app.services.async_weather_service import AsyncWeatherService
+    from app.services.weather_analyzer_service import WeatherAnalyzerService
+    from telegram_bot import build_route_reply
+
+    level = _Level()
+
+    async def conversation(deadline: float):
+        weather_service, analyzer = AsyncWeatherService(), WeatherAnalyzerService()
+        while time.monotonic() < deadline:
+            start_city, end_city = random.sample(city_pool, 2)
+            started = time.perf_counter()
+            try:
+                await build_route_reply(weather_service, analyzer, start_city, end_city, corridor)
+                ok = True
+            except Exception:
+                ok = False
+            level.record(time.perf_counter() - started, ok)
+
+    async def main():
+        try:
+            deadline = time.monotonic() + duration
+            await asyncio.gather(*(conversation(deadline) for _ in range(concurrency)))
+        finally:
+            await close_async_session()
+
+    started = time.monotonic()
+    asyncio.run(main())
+    return level.summary(concurrency, time.monotonic() - started)
+
+
+def check_slo(row: dict, p99_ms: Optional[float], max_error_rate: Optional[float],
+              min_throughput: Optional[float]) -> List[str]:
+    """Names of the SLO thresholds the level missed"""
+    missed = []
+    if p99_ms is not None and (row['p99_ms'] is None or row['p99_ms'] > p99_ms):
+        missed.append('p99')
+    if max_error_rate is not None and row['error_rate'] > max_error_rate:
+        missed.append('errors')
+    if min_throughput is not None and row['throughput_rps'] < min_throughput:
+        missed.append('throughput')
+    return missed
+
+
+class _LocalApp:
+    """The Flask app on a threaded werkzeug server, as ``run.py`` serves it"""
+
+    def __init__(self):
+        from app import create_app
+
+        from app.services.plot_renderer import get_renderer_pool
+
+        app = create_app()
+        if app.config['PLOT_MODE'] == 'png':
+            get_renderer_pool().warm_up()
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+
+    def __enter__(self) -> '_LocalApp':
+        threading.Thread(target=self.server.serve_forever, name='load-test-app', daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+
+
+def run(args) -> List[dict]:
+    city_pool = [f'City {i}' for i in range(args.city_pool)]
+    mix = parse_mix(args.mix)
+    upstream = FakeOpenWeatherServer(port=args.upstream_port, latency=args.upstream_latency,
+                                     jitter=args.upstream_jitter, error_rate=args.upstream_error_rate)
+
+    if args.target:
+        # Настройки и кэши удалённого приложения отсюда не видны: его запускают против заглушки заранее
+        with upstream:
+            print(f"Stand-in OpenWeather on {upstream.url}; {args.target} must use it as OPENWEATHER_BASE_URL")
+            return [run_weather_level(args.target.rstrip('/'), concurrency, args.duration, mix, city_pool,
+                                      args.plot_mode, 'cold' if i == 0 else 'warm')
+                    for i, concurrency in enumerate(args.concurrency)]
+
+    # Заглушка не тратит квоту: лимитер измерял бы себя, а не приложение.
+    # aiohttp не принимает None в параметрах, поэтому без настоящего ключа подставляем любой
+    with upstream, patch.object(Config, 'OPENWEATHER_BASE_URL', upstream.url), \
+            patch.object(Config, 'OPENWEATHER_API_KEY', Config.OPENWEATHER_API_KEY or 'stand-in'), \
+            patch.object(Config, 'PREFETCH_ENABLED', False), \
+            patch.object(rate_limiter, '_limiter', rate_limiter.RateLimiter({})):
+        results = []
+        if args.scenario == 'bot':
+            for concurrency in args.concurrency:
+                _clear_caches()
+                results.append(run_bot_level(concurrency, args.duration, city_pool, args.corridor))
+            return results
+
+        with _LocalApp() as local:
+            for concurrency in args.concurrency:
+                _clear_caches()
+                results.append(run_weather_level(local.url, concurrency, args.duration, mix, city_pool,
+                                                 args.plot_mode))
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', choices=('weather', 'bot'), default='weather')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--duration', type=float, default=10, help='seconds per concurrency level')
+    parser.add_argument('--mix', nargs='+', default=['2:0.6', '5:0.3', '10:0.1'],
+                        help='cities per request with weights, e.g. 2:0.6 5:0.4')
+    parser.add_argument('--city-pool', type=int, default=200, help='distinct city names to draw from')
+    parser.add_argument('--plot-mode', choices=('png', 'json'), default='png')
+    parser.add_argument('--corridor', action='store_true', help='bot scenario: also fetch the route corridor')
+    parser.add_argument('--target', help='URL of an already running app started against the stand-in')
+    parser.add_argument('--upstream-port', type=int, default=0,
+                        help='port of the stand-in OpenWeather; required with --target')
+    parser.add_argument('--upstream-latency', type=float, default=0.05)
+    parser.add_argument('--upstream-jitter', type=float, default=0.02)
+    parser.add_argument('--upstream-error-rate', type=float, default=0.0)
+    parser.add_argument('--slo-p99-ms', type=float)
+    parser.add_argument('--slo-error-rate', type=float)
+    parser.add_argument('--slo-min-rps', type=float)
+    parser.add_argument('--output', help='write the per-level results as JSON')
+    args = parser.parse_args()
+    if args.target and args.scenario == 'bot':
+        parser.error('--target applies to the weather scenario only')
+    if args.target and not args.upstream_port:
+        parser.error('--target needs --upstream-port: the running app must be started against the stand-in on it')
+
+    results = run(args)
+
+    failed = False
+    print(f"{'clients':>8} {'cache':>6} {'requests':>9} {'rps':>8} {'p50, ms':>9} {'p95, ms':>9} {'p99, ms':>9} "
+          f"{'errors':>7}  SLO")
+    for row in results:
+        row['slo_missed'] = check_slo(row, args.slo_p99_ms, args.slo_error_rate, args.slo_min_rps)
+        failed = failed or bool(row['slo_missed'])
+        latencies = [f"{row[key]:>9.1f}" if row[key] is not None else f"{'-':>9}" for key in ('p50_ms', 'p95_ms', 'p99_ms')]
+        print(f"{row['concurrency']:>8} {row['cache']:>6} {row['requests']:>9} {row['throughput_rps']:>8.1f} {' '.join(latencies)} "
+              f"{row['error_rate']:>7.1%}  {', '.join(row['slo_missed']) or 'ok'}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'scenario': args.scenario, 'settings': vars(args), 'levels': results}, f, indent=2)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
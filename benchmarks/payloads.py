@@ -0,0 +1,43 @@
+"""Recorded OpenWeather payloads used by the benchmarks"""
+import copy
+import json
+import os
+
+_MOCK_PATH = os.path.join(os.path.dirname(__file__), '..', 'tests', 'weather_response_mock.json')
+
+FORECAST_SLOTS = 40
+FORECAST_STEP = 3 * 60 * 60
+
+
+def current_payload() -> dict:
+    """Current weather payload recorded from /data/2.5/weather"""
+    with open(_MOCK_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def forecast_payload(slots: int = FORECAST_SLOTS) -> dict:
+    """Forecast payload in the /data/2.5/forecast shape built from the recorded current weather"""
+    current = current_payload()
+    entries = []
+    for i in range(slots):
+        entry = copy.deepcopy(current)
+        entry['dt'] = current['dt'] + i * FORECAST_STEP
+        entry['main']['temp'] = round(current['main']['temp'] + (i % 8) - 4, 2)
+        entry['wind']['speed'] = round(current['wind']['speed'] + (i % 5) * 0.7, 2)
+        entries.append(entry)
+    return {
+        'cod': '200',
+        'message': 0,
+        'cnt': slots,
+        'list': entries,
+        'city': {
+            'id': current.get('id', 0),
+            'name': current.get('name', ''),
+            'coord': current['coord'],
+            'country': current.get('sys', {}).get('country', ''),
+            'population': 0,
+            'timezone': current.get('timezone', 0),
+            'sunrise': current.get('sys', {}).get('sunrise', 0),
+            'sunset': current.get('sys', {}).get('sunset', 0),
+        },
+    }
@@ -0,0 +1,243 @@
+"""Offline benchmark suite for the hot paths of the app.
+
+Starts the local OpenWeather stand-in and times the services against it:
+geocoding and weather calls with cold and warm caches, model parsing,
+the analyzer, plot series and rendering, and the full /weather route.
+Results are written as JSON for comparing runs; with ``--compare`` the run
+fails when any benchmark's median got slower than allowed.
+
+    python -m benchmarks.suite --output logs/benchmarks/base.json
+    python -m benchmarks.suite --compare logs/benchmarks/base.json --max-regression 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+from unittest.mock import patch
+
+from config import Config
+from app import create_app
+from app.models import OpenWeatherResponse, HourlyForecast
+from app.services import rate_limiter
+from app.services.geocoding_cache import GeocodingCache, get_geocoding_cache
+from app.services.geocoding_service import GeocodingService
+from app.services.plot_service import create_weather_plot_series, create_weather_plots, plot_cache
+from app.services.weather_analyzer_service import WeatherAnalyzerService
+from app.services.weather_cache import get_weather_cache
+from app.services.weather_service import WeatherService
+from benchmarks.bench_parse import run as run_parse
+from benchmarks.fake_openweather import FakeOpenWeatherServer
+from benchmarks.payloads import current_payload, forecast_payload
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(name: str, fn: Callable[[int], object], repeats: int, setup: Optional[Callable[[], None]] = None,
+            warmup: int = 1) -> dict:
+    """Time ``fn(i)`` ``repeats`` times; ``setup`` runs untimed before each call, e.g. to empty caches"""
+    for i in range(warmup):
+        if setup:
+            setup()
+        fn(-1 - i)
+    samples = []
+    for i in range(repeats):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - started)
+    return {
+        'name': name,
+        'repeats': repeats,
+        'min_ms': min(samples) * 1000,
+        'p50_ms': _percentile(samples, 50) * 1000,
+        'p95_ms': _percentile(samples, 95) * 1000,
+        'mean_ms': statistics.mean(samples) * 1000,
+    }
+
+
+def _clear_caches() -> None:
+    get_weather_cache().clear()
+    get_geocoding_cache().clear()
+
+
+def bench_services(repeats: int) -> List[dict]:
+    results = [
+        measure('geocoding.cold', lambda i: GeocodingService(cache=GeocodingCache()).get_coordinates_by_city_name(f'City {i}'),
+                repeats),
+        measure('geocoding.cached', lambda i: GeocodingService().get_coordinates_by_city_name('Moscow'), repeats),
+    ]
+    service = WeatherService()
+    results += [
+        measure('weather_service.current.cold', lambda i: service.get_weather_by_coordinates(55.75, 37.62, 'en'),
+                repeats, setup=_clear_caches),
+        measure('weather_service.bundle.cold', lambda i: service.get_weather_bundle_by_city('Moscow', 'en'),
+                repeats, setup=_clear_caches),
+        measure('weather_service.bundle.cached', lambda i: service.get_weather_bundle_by_city('Moscow', 'en'),
+                repeats),
+    ]
+    return results
+
+
+def bench_models(repeats: int) -> List[dict]:
+    # Микробенчмарк разбора уже считает лучший из повторов, переводим в ту же схему
+    return [
+        {'name': f"models.{row['payload']}.{row['method']}", 'repeats': repeats * 100,
+         'min_ms': row['us_per_parse'] / 1000, 'p50_ms': row['us_per_parse'] / 1000,
+         'p95_ms': row['us_per_parse'] / 1000, 'mean_ms': row['us_per_parse'] / 1000}
+        for row in run_parse(repeats * 100)
+    ]
+
+
+def bench_analyzer(repeats: int) -> List[dict]:
+    analyzer = WeatherAnalyzerService()
+    current = OpenWeatherResponse(**current_payload())
+    columns = HourlyForecast.from_payload(forecast_payload())
+    return [
+        measure('analyzer.analyze_weather', lambda i: analyzer.analyze_weather(current), repeats * 10),
+        measure('analyzer.analyze_forecast', lambda i: analyzer.analyze_forecast(columns), repeats * 10),
+    ]
+
+
+def bench_plots(app, repeats: int, render: bool) -> List[dict]:
+    hourly = HourlyForecast.from_payload(forecast_payload())
+    results = []
+    with app.test_request_context('/?lang=en'):
+        results.append(measure('plot_service.series',
+                               lambda i: create_weather_plot_series(hourly.pretty_dt, hourly.temp, hourly.wind_speed),
+                               repeats * 10))
+        if render:
+            plots = [('temp', hourly.pretty_dt, hourly.temp), ('wind', hourly.pretty_dt, hourly.wind_speed)]
+            results.append(measure('plot_service.render.cold', lambda i: create_weather_plots(plots),
+                                   max(1, repeats // 5), setup=plot_cache.clear))
+            results.append(measure('plot_service.render.cached', lambda i: create_weather_plots(plots), repeats))
+    return results
+
+
+def bench_route(app, repeats: int, cities: int, render: bool) -> List[dict]:
+    client = app.test_client()
+    names = [f'City {i}' for i in range(cities)]
+    results = []
+    for plot_mode in (('png', 'json') if render else ('json',)):
+        def post(i, plot_mode=plot_mode):
+            response = client.post('/weather?lang=en', json={'cities': names, 'plot_mode': plot_mode})
+            assert response.status_code == 200, response.status_code
+
+        results.append(measure(f'route.weather.{plot_mode}.cold', post, max(1, repeats // 5),
+                               setup=lambda: (_clear_caches(), plot_cache.clear())))
+        results.append(measure(f'route.weather.{plot_mode}.cached', post, repeats))
+    return results
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> dict:
+    server = FakeOpenWeatherServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                                   payloads_dir=args.payloads)
+    # Заглушка не тратит квоту, поэтому лимитер без ограничений
+    with server, patch.object(Config, 'OPENWEATHER_BASE_URL', server.url), \
+            patch.object(Config, 'PREFETCH_ENABLED', False), \
+            patch.object(rate_limiter, '_limiter', rate_limiter.RateLimiter({})):
+        app = create_app()
+        app.config['TESTING'] = True
+
+        results = []
+        results += bench_services(args.repeats)
+        results += bench_models(args.repeats)
+        results += bench_analyzer(args.repeats)
+        results += bench_plots(app, args.repeats, not args.skip_render)
+        results += bench_route(app, args.repeats, args.cities, not args.skip_render)
+
+    return {
+        'meta': {
+            'revision': _git_revision(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'settings': {
+                'repeats': args.repeats, 'cities': args.cities, 'latency': args.latency, 'jitter': args.jitter,
+                'error_rate': args.error_rate, 'render': not args.skip_render,
+            },
+        },
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, max_regression: float, min_delta_ms: float) -> List[str]:
+    """Print the median change of every benchmark present in both runs; return the ones over the limit.
+
+    Changes smaller than ``min_delta_ms`` are not counted: for microsecond
+    benchmarks they are timer noise rather than regressions.
+    """
+    previous = {row['name']: row for row in baseline['results']}
+    regressions = []
+    print(f"{'benchmark':<45} {'base p50, ms':>13} {'p50, ms':>10} {'change':>8}")
+    for row in current['results']:
+        base = previous.get(row['name'])
+        if base is None or not base['p50_ms']:
+            continue
+        change = row['p50_ms'] / base['p50_ms'] - 1
+        flag = ' !' if change > max_regression and row['p50_ms'] - base['p50_ms'] > min_delta_ms else ''
+        print(f"{row['name']:<45} {base['p50_ms']:>13.3f} {row['p50_ms']:>10.3f} {change:>+8.1%}{flag}")
+        if flag:
+            regressions.append(row['name'])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--cities', type=int, default=5, help='cities per /weather request')
+    parser.add_argument('--latency', type=float, default=0.0, help='stand-in server latency, seconds')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--payloads', help='directory with recorded weather.json, forecast.json, direct.json')
+    parser.add_argument('--skip-render', action='store_true', help='skip kaleido rendering benchmarks')
+    parser.add_argument('--output', help='JSON file for the results (default: logs/benchmarks/<time>.json)')
+    parser.add_argument('--compare', help='baseline results JSON to compare medians with')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='allowed median slowdown, 0.2 = 20%%')
+    parser.add_argument('--min-delta-ms', type=float, default=0.05, help='ignore slowdowns smaller than this')
+    args = parser.parse_args()
+
+    report = run(args)
+
+    output = args.output or os.path.join('logs', 'benchmarks', f"{report['meta']['timestamp'].replace(':', '-')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.max_regression, args.min_delta_ms)
+        print(f"Results written to {output}")
+        if regressions:
+            print(f"Slower than allowed: {', '.join(regressions)}")
+            sys.exit(1)
+        return
+
+    print(f"{'benchmark':<45} {'p50, ms':>10} {'p95, ms':>10}")
+    for row in report['results']:
+        print(f"{row['name']:<45} {row['p50_ms']:>10.3f} {row['p95_ms']:>10.3f}")
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
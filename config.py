@@ -12,6 +12,99 @@ class Config:
 
     # OpenWeather настройки
     OPENWEATHER_API_KEY = os.getenv('OPENWEATHER_API_KEY')
+    OPENWEATHER_BASE_URL = os.getenv('OPENWEATHER_BASE_URL', 'https://api.openweathermap.org').rstrip('/')  # для бенчмарков — адрес локальной заглушки
+
+    # HTTP-клиент для OpenWeather: пул соединений, таймауты, повторы
+    HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 4))  # число хостов в пуле
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 32))  # соединений на хост
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05))  # секунд
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 10))  # секунд
+    HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 3))
+    HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', 0.3))
+    HTTP_BACKOFF_JITTER = float(os.getenv('HTTP_BACKOFF_JITTER', 0.3))
+    HTTP_RETRY_AFTER_MAX = float(os.getenv('HTTP_RETRY_AFTER_MAX', 10))  # секунд
+
+    # Параллельная обработка городов маршрута
+    WEATHER_MAX_WORKERS = int(os.getenv('WEATHER_MAX_WORKERS', 8))
+
+    # Кэш геокодирования (память + опционально SQLite на диске)
+    GEOCODING_CACHE_SIZE = int(os.getenv('GEOCODING_CACHE_SIZE', 1024))
+    GEOCODING_CACHE_TTL = int(os.getenv('GEOCODING_CACHE_TTL', 30 * 24 * 60 * 60))  # секунд
+    GEOCODING_CACHE_NEGATIVE_TTL = int(os.getenv('GEOCODING_CACHE_NEGATIVE_TTL', 60 * 60))  # секунд
+    GEOCODING_CACHE_PATH = os.getenv('GEOCODING_CACHE_PATH')  # например, instance/geocoding.sqlite3
+    GEOCODING_CACHE_TRUSTED = os.getenv('GEOCODING_CACHE_TRUSTED', 'true').lower() == 'true'  # не валидировать записи с диска повторно
+
+    # Кэш ответов погоды и прогноза
+    WEATHER_CACHE_SIZE = int(os.getenv('WEATHER_CACHE_SIZE', 2048))
+    WEATHER_CACHE_PRECISION = int(os.getenv('WEATHER_CACHE_PRECISION', 2))  # знаков после запятой в координатах
+    WEATHER_CACHE_GEOHASH_PRECISION = int(os.getenv('WEATHER_CACHE_GEOHASH_PRECISION', 5))  # ячейка ~4.9 x 4.9 км; 0 — по округлённым координатам
+    WEATHER_CACHE_TTL_CURRENT = int(os.getenv('WEATHER_CACHE_TTL_CURRENT', 10 * 60))  # /weather обновляется раз в 10 минут
+    WEATHER_CACHE_TTL_FORECAST = int(os.getenv('WEATHER_CACHE_TTL_FORECAST', 3 * 60 * 60))  # /forecast раз в 3 часа
+    WEATHER_CACHE_STALE_TTL = int(os.getenv('WEATHER_CACHE_STALE_TTL', 5 * 60))  # отдаём устаревшее, пока обновляем
+
+    # Коридор маршрута: точки по дуге большого круга между городами
+    CORRIDOR_SPACING_KM = float(os.getenv('CORRIDOR_SPACING_KM', 50))  # шаг между точками
+    CORRIDOR_GRID_DEG = float(os.getenv('CORRIDOR_GRID_DEG', 0.25))  # размер ячейки сетки, градусов
+    # Верхняя граница запросов на маршрут; вместе с двумя городами укладывается в минутную квоту /weather
+    CORRIDOR_MAX_POINTS = int(os.getenv('CORRIDOR_MAX_POINTS', 20))
+
+    # JSON API маршрута
+    API_MAX_CITIES = int(os.getenv('API_MAX_CITIES', 25))  # городов в одном запросе
+
+    # Пакетная проверка маршрутов
+    BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', 8))  # одновременных запросов городов
+    BATCH_PROCESSES = int(os.getenv('BATCH_PROCESSES', 0))  # процессов анализа: 0 — по числу ядер
+    BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', 500))  # маршрутов между контрольными точками
+    BATCH_API_MAX_ROUTES = int(os.getenv('BATCH_API_MAX_ROUTES', 1000))  # больше — 400, для них есть batch_routes.py
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 1024 * 1024))  # байт в теле запроса; больше — 413 до разбора
+    BATCH_MAX_CITIES = int(os.getenv('BATCH_MAX_CITIES', 10000))  # погода скольких городов хранится между чанками
+    BATCH_THROTTLE_RETRIES = int(os.getenv('BATCH_THROTTLE_RETRIES', 3))  # повторов города, не дождавшегося квоты
+
+    # Ограничение частоты вызовов OpenWeather по тарифу: в минуту и в сутки (0 — без суточного лимита)
+    RATE_LIMIT_GEO_PER_MINUTE = int(os.getenv('RATE_LIMIT_GEO_PER_MINUTE', 10))
+    RATE_LIMIT_GEO_PER_DAY = int(os.getenv('RATE_LIMIT_GEO_PER_DAY', 5000))
+    RATE_LIMIT_WEATHER_PER_MINUTE = int(os.getenv('RATE_LIMIT_WEATHER_PER_MINUTE', 30))
+    RATE_LIMIT_WEATHER_PER_DAY = int(os.getenv('RATE_LIMIT_WEATHER_PER_DAY', 16000))
+    RATE_LIMIT_FORECAST_PER_MINUTE = int(os.getenv('RATE_LIMIT_FORECAST_PER_MINUTE', 20))
+    RATE_LIMIT_FORECAST_PER_DAY = int(os.getenv('RATE_LIMIT_FORECAST_PER_DAY', 12000))
+    RATE_LIMIT_MAX_WAITING = int(os.getenv('RATE_LIMIT_MAX_WAITING', 100))  # вызовов в очереди ожидания
+    RATE_LIMIT_MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', 10))  # секунд ожидания одного вызова
+    RATE_LIMIT_BACKGROUND_MAX_WAIT = float(os.getenv('RATE_LIMIT_BACKGROUND_MAX_WAIT', 600))  # то же для фона и пакетов
+
+    # Фоновое обновление погоды популярных городов до истечения кэша
+    OPENWEATHER_CALLS_PER_MINUTE = int(os.getenv('OPENWEATHER_CALLS_PER_MINUTE', 60))  # квота тарифа OpenWeather
+    PREFETCH_ENABLED = os.getenv('PREFETCH_ENABLED', 'true').lower() == 'true'
+    PREFETCH_TOP_N = int(os.getenv('PREFETCH_TOP_N', 20))  # сколько самых запрашиваемых городов держать тёплыми
+    PREFETCH_INTERVAL = float(os.getenv('PREFETCH_INTERVAL', 60))  # секунд между проходами
+    PREFETCH_LEAD_TIME = float(os.getenv('PREFETCH_LEAD_TIME', 120))  # обновлять, если до истечения меньше, секунд
+    PREFETCH_HALF_LIFE = float(os.getenv('PREFETCH_HALF_LIFE', 60 * 60))  # период полураспада счётчика запросов
+    PREFETCH_QUOTA_SHARE = float(os.getenv('PREFETCH_QUOTA_SHARE', 0.2))  # доля квоты на фоновые запросы
+
+    # Метрики: /metrics в формате Prometheus, по умолчанию выключены; у бота — отдельный порт (0 — выключено)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')  # если задан, /metrics требует Authorization: Bearer <токен>
+    BOT_METRICS_PORT = int(os.getenv('BOT_METRICS_PORT', 0))
+    BOT_METRICS_HOST = os.getenv('BOT_METRICS_HOST', '127.0.0.1')
+
+    # Профилирование отдельных запросов: заголовок X-Profile или ?profile=1 (только с включённым флагом или в debug)
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_TOKEN = os.getenv('PROFILING_TOKEN')  # если задан, X-Profile должен с ним совпадать
+    PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0.0))  # доля запросов /weather, профилируемых всегда
+    PROFILING_DIR = os.getenv('PROFILING_DIR', os.path.join('logs', 'profiles'))
+    PROFILING_MAX_FILES = int(os.getenv('PROFILING_MAX_FILES', 100))  # сколько профилей хранить, старые удаляются
+
+    # Режим графиков: 'png' (рисует сервер) или 'json' (рисует браузер через Plotly.js)
+    PLOT_MODE = os.getenv('PLOT_MODE', 'png')
+
+    # Пул процессов kaleido для PNG: 0 — по числу ядер
+    PLOT_RENDERER_WORKERS = int(os.getenv('PLOT_RENDERER_WORKERS', 0))
+    PLOT_RENDERER_TIMEOUT = float(os.getenv('PLOT_RENDERER_TIMEOUT', 15))  # секунд на один график
+    PLOT_RENDERER_WARMUP = os.getenv('PLOT_RENDERER_WARMUP', 'true').lower() == 'true'
+
+    # Кэш отрисованных графиков
+    PLOT_CACHE_SIZE = int(os.getenv('PLOT_CACHE_SIZE', 512))
+    PLOT_CACHE_MAX_BYTES = int(os.getenv('PLOT_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    PLOT_CACHE_TTL = int(os.getenv('PLOT_CACHE_TTL', 3 * 60 * 60))  # секунд
 
     # Настройки безопасности
     SESSION_COOKIE_SECURE = True
@@ -1,7 +1,12 @@
 import os
 from app import create_app
+from app.services.plot_renderer import warm_up_renderer_pool
 
 app = create_app()
 
+# Прогреваем kaleido только в процессе сервера: CLI, тесты и бенчмарки создают приложение без него
+if app.config['PLOT_RENDERER_WARMUP'] and app.config['PLOT_MODE'] == 'png':
+    warm_up_renderer_pool()
+
 if __name__ == '__main__':
     app.run()
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from typing import Any, Dict
@@ -9,7 +10,11 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.storage.memory import MemoryStorage
 from dotenv import load_dotenv
 
-from app.services.weather_service import WeatherService
+from config import Config
+from app.services.async_http_client import close_async_session
+from app.services.async_weather_service import AsyncWeatherService
+from app.services.metrics import start_metrics_server
+from app.services.route_corridor_service import analyze_corridor, drop_failed_points, plan_corridor
 from app.services.weather_analyzer_service import WeatherAnalyzerService
 
 # Configure logging
@@ -34,7 +39,8 @@ class WeatherForm(StatesGroup):
 async def send_welcome(message: Message) -> None:
     await message.reply(
         "Привет! Я бот для предсказания неблагоприятных погодных условий. "
-        "Используй команду /weather, чтобы узнать погоду для маршрута."
+        "Используй команду /weather, чтобы узнать погоду для маршрута, "
+        "или /corridor, чтобы узнать её и по пути между городами."
     )
 
 
@@ -43,12 +49,22 @@ async def send_help(message: Message) -> None:
     await message.reply(
         "/start - Приветственное сообщение\n"
         "/help - Список доступных команд\n"
-        "/weather - Узнать погоду для маршрута"
+        "/weather - Узнать погоду для маршрута\n"
+        "/corridor - Узнать погоду для маршрута и по пути"
     )
 
 
 @router.message(Command("weather"))
 async def weather_start(message: Message, state: FSMContext) -> None:
+    await state.update_data(corridor=False)
+    await state.set_state(WeatherForm.start_city)
+    await message.reply("Введите начальную точку маршрута:")
+
+
+@router.message(Command("corridor"))
+async def corridor_start(message: Message, state: FSMContext) -> None:
+    # Коридор стоит до CORRIDOR_MAX_POINTS запросов к OpenWeather, поэтому только по явной команде
+    await state.update_data(corridor=True)
     await state.set_state(WeatherForm.start_city)
     await message.reply("Введите начальную точку маршрута:")
 
@@ -60,6 +76,50 @@ async def process_start_city(message: Message, state: FSMContext) -> None:
     await message.reply("Введите конечную точку маршрута:")
 
 
+async def build_route_reply(weather_service: AsyncWeatherService, analyzer: WeatherAnalyzerService,
+                            start_city: str, end_city: str, corridor: bool = False) -> str:
+    """Reply text for a route: weather and warnings at both ends, and along the way with ``corridor``"""
+    # Запрашиваем обе точки маршрута одновременно, не блокируя цикл событий
+    start_bundle, end_bundle = await asyncio.gather(
+        weather_service.get_weather_bundle_by_city(start_city),
+        weather_service.get_weather_bundle_by_city(end_city)
+    )
+    start_weather = start_bundle.current
+    end_weather = end_bundle.current
+
+    start_warning = analyzer.analyze_weather(start_weather)
+    end_warning = analyzer.analyze_weather(end_weather)
+
+    reply = (
+        f"Погода в {start_city}:\n"
+        f"Температура: {start_weather.main.temp}°C\n"
+        f"Описание: {start_weather.weather[0].description}\n"
+        f"Предупреждение: {start_warning.description}\n\n"
+        f"Погода в {end_city}:\n"
+        f"Температура: {end_weather.main.temp}°C\n"
+        f"Описание: {end_weather.weather[0].description}\n"
+        f"Предупреждение: {end_warning.description}"
+    )
+    if not corridor:
+        return reply
+
+    # Погода в промежуточных точках по дуге большого круга между городами
+    points = plan_corridor(start_bundle.location, end_bundle.location)
+    # Точка без погоды (ошибка или нет квоты) выпадает, а не проваливает весь ответ
+    results = await asyncio.gather(*(
+        weather_service.get_weather_by_coordinates(point.lat, point.lon) for point in points
+    ), return_exceptions=True)
+    points, corridor_weather = drop_failed_points(points, results)
+    analysis = analyze_corridor(analyzer, corridor_weather)
+    reply += f"\n\nВ пути ({len(points)} точек): {analysis.description}"
+    if analysis.worst_window:
+        reply += (
+            f"\nХудший участок: {points[analysis.worst_window.start].distance_km:.0f}–"
+            f"{points[analysis.worst_window.end].distance_km:.0f} км от начала"
+        )
+    return reply
+
+
 @router.message(WeatherForm.end_city)
 async def process_end_city(message: Message, state: FSMContext) -> None:
     await state.update_data(end_city=message.text)
@@ -69,26 +129,8 @@ async def process_end_city(message: Message, state: FSMContext) -> None:
     end_city = data['end_city']
 
     try:
-        weather_service = WeatherService()
-        analyzer = WeatherAnalyzerService()
-
-        start_weather = weather_service.get_weather_by_city(start_city)
-        end_weather = weather_service.get_weather_by_city(end_city)
-
-        start_warning = analyzer.analyze_weather(start_weather)
-        end_warning = analyzer.analyze_weather(end_weather)
-
-        response = (
-            f"Погода в {start_city}:\n"
-            f"Температура: {start_weather.main.temp}°C\n"
-            f"Описание: {start_weather.weather[0].description}\n"
-            f"Предупреждение: {start_warning.description}\n\n"
-            f"Погода в {end_city}:\n"
-            f"Температура: {end_weather.main.temp}°C\n"
-            f"Описание: {end_weather.weather[0].description}\n"
-            f"Предупреждение: {end_warning.description}"
-        )
-
+        response = await build_route_reply(AsyncWeatherService(), WeatherAnalyzerService(), start_city, end_city,
+                                           corridor=data.get('corridor', False))
         await message.reply(response)
     except Exception as e:
         logger.error(f"Error fetching weather data: {e}")
@@ -100,20 +142,26 @@ async def process_end_city(message: Message, state: FSMContext) -> None:
     await state.clear()
 
 
-async def main() -> None:
+async def run_bot() -> None:
     bot = Bot(token=API_TOKEN)
     dp = Dispatcher(storage=MemoryStorage())
 
     # Register router
     dp.include_router(router)
 
+    # Метрики бота отдаются со своего порта: Flask в этом процессе не запущен
+    if Config.BOT_METRICS_PORT:
+        start_metrics_server(Config.BOT_METRICS_PORT, Config.BOT_METRICS_HOST, Config.METRICS_TOKEN)
+
     # Start polling
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await close_async_session()
 
 
 def main():
-    import asyncio
-    asyncio.run(main())
+    asyncio.run(run_bot())
 
 if __name__ == '__main__':
     main()
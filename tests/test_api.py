@@ -1,3 +1,4 @@
+import json
 import unittest
 from unittest.mock import patch, Mock
 
@@ -12,7 +13,7 @@ class TestWeatherService(unittest.TestCase):
     def setUp(self):
         self.weather_service = WeatherService()
 
-    @patch('app.services.weather_service.requests.get')
+    @patch('app.services.weather_service.http_get')
     def test_get_weather_by_coordinates_api_failure(self, mock_get):
         # Mock the API response to raise an exception
         mock_get.side_effect = requests.RequestException("API request failed")
@@ -20,11 +21,11 @@ class TestWeatherService(unittest.TestCase):
         with self.assertRaises(WeatherAPIException):
             self.weather_service.get_weather_by_coordinates(35, 139)
 
-    @patch('app.services.weather_service.requests.get')
+    @patch('app.services.weather_service.http_get')
     def test_get_weather_by_coordinates_validation_error(self, mock_get):
         # Mock the API response with invalid data
         mock_response = Mock()
-        mock_response.json.return_value = {}
+        mock_response.content = b'{}'
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
@@ -67,11 +68,42 @@ class TestWeatherService(unittest.TestCase):
         with self.assertRaises(WeatherAPIException):
             self.weather_service.get_weather_by_city("Moscow")
 
-    @patch('app.services.weather_service.requests.get')
+    @patch('app.services.weather_service.GeocodingService.get_coordinates_by_city_name')
+    @patch('app.services.weather_service.WeatherService.get_forecast_columns_by_coordinates')
+    @patch('app.services.weather_service.WeatherService.get_weather_by_coordinates')
+    def test_get_weather_bundle_by_city_geocodes_once(self, mock_get_weather_by_coordinates,
+                                                      mock_get_weather_hourly_by_coordinates,
+                                                      mock_get_coordinates_by_city_name):
+        from app.models import GeocodingResponse, OpenWeatherResponse, HourlyForecast
+        mock_get_coordinates_by_city_name.return_value = GeocodingResponse(
+            name="Moscow", lat=55.7504461, lon=37.6174943, country="RU"
+        )
+        mock_get_weather_by_coordinates.return_value = OpenWeatherResponse(
+            main={"temp": 15.0, "feels_like": 14.0, "pressure": 1012, "humidity": 50},
+            wind={"speed": 3.0}
+        )
+        mock_get_weather_hourly_by_coordinates.return_value = HourlyForecast.from_payload({"cod": "200", "list": []})
+
+        result = self.weather_service.get_weather_bundle_by_city("Moscow", 'ru')
+
+        self.assertEqual(result.location.name, "Moscow")
+        self.assertEqual(result.current.main.temp, 15.0)
+        mock_get_coordinates_by_city_name.assert_called_once_with("Moscow")
+        mock_get_weather_by_coordinates.assert_called_once_with(55.7504461, 37.6174943, 'ru')
+        mock_get_weather_hourly_by_coordinates.assert_called_once_with(55.7504461, 37.6174943, 'ru')
+
+    @patch('app.services.weather_service.GeocodingService.get_coordinates_by_city_name')
+    def test_get_weather_bundle_by_city_non_existent_city(self, mock_get_coordinates_by_city_name):
+        mock_get_coordinates_by_city_name.side_effect = GeocodingAPICityNotFound("City not found")
+
+        with self.assertRaises(GeocodingAPICityNotFound):
+            self.weather_service.get_weather_bundle_by_city("NonExistentCity")
+
+    @patch('app.services.weather_service.http_get')
     def test_get_weather_hourly_by_coordinates(self, mock_get):
         # Mock the API response with valid data
         mock_response = Mock()
-        mock_response.json.return_value = {
+        payload = {
             "cod": "200",
             "message": 0,
             "cnt": 1,
@@ -100,6 +132,7 @@ class TestWeatherService(unittest.TestCase):
                 }
             ]
         }
+        mock_response.content = json.dumps(payload).encode()
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
@@ -111,7 +144,7 @@ class TestWeatherService(unittest.TestCase):
 
 class TestGeocodingService(unittest.TestCase):
 
-    @patch('app.services.geocoding_service.requests.get')
+    @patch('app.services.geocoding_service.http_get')
     def test_get_coordinates_by_city_name_moscow(self, mock_get):
         mock_response = {
             "name": "Moscow",
@@ -124,14 +157,14 @@ class TestGeocodingService(unittest.TestCase):
             "country": "RU",
             "state": "Moscow"
         }
-        mock_get.return_value.json.return_value = [mock_response]
+        mock_get.return_value.content = json.dumps([mock_response]).encode()
         mock_get.return_value.raise_for_status = lambda: None
 
         service = GeocodingService()
         result = service.get_coordinates_by_city_name("Moscow")
         self.assertEqual(result.name, "Moscow")
 
-    @patch('app.services.geocoding_service.requests.get')
+    @patch('app.services.geocoding_service.http_get')
     def test_get_coordinates_by_city_name_moskva(self, mock_get):
         mock_response = {
             "name": "Moscow",
@@ -144,14 +177,14 @@ class TestGeocodingService(unittest.TestCase):
             "country": "RU",
             "state": "Moscow"
         }
-        mock_get.return_value.json.return_value = [mock_response]
+        mock_get.return_value.content = json.dumps([mock_response]).encode()
         mock_get.return_value.raise_for_status = lambda: None
 
         service = GeocodingService()
         result = service.get_coordinates_by_city_name("Москва")
         self.assertEqual(result.name, "Moscow")
 
-    @patch('app.services.geocoding_service.requests.get')
+    @patch('app.services.geocoding_service.http_get')
     def test_get_coordinates_by_city_name_no_local_names(self, mock_get):
         mock_response = {
             "name": "Moscow",
@@ -160,7 +193,7 @@ class TestGeocodingService(unittest.TestCase):
             "country": "RU",
             "state": "Moscow"
         }
-        mock_get.return_value.json.return_value = [mock_response]
+        mock_get.return_value.content = json.dumps([mock_response]).encode()
         mock_get.return_value.raise_for_status = lambda: None
 
         service = GeocodingService()
@@ -168,9 +201,9 @@ class TestGeocodingService(unittest.TestCase):
         self.assertEqual(result.name, "Moscow")
         self.assertIsNone(result.local_names)
 
-    @patch('app.services.geocoding_service.requests.get')
+    @patch('app.services.geocoding_service.http_get')
     def test_get_coordinates_by_city_name_non_existent(self, mock_get):
-        mock_get.return_value.json.return_value = []
+        mock_get.return_value.content = json.dumps([]).encode()
         mock_get.return_value.raise_for_status = lambda: None
 
         service = GeocodingService()
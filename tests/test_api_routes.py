@@ -0,0 +1,107 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from app import create_app
+from app.services.geocoding_service import GeocodingAPICityNotFound
+from app.services.weather_cache import WeatherResponseCache
+from tests.test_routes import make_bundle
+
+
+class TestRouteWeatherAPI(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+
+    @patch('app.services.weather_service.WeatherService.get_weather_bundle_by_city')
+    def test_returns_cities_in_order(self, mock_bundle):
+        mock_bundle.side_effect = lambda city, lang='en': make_bundle(city)
+
+        response = self.client.get('/api/v1/route-weather?lang=en&cities=Alpha,Beta')
+        data = response.get_json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([city['query'] for city in data['cities']], ['Alpha', 'Beta'])
+        self.assertEqual(data['cities'][0]['current']['temp'], 20.0)
+        self.assertEqual(data['cities'][0]['warning']['severity'], 'normal')
+        self.assertEqual(data['cities'][0]['forecast']['temp'], [20.0])
+        self.assertTrue(response.headers['ETag'].startswith('"'))
+        # Nothing is cached for the mocked bundles, so clients must revalidate
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+
+    @patch('app.services.weather_service.WeatherService.get_weather_bundle_by_city')
+    def test_matching_etag_returns_304_without_analysis(self, mock_bundle):
+        mock_bundle.side_effect = lambda city, lang='en': make_bundle(city)
+
+        first = self.client.get('/api/v1/route-weather?lang=en&cities=Alpha')
+        etag = first.headers['ETag']
+        with patch('app.routes.api_routes.WeatherAnalyzerService') as mock_analyzer:
+            second = self.client.get('/api/v1/route-weather?lang=en&cities=Alpha', headers={'If-None-Match': etag})
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.headers['ETag'], etag)
+        self.assertEqual(second.get_data(), b'')
+        mock_analyzer.assert_not_called()
+
+    @patch('app.services.weather_service.WeatherService.get_weather_bundle_by_city')
+    def test_etag_changes_with_observation(self, mock_bundle):
+        bundle = make_bundle('Alpha')
+        mock_bundle.return_value = bundle
+
+        first = self.client.get('/api/v1/route-weather?cities=Alpha&lang=en').headers['ETag']
+        bundle.current.dt += 600
+        second = self.client.get('/api/v1/route-weather?cities=Alpha&lang=en').headers['ETag']
+        other_lang = self.client.get('/api/v1/route-weather?cities=Alpha&lang=ru').headers['ETag']
+
+        self.assertNotEqual(first, second)
+        self.assertNotEqual(second, other_lang)
+
+    @patch('app.services.weather_service.WeatherService.get_weather_bundle_by_city')
+    def test_vary_covers_every_locale_source(self, mock_bundle):
+        mock_bundle.side_effect = lambda city, lang='en': make_bundle(city)
+
+        negotiated = self.client.get('/api/v1/route-weather?cities=Alpha', headers={'Accept-Language': 'ru'})
+        explicit = self.client.get('/api/v1/route-weather?cities=Alpha&lang=ru')
+
+        self.assertEqual(set(negotiated.vary), {'Accept-Language', 'Cookie'})
+        self.assertEqual(set(explicit.vary), set())
+
+    def test_max_age_follows_cached_freshness(self):
+        cache = WeatherResponseCache(ttls={'weather': 600, 'forecast': 10800})
+        bundle = make_bundle('Alpha')
+        lat, lon = bundle.location.lat, bundle.location.lon
+        bundle.current.dt = int(time.time())
+        cache.put(cache.key('weather', lat, lon, 'en'), 'weather', bundle.current)
+        cache.put(cache.key('forecast', lat, lon, 'en', 'columns'), 'forecast', bundle.hourly)
+
+        with patch('app.services.weather_service.get_weather_cache', return_value=cache), \
+                patch('app.services.weather_service.WeatherService.get_weather_bundle_by_city', return_value=bundle):
+            response = self.client.get('/api/v1/route-weather?lang=en&cities=Alpha')
+
+        max_age = int(response.headers['Cache-Control'].split('max-age=')[1].split(',')[0])
+        self.assertTrue(590 <= max_age <= 600)
+
+    @patch('app.services.weather_service.WeatherService.get_weather_bundle_by_city')
+    def test_errors(self, mock_bundle):
+        mock_bundle.side_effect = GeocodingAPICityNotFound("No data found for city: Atlantis")
+
+        self.assertEqual(self.client.get('/api/v1/route-weather?lang=en').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/route-weather?lang=en&cities=Atlantis').status_code, 404)
+
+
+    @patch('app.services.route_corridor_service.GeocodingService.get_coordinates_by_city_name')
+    def test_corridor_errors(self, mock_geocode):
+        mock_geocode.side_effect = GeocodingAPICityNotFound("No data found for city: Atlantis")
+
+        self.assertEqual(self.client.get('/api/v1/route-corridor?lang=en&start=Alpha').status_code, 400)
+        for spacing_km in ('0', '-5', 'nan', 'inf'):
+            with self.subTest(spacing_km=spacing_km):
+                self.assertEqual(self.client.get(
+                    f'/api/v1/route-corridor?lang=en&start=Alpha&end=Beta&spacing_km={spacing_km}'
+                ).status_code, 400)
+        mock_geocode.assert_not_called()
+        self.assertEqual(self.client.get('/api/v1/route-corridor?lang=en&start=Atlantis&end=Beta').status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from unittest.mock import AsyncMock, patch
+
+import aiohttp
+
+from app.models import GeocodingResponse, OpenWeatherResponse, WeatherBundle
+from app.services.async_geocoding_service import AsyncGeocodingService
+from app.services.async_http_client import async_http_get, close_async_session
+from app.services.async_weather_service import AsyncWeatherService
+from app.services.geocoding_cache import GeocodingCache
+from app.services.geocoding_service import GeocodingAPICityNotFound
+from app.services.rate_limiter import RateLimiter
+from app.services.weather_cache import WeatherResponseCache
+from app.services.weather_service import WeatherAPIException
+from tests.test_http_client import ScriptedHandler
+
+CURRENT = {
+    "main": {"temp": 15.0, "feels_like": 14.0, "pressure": 1012, "humidity": 50},
+    "wind": {"speed": 3.0},
+    "dt": 1605182400,
+    "name": "Moscow"
+}
+FORECAST = {"cod": "200", "cnt": 1, "list": [CURRENT]}
+MOSCOW = {"name": "Moscow", "lat": 55.7504461, "lon": 37.6174943, "country": "RU"}
+
+
+class TestAsyncServices(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.weather_cache = WeatherResponseCache(ttls={'weather': 600, 'forecast': 10800})
+        self.geocoding_cache = GeocodingCache()
+
+    async def asyncTearDown(self):
+        await close_async_session()
+
+    def _service(self) -> AsyncWeatherService:
+        return AsyncWeatherService(cache=self.weather_cache)
+
+    @patch('app.services.async_weather_service.async_http_get', new_callable=AsyncMock)
+    async def test_get_weather_by_coordinates(self, mock_get):
+        mock_get.return_value = json.dumps(CURRENT).encode()
+
+        result = await self._service().get_weather_by_coordinates(55.75, 37.62, 'en')
+
+        self.assertIsInstance(result, OpenWeatherResponse)
+        self.assertEqual(result.main.temp, 15.0)
+
+    @patch('app.services.async_weather_service.async_http_get', new_callable=AsyncMock)
+    async def test_api_failure_raises_weather_exception(self, mock_get):
+        mock_get.side_effect = aiohttp.ClientConnectionError("connection refused")
+
+        with self.assertRaises(WeatherAPIException):
+            await self._service().get_weather_by_coordinates(35, 139)
+
+    @patch('app.services.async_weather_service.AsyncGeocodingService')
+    @patch('app.services.async_weather_service.async_http_get', new_callable=AsyncMock)
+    async def test_bundle_geocodes_once(self, mock_get, mock_geocoding_cls):
+        mock_geocoding_cls.return_value = AsyncGeocodingService(cache=self.geocoding_cache)
+        mock_get.side_effect = lambda url, params: json.dumps(FORECAST if url.endswith('forecast') else CURRENT).encode()
+
+        with patch('app.services.async_geocoding_service.async_http_get', new_callable=AsyncMock) as mock_geo:
+            mock_geo.return_value = json.dumps([MOSCOW]).encode()
+            bundle = await self._service().get_weather_bundle_by_city("Moscow")
+            await self._service().get_weather_bundle_by_city("moscow")
+
+        self.assertIsInstance(bundle, WeatherBundle)
+        self.assertEqual(bundle.location, GeocodingResponse(**MOSCOW))
+        self.assertEqual(len(bundle.hourly), 1)
+        self.assertEqual(bundle.hourly.temp.tolist(), [15.0])
+        self.assertEqual(mock_geo.await_count, 1)
+        self.assertEqual(mock_get.await_count, 2)
+
+    @patch('app.services.async_geocoding_service.async_http_get', new_callable=AsyncMock)
+    async def test_city_not_found(self, mock_get):
+        mock_get.return_value = b'[]'
+
+        with self.assertRaises(GeocodingAPICityNotFound):
+            await AsyncGeocodingService(cache=self.geocoding_cache).get_coordinates_by_city_name("NonExistentCity")
+
+
+class TestAsyncHttpClient(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), ScriptedHandler)
+        self.server.hits = 0
+        self.server.script = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/data'
+
+    async def asyncTearDown(self):
+        await close_async_session()
+        self.server.shutdown()
+        self.server.server_close()
+
+    async def test_retries_on_429_with_retry_after(self):
+        self.server.script = [(429, {'Retry-After': '0'}, 0), (200, {}, 0)]
+
+        result = await async_http_get(self.url, {})
+
+        self.assertEqual(json.loads(result), {'ok': True})
+        self.assertEqual(self.server.hits, 2)
+
+    async def test_retry_takes_a_rate_limiter_token(self):
+        self.server.script = [(429, {'Retry-After': '0'}, 0), (200, {}, 0)]
+        limiter = RateLimiter({'data': (1, 0)}, max_wait=0)
+        limiter.acquire('data')  # токен первой попытки
+
+        with patch('app.services.async_http_client.get_rate_limiter', return_value=limiter):
+            with self.assertRaises(aiohttp.ClientResponseError):
+                await async_http_get(self.url, {})
+        self.assertEqual(self.server.hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
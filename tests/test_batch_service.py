@@ -0,0 +1,191 @@
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+from app import create_app
+from app.services.batch_service import Route, RouteBatchJob, read_routes
+from app.services.geocoding_service import GeocodingAPICityNotFound, GeocodingAPIException
+from app.services.rate_limiter import RateLimitExceeded
+from config import Config
+from tests.test_routes import make_bundle
+
+
+def fake_bundle(city, lang='en'):
+    if city == 'Atlantis':
+        raise GeocodingAPICityNotFound(f"No data found for city: {city}")
+    return make_bundle(city)
+
+
+class TestRouteBatchJob(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.routes_path = os.path.join(self.directory.name, 'routes.csv')
+        self.output_path = os.path.join(self.directory.name, 'results.jsonl')
+        self.checkpoint_path = os.path.join(self.directory.name, 'results.ckpt')
+        self.weather_service = Mock()
+        self.weather_service.get_weather_bundle_by_city.side_effect = fake_bundle
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write_routes(self, text: str, mode: str = 'w') -> None:
+        with open(self.routes_path, mode, encoding='utf-8') as f:
+            f.write(text)
+
+    def _job(self, pool) -> RouteBatchJob:
+        return RouteBatchJob(concurrency=2, processes=1, chunk_size=2, weather_service=self.weather_service, pool=pool)
+
+    def _results(self) -> list:
+        with open(self.output_path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_read_routes(self):
+        routes = list(read_routes(['start,end', 'Moscow, Paris', '', 'Rome']))
+
+        self.assertEqual(routes, [Route(line=2, start='Moscow', end='Paris')])
+
+    def test_dedupes_cities_and_keeps_order(self):
+        self._write_routes('start,end\nAlpha,Beta\nbeta,Gamma\nAlpha,Atlantis\n')
+
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            written = self._job(pool).run(self.routes_path, self.output_path)
+
+        results = self._results()
+        self.assertEqual(written, 3)
+        self.assertEqual([result['line'] for result in results], [2, 3, 4])
+        self.assertEqual(results[0]['severity'], 'normal')
+        self.assertEqual(results[2]['status'], 'error')
+        self.assertIn('Atlantis', results[2]['error'])
+        # Alpha, Beta, Gamma and Atlantis: each fetched once
+        self.assertEqual(self.weather_service.get_weather_bundle_by_city.call_count, 4)
+
+    def test_resumes_from_checkpoint(self):
+        self._write_routes('Alpha,Beta\nBeta,Gamma\n')
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            self._job(pool).run(self.routes_path, self.output_path, checkpoint_path=self.checkpoint_path)
+
+        # The next run was interrupted in the middle of writing a chunk
+        self._write_routes('Gamma,Delta\nDelta,Alpha\n', mode='a')
+        with open(self.output_path, 'a', encoding='utf-8') as f:
+            f.write('{"line": 3, "sta')
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            written = self._job(pool).run(self.routes_path, self.output_path, checkpoint_path=self.checkpoint_path)
+
+        self.assertEqual(written, 2)
+        self.assertEqual([result['line'] for result in self._results()], [1, 2, 3, 4])
+
+    def test_csv_output(self):
+        self._write_routes('Alpha,Beta\n')
+        output_path = os.path.join(self.directory.name, 'results.csv')
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            self._job(pool).run(self.routes_path, output_path, fmt='csv')
+
+        with open(output_path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], 'line,start,end,status,severity,conditions,description,error')
+        self.assertTrue(lines[1].startswith('1,Alpha,Beta,ok,normal,'))
+
+
+    def test_descriptions_use_the_job_language(self):
+        self._write_routes('Alpha,Beta\n')
+        job = RouteBatchJob(concurrency=1, processes=1, lang='ru', weather_service=self.weather_service,
+                            pool=ThreadPoolExecutor(max_workers=1))
+
+        job.run(self.routes_path, self.output_path)
+
+        self.assertEqual(self._results()[0]['description'], 'Погодные условия нормальные.')
+
+    def _throttle(self, times: int) -> None:
+        """Let Beta's first ``times`` fetches find no quota, wrapped the way the services wrap it"""
+        calls = {'Beta': 0}
+
+        def bundle(city, lang='en'):
+            if city == 'Beta' and calls['Beta'] < times:
+                calls['Beta'] += 1
+                try:
+                    raise RateLimitExceeded("No OpenWeather quota for geo within 600 seconds")
+                except RateLimitExceeded as e:
+                    raise GeocodingAPIException(f"Failed to fetch geocoding data: {str(e)}")
+            return fake_bundle(city, lang)
+
+        self.weather_service.get_weather_bundle_by_city.side_effect = bundle
+
+    def test_throttled_cities_are_fetched_again(self):
+        self._write_routes('Alpha,Beta\n')
+        self._throttle(times=2)
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            self._job(pool).run(self.routes_path, self.output_path)
+
+        self.assertEqual(self._results()[0]['status'], 'ok')
+
+    def test_throttled_cities_are_not_checkpointed(self):
+        self._write_routes('Alpha,Gamma\nAlpha,Beta\n')
+        self._throttle(times=100)
+
+        with patch.object(Config, 'BATCH_THROTTLE_RETRIES', 1), ThreadPoolExecutor(max_workers=1) as pool:
+            job = RouteBatchJob(concurrency=1, processes=1, chunk_size=1, weather_service=self.weather_service,
+                                pool=pool)
+            with self.assertRaises(RateLimitExceeded):
+                job.run(self.routes_path, self.output_path, checkpoint_path=self.checkpoint_path)
+
+        # Only the first chunk is written; a resumed run starts with Alpha-Beta again
+        self.assertEqual([result['line'] for result in self._results()], [1])
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['lines'], 1)
+
+    def test_cities_kept_between_chunks_are_bounded(self):
+        self._write_routes('A,B\nC,D\nE,F\nA,B\n')
+        job = RouteBatchJob(concurrency=1, processes=1, chunk_size=1, weather_service=self.weather_service,
+                            pool=ThreadPoolExecutor(max_workers=1), max_cities=2)
+
+        job.run(self.routes_path, self.output_path)
+
+        # A and B are dropped while C-D and E-F are evaluated, then fetched again
+        self.assertEqual(self.weather_service.get_weather_bundle_by_city.call_count, 8)
+        self.assertLessEqual(len(job.cities), 4)
+
+
+class TestBatchRoutesAPI(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+
+    @patch('app.routes.api_routes.get_batch_pool', return_value=ThreadPoolExecutor(max_workers=1))
+    @patch('app.services.weather_service.WeatherService.get_weather_bundle_by_city', side_effect=fake_bundle)
+    def test_streams_jsonl(self, mock_bundle, mock_pool):
+        response = self.client.post('/api/v1/batch-routes?lang=en', data='Alpha,Beta\nBeta,Atlantis\n')
+
+        results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual([result['status'] for result in results], ['ok', 'error'])
+
+    @patch('app.routes.api_routes.read_routes')
+    def test_rejects_oversized_body_before_parsing(self, mock_read_routes):
+        self.app.config['MAX_CONTENT_LENGTH'] = 16
+
+        response = self.client.post('/api/v1/batch-routes?lang=ru', data='Alpha,Beta\nBeta,Gamma\n')
+
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.get_json()['error'], 'Слишком большое тело запроса')
+        mock_read_routes.assert_not_called()
+
+    def test_rejects_empty_body(self):
+        self.assertEqual(self.client.post('/api/v1/batch-routes?lang=en', data='').status_code, 400)
+
+    def test_rejects_too_many_routes(self):
+        self.app.config['BATCH_API_MAX_ROUTES'] = 2
+
+        response = self.client.post('/api/v1/batch-routes?lang=en', data='A,B\nB,C\nC,D\n')
+
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,225 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from app.models import GeocodingResponse
+from app.services import geohash
+from app.services.cache import LRUCache, MISSING
+from app.services.geocoding_cache import GeocodingCache, normalize_city_name
+from app.services.geocoding_service import GeocodingService, GeocodingAPICityNotFound
+from app.services.weather_cache import WeatherResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIs(cache.get('b'), MISSING)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = LRUCache(max_size=10, ttl=60, clock=clock)
+        cache.set('a', 1)
+        cache.set('b', 2, ttl=120)
+
+        clock.now += 90
+
+        self.assertIs(cache.get('a'), MISSING)
+        self.assertEqual(cache.get('b'), 2)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+
+class TestGeocodingCache(unittest.TestCase):
+    def setUp(self):
+        self.moscow = GeocodingResponse(name="Moscow", lat=55.7504461, lon=37.6174943, country="RU")
+
+    def test_normalize_city_name(self):
+        self.assertEqual(normalize_city_name('  New   YORK '), 'new york')
+        self.assertEqual(normalize_city_name('Ｍｏｓｃｏｗ'), 'moscow')
+        self.assertEqual(normalize_city_name('МОСКВА'), normalize_city_name('москва'))
+
+    def test_negative_entries(self):
+        cache = GeocodingCache()
+        cache.set_not_found('Atlantis')
+
+        self.assertIsNone(cache.get('atlantis'))
+        self.assertIs(cache.get('Moscow'), MISSING)
+        self.assertEqual(cache.stats()['negative_hits'], 1)
+
+    def test_disk_store_survives_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'geocoding.sqlite3')
+            GeocodingCache(path=path).set('Moscow', self.moscow)
+
+            cache = GeocodingCache(path=path)
+            result = cache.get(' moscow ')
+
+            self.assertEqual(result, self.moscow)
+            self.assertEqual(cache.stats()['disk_hits'], 1)
+            # Second read is served by the in-memory tier
+            cache.get('Moscow')
+            self.assertEqual(cache.stats()['disk_hits'], 1)
+
+    def test_disk_rows_match_with_and_without_validation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'geocoding.sqlite3')
+            GeocodingCache(path=path).set('Moscow', self.moscow)
+
+            trusted = GeocodingCache(path=path, trusted=True).get('Moscow')
+            validated = GeocodingCache(path=path, trusted=False).get('Moscow')
+
+            self.assertEqual(trusted, validated)
+            self.assertIsInstance(trusted, GeocodingResponse)
+
+    @patch('app.services.geocoding_service.http_get')
+    def test_service_geocodes_each_city_once(self, mock_get):
+        mock_get.return_value.content = json.dumps([self.moscow.model_dump()]).encode()
+        mock_get.return_value.raise_for_status = lambda: None
+        service = GeocodingService(cache=GeocodingCache())
+
+        first = service.get_coordinates_by_city_name("Moscow")
+        second = service.get_coordinates_by_city_name("MOSCOW")
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('app.services.geocoding_service.http_get')
+    def test_service_caches_unknown_city(self, mock_get):
+        mock_get.return_value.content = json.dumps([]).encode()
+        mock_get.return_value.raise_for_status = lambda: None
+        service = GeocodingService(cache=GeocodingCache())
+
+        for _ in range(2):
+            with self.assertRaises(GeocodingAPICityNotFound):
+                service.get_coordinates_by_city_name("NonExistentCity")
+
+        self.assertEqual(mock_get.call_count, 1)
+
+
+class TestWeatherResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = WeatherResponseCache(ttls={'weather': 600, 'forecast': 10800}, stale_ttl=300, clock=self.clock)
+
+    def test_nearby_coordinates_share_entry(self):
+        fetch = Mock(return_value=SimpleNamespace(dt=None))
+
+        first = self.cache.get_or_fetch('weather', 55.7504, 37.6174, 'en', fetch)
+        second = self.cache.get_or_fetch('weather', 55.7512, 37.6171, 'en', fetch)
+        self.cache.get_or_fetch('weather', 55.7504, 37.6174, 'ru', fetch)
+        self.cache.get_or_fetch('forecast', 55.7504, 37.6174, 'en', fetch)
+
+        self.assertIs(first, second)
+        self.assertEqual(fetch.call_count, 3)
+
+    def test_expiry_follows_observation_time(self):
+        # Observation taken 8 minutes ago is fresh for 2 more minutes
+        fetch = Mock(return_value=SimpleNamespace(dt=self.clock.now - 480))
+        self.cache.get_or_fetch('weather', 55.75, 37.62, 'en', fetch)
+
+        self.clock.now += 100
+        self.cache.get_or_fetch('weather', 55.75, 37.62, 'en', fetch)
+        self.assertEqual(self.cache.stats()['stale_hits'], 0)
+
+        self.clock.now += 30
+        self.cache.get_or_fetch('weather', 55.75, 37.62, 'en', fetch)
+        self.assertEqual(self.cache.stats()['stale_hits'], 1)
+
+    def test_stale_while_revalidate(self):
+        refreshed = threading.Event()
+        old, new = SimpleNamespace(dt=None), SimpleNamespace(dt=None)
+        self.cache.get_or_fetch('forecast', 55.75, 37.62, 'en', lambda: old)
+
+        def fetch_new():
+            refreshed.set()
+            return new
+
+        self.clock.now += 10800 + 60
+        stale = self.cache.get_or_fetch('forecast', 55.75, 37.62, 'en', fetch_new)
+        self.assertTrue(refreshed.wait(1))
+        for _ in range(100):
+            if self.cache.get_or_fetch('forecast', 55.75, 37.62, 'en', fetch_new) is new:
+                break
+            time.sleep(0.01)
+
+        self.assertIs(stale, old)
+        self.assertIs(self.cache.get_or_fetch('forecast', 55.75, 37.62, 'en', fetch_new), new)
+
+    def test_stale_window_ends(self):
+        fetch = Mock(return_value=SimpleNamespace(dt=None))
+        self.cache.get_or_fetch('weather', 55.75, 37.62, 'en', fetch)
+
+        self.clock.now += 600 + 300
+
+        self.cache.get_or_fetch('weather', 55.75, 37.62, 'en', fetch)
+        self.assertEqual(fetch.call_count, 2)
+
+
+
+class TestGeohashWeatherCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = WeatherResponseCache(ttls={'weather': 600}, clock=self.clock, geohash_precision=5)
+
+    def test_points_in_one_cell_share_entry(self):
+        fetch = Mock(return_value=SimpleNamespace(dt=None))
+
+        # Two points ~1.5 km apart: different at two decimals, same geohash cell
+        first = self.cache.get_or_fetch('weather', 55.7504, 37.6174, 'en', fetch)
+        second = self.cache.get_or_fetch('weather', 55.7600, 37.6300, 'en', fetch)
+
+        self.assertIs(first, second)
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(geohash.encode(*self.cache.cell_center(55.7504, 37.6174), 5), geohash.encode(55.7504, 37.6174, 5))
+
+    def test_nearest_looks_into_neighbouring_cells(self):
+        observation = SimpleNamespace(dt=None)
+        self.cache.get_or_fetch('weather', 55.7504, 37.6174, 'en', lambda: observation)
+        min_lat, min_lon, max_lat, max_lon = geohash.bounds(geohash.encode(55.7504, 37.6174, 5))
+        just_north = max_lat + 0.001
+
+        self.assertIs(self.cache.nearest('weather', just_north, 37.6174, 'en'), observation)
+        self.assertIs(self.cache.nearest('weather', just_north + 1, 37.6174, 'en'), MISSING)
+        self.assertEqual(self.cache.stats()['nearest_hits'], 1)
+
+        self.clock.now += 601
+        self.assertIs(self.cache.nearest('weather', just_north, 37.6174, 'en'), MISSING)
+
+
+class TestGeohash(unittest.TestCase):
+    def test_encode_decode(self):
+        self.assertEqual(geohash.encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        lat, lon = geohash.decode('u4pruydqqvj')
+        self.assertAlmostEqual(lat, 57.64911, places=4)
+        self.assertAlmostEqual(lon, 10.40744, places=4)
+
+    def test_neighbors(self):
+        cells = geohash.neighbors('ucfv0')
+
+        self.assertEqual(len(set(cells)), 8)
+        self.assertNotIn('ucfv0', cells)
+        self.assertEqual(len(geohash.neighbors('upbpb')), 5)  # next to the north pole
+
+if __name__ == '__main__':
+    unittest.main()
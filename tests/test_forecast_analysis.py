@@ -0,0 +1,81 @@
+import unittest
+
+from app.models import OpenWeatherHourlyResponse, OpenWeatherResponse, Main, Wind, Rain, Snow
+from app.services.weather_analyzer_service import WeatherAnalyzerService, WeatherSeverity
+
+
+def make_slot(dt: int, temp: float = 20.0, wind: float = 5.0, rain: dict = None, snow: dict = None,
+              visibility: int = 10000) -> OpenWeatherResponse:
+    return OpenWeatherResponse(
+        main=Main(temp=temp, feels_like=temp, pressure=1013, humidity=50),
+        wind=Wind(speed=wind),
+        rain=Rain(**rain) if rain else None,
+        snow=Snow(**snow) if snow else None,
+        visibility=visibility,
+        dt=dt
+    )
+
+
+def make_forecast(*slots: OpenWeatherResponse) -> OpenWeatherHourlyResponse:
+    return OpenWeatherHourlyResponse(cod="200", cnt=len(slots), list=list(slots))
+
+
+class TestAnalyzeForecast(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = WeatherAnalyzerService()
+        self.step = 3 * 60 * 60
+
+    def test_normal_forecast(self):
+        forecast = make_forecast(*(make_slot(i * self.step) for i in range(1, 5)))
+
+        result = self.analyzer.analyze_forecast(forecast)
+
+        self.assertEqual(result.severity, WeatherSeverity.NORMAL)
+        self.assertEqual(result.timeline, [1, 1, 1, 1])
+        self.assertEqual(result.conditions, [])
+        self.assertIsNone(result.worst_window)
+        self.assertEqual(result.description, "Weather conditions are normal.")
+
+    def test_timeline_and_worst_window(self):
+        forecast = make_forecast(
+            make_slot(1 * self.step),
+            make_slot(2 * self.step, wind=16.0),
+            make_slot(3 * self.step, temp=-15.0),
+            make_slot(4 * self.step, wind=17.0),
+            make_slot(5 * self.step, rain={'3h': 95.0}),
+            make_slot(6 * self.step, visibility=500),
+        )
+
+        result = self.analyzer.analyze_forecast(forecast)
+
+        self.assertEqual(result.timeline, [1, 3, 2, 3, 3, 2])
+        self.assertEqual(result.severity, WeatherSeverity.EXTREME)
+        self.assertEqual(result.conditions, ["extreme_cold", "extreme_wind", "extreme_rain", "poor_visibility"])
+        self.assertEqual((result.worst_window.start, result.worst_window.end), (3, 4))
+        self.assertEqual(result.worst_window.start_dt, 4 * self.step)
+        self.assertEqual(result.worst_window.conditions, ["extreme_wind", "extreme_rain"])
+
+    def test_matches_single_slot_analysis(self):
+        slots = [
+            make_slot(1, temp=35.0),
+            make_slot(2, wind=12.0),
+            make_slot(3, rain={'1h': 20.0}),
+            make_slot(4, snow={'1h': 25.0}),
+            make_slot(5, visibility=0),
+        ]
+        for slot in slots:
+            with self.subTest(dt=slot.dt):
+                single = self.analyzer.analyze_weather(slot)
+                forecast = self.analyzer.analyze_forecast(make_forecast(slot))
+                self.assertEqual(forecast.severity, single.severity)
+                self.assertEqual(forecast.conditions, single.conditions)
+
+    def test_empty_forecast(self):
+        result = self.analyzer.analyze_forecast(OpenWeatherHourlyResponse(cod="200", list=[]))
+
+        self.assertEqual(result.severity, WeatherSeverity.NORMAL)
+        self.assertEqual(result.timeline, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
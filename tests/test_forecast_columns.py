@@ -0,0 +1,60 @@
+import math
+import unittest
+
+from app.models import HourlyForecast, OpenWeatherHourlyResponse, Rain, precipitation_rate
+from app.services.weather_analyzer_service import WeatherAnalyzerService, _forecast_arrays
+from benchmarks.payloads import forecast_payload
+
+
+class TestHourlyForecast(unittest.TestCase):
+    def setUp(self):
+        self.payload = forecast_payload(slots=8)
+        self.forecast = HourlyForecast.from_payload(self.payload)
+
+    def test_columns_match_models(self):
+        models = OpenWeatherHourlyResponse(**self.payload).list
+
+        self.assertEqual(len(self.forecast), len(models))
+        self.assertEqual(self.forecast.temp.tolist(), [entry.main.temp for entry in models])
+        self.assertEqual(self.forecast.wind_speed.tolist(), [entry.wind.speed for entry in models])
+        self.assertEqual(self.forecast.pretty_dt, [entry.pretty_dt for entry in models])
+
+    def test_precipitation_rate_reads_dicts_and_models_alike(self):
+        for raw, expected in (({'1h': 2.0}, 2.0), ({'3h': 6.0}, 2.0), ({'1h': 1.0, '3h': 9.0}, 1.0)):
+            self.assertEqual(precipitation_rate(raw), expected)
+            self.assertEqual(precipitation_rate(Rain(**raw)), expected)
+        self.assertTrue(math.isnan(precipitation_rate(None)))
+        self.assertTrue(math.isnan(precipitation_rate(Rain())))
+
+    def test_rows_read_from_columns(self):
+        row = self.forecast[-1]
+
+        self.assertEqual(row.temp, float(self.forecast.temp[-1]))
+        self.assertEqual(row.rounded_temp, round(self.forecast.temp[-1]))
+        self.assertEqual(row.description, self.forecast.description[-1])
+        self.assertEqual(len(list(self.forecast)), len(self.forecast))
+        with self.assertRaises(IndexError):
+            self.forecast[len(self.forecast)]
+
+    def test_analyzer_matches_model_path(self):
+        analyzer = WeatherAnalyzerService()
+        expected = analyzer.analyze_forecast(OpenWeatherHourlyResponse(**self.payload))
+
+        result = analyzer.analyze_forecast(self.forecast)
+
+        self.assertEqual(result.timeline, expected.timeline)
+        self.assertEqual(result.conditions, expected.conditions)
+
+    def test_analyzer_arrays_are_not_copied(self):
+        arrays = _forecast_arrays(self.forecast)
+
+        self.assertIs(arrays['temp'], self.forecast.temp)
+        self.assertIs(arrays['wind'], self.forecast.wind_speed)
+
+    def test_malformed_payload(self):
+        with self.assertRaises(ValueError):
+            HourlyForecast.from_payload({'list': [{'dt': 1}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import requests
+
+from app.services import http_client
+from app.services.metrics import UPSTREAM_RESPONSES, UPSTREAM_RETRIES
+from app.services.rate_limiter import RateLimiter
+from config import Config
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Answers with the next (status, headers, delay) from the server script"""
+
+    def do_GET(self):
+        self.server.hits += 1
+        status, headers, delay = self.server.script.pop(0) if self.server.script else (200, {}, 0)
+        time.sleep(delay)
+        body = b'{"ok": true}'
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        http_client.close_session()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), ScriptedHandler)
+        self.server.hits = 0
+        self.server.script = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/data'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        http_client.close_session()
+
+    def test_session_is_shared(self):
+        self.assertIs(http_client.get_session(), http_client.get_session())
+
+    def test_retries_on_429_with_retry_after(self):
+        self.server.script = [(429, {'Retry-After': '0'}, 0), (200, {}, 0)]
+        retries, successes = UPSTREAM_RETRIES.value('data'), UPSTREAM_RESPONSES.value('data', '200')
+
+        response = http_client.http_get(self.url, {'q': 'Moscow'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.hits, 2)
+        self.assertEqual(UPSTREAM_RETRIES.value('data'), retries + 1)
+        self.assertEqual(UPSTREAM_RESPONSES.value('data', '200'), successes + 1)
+
+    def test_retry_takes_a_rate_limiter_token(self):
+        self.server.script = [(429, {'Retry-After': '0'}, 0), (200, {}, 0)]
+        limiter = RateLimiter({'data': (1, 0)}, max_wait=0)
+        limiter.acquire('data')  # токен первой попытки
+
+        with patch.object(http_client, 'get_rate_limiter', return_value=limiter):
+            response = http_client.http_get(self.url, {})
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(self.server.hits, 1)
+
+    def test_returns_last_error_when_retries_exhausted(self):
+        self.server.script = [(503, {'Retry-After': '0'}, 0)] * 10
+
+        with patch.object(Config, 'HTTP_RETRIES', 1):
+            http_client.close_session()
+            response = http_client.http_get(self.url, {})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.server.hits, 2)
+        with self.assertRaises(requests.HTTPError):
+            response.raise_for_status()
+
+    def test_read_timeout(self):
+        self.server.script = [(200, {}, 0.5)]
+
+        with patch.object(Config, 'HTTP_RETRIES', 0), patch.object(Config, 'HTTP_READ_TIMEOUT', 0.1):
+            http_client.close_session()
+            with self.assertRaises(requests.RequestException):
+                http_client.http_get(self.url, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import patch
+
+from app import create_app
+from app.services.metrics import Registry, STAGE_SECONDS, timed
+from config import Config
+
+
+class TestRegistry(unittest.TestCase):
+    def test_renders_text_exposition_format(self):
+        registry = Registry()
+        counter = registry.counter('calls_total', 'Calls', ['endpoint', 'status'])
+        histogram = registry.histogram('stage_seconds', 'Stage time', ['stage'], buckets=(0.1, 1))
+        counter.inc('weather', '200')
+        counter.inc('weather', '200')
+        histogram.observe(0.05, 'parse')
+        histogram.observe(0.5, 'parse')
+        histogram.observe(5, 'parse')
+
+        text = registry.render()
+
+        self.assertIn('# TYPE calls_total counter\n', text)
+        self.assertIn('calls_total{endpoint="weather",status="200"} 2\n', text)
+        self.assertIn('# TYPE stage_seconds histogram\n', text)
+        self.assertIn('stage_seconds_bucket{stage="parse",le="0.1"} 1\n', text)
+        self.assertIn('stage_seconds_bucket{stage="parse",le="1"} 2\n', text)
+        self.assertIn('stage_seconds_bucket{stage="parse",le="+Inf"} 3\n', text)
+        self.assertIn('stage_seconds_sum{stage="parse"} 5.55\n', text)
+        self.assertIn('stage_seconds_count{stage="parse"} 3\n', text)
+
+    def test_failing_collector_does_not_break_scrape(self):
+        registry = Registry()
+        registry.counter('calls_total', 'Calls').inc()
+        registry.add_collector(lambda: 1 / 0)
+
+        self.assertIn('calls_total 1\n', registry.render())
+
+    def test_timed_observes_even_on_error_and_can_be_disabled(self):
+        count = STAGE_SECONDS.count('test_stage')
+        with patch.object(Config, 'METRICS_ENABLED', True), self.assertRaises(ValueError), timed('test_stage'):
+            raise ValueError('boom')
+        self.assertEqual(STAGE_SECONDS.count('test_stage'), count + 1)
+
+        with patch.object(Config, 'METRICS_ENABLED', False), timed('test_stage'):
+            pass
+        self.assertEqual(STAGE_SECONDS.count('test_stage'), count + 1)
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(Config, 'METRICS_ENABLED', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+
+    def test_metrics_exposes_requests_stages_and_caches(self):
+        self.client.get('/weather?lang=en')
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+        text = response.get_data(as_text=True)
+        self.assertIn('app_request_seconds_count{route="/weather",status="200"}', text)
+        self.assertIn('cache_hit_ratio{cache="weather"}', text)
+        self.assertIn('openweather_quota_waiting 0', text)
+
+    def test_token_protects_metrics(self):
+        self.app.config['METRICS_TOKEN'] = 'secret'
+
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code, 200)
+
+    def test_endpoint_is_not_registered_when_disabled(self):
+        with patch.object(Config, 'METRICS_ENABLED', False):
+            app = create_app()
+
+        self.assertEqual(app.test_client().get('/metrics').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+import plotly.graph_objs as go
+from flask import Flask
+from flask_babel import Babel
+
+from app.services import plot_service
+from app.services.plot_renderer import KaleidoRendererPool, PlotlyScope, PlotRenderTimeout
+
+
+def fake_pool() -> Mock:
+    pool = Mock()
+    pool.render.return_value = b'png'
+    pool.render_many.side_effect = lambda figures: [b'png'] * len(figures)
+    return pool
+
+
+class TestPlotCache(unittest.TestCase):
+    def setUp(self):
+        plot_service.plot_cache.clear()
+        self.dates = ['12.11 12:00', '12.11 15:00', '12.11 18:00']
+        self.pool = fake_pool()
+        patcher = patch('app.services.plot_service.get_renderer_pool', return_value=self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeat_render_is_served_from_cache(self):
+        first = plot_service.create_weather_plot_temp(self.dates, [1.0, 2.0, 3.0])
+        second = plot_service.create_weather_plot_temp(list(self.dates), [1.0, 2.0, 3.0])
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.pool.render.call_count, 1)
+        self.assertEqual(plot_service.plot_cache.stats()['hits'], 1)
+
+    def test_key_covers_kind_values_and_locale(self):
+        plot_service.create_weather_plot_temp(self.dates, [1.0, 2.0, 3.0])
+        plot_service.create_weather_plot_wind(self.dates, [1.0, 2.0, 3.0])
+        plot_service.create_weather_plot_temp(self.dates, [1.0, 2.0, 4.0])
+
+        app = Flask(__name__)
+        Babel(app, locale_selector=lambda: 'ru')
+        with app.test_request_context():
+            plot_service.create_weather_plot_temp(self.dates, [1.0, 2.0, 3.0])
+
+        self.assertEqual(self.pool.render.call_count, 4)
+
+    def test_batch_renders_only_missing_plots_once(self):
+        plot_service.create_weather_plot_temp(self.dates, [1.0, 2.0, 3.0])
+
+        images = plot_service.create_weather_plots([
+            ('temp', self.dates, [1.0, 2.0, 3.0]),
+            ('wind', self.dates, [4.0, 5.0, 6.0]),
+            ('wind', self.dates, [4.0, 5.0, 6.0]),
+        ])
+
+        self.assertEqual(len(images), 3)
+        self.pool.render_many.assert_called_once()
+        self.assertEqual(len(self.pool.render_many.call_args.args[0]), 1)
+
+    def test_cache_is_bounded_by_bytes(self):
+        cache = plot_service.SizedLRUCache(max_size=100, max_bytes=10)
+        cache.set('a', 'xxxx')
+        cache.set('b', 'xxxx')
+        cache.set('c', 'xxxx')
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()['bytes'], 8)
+        self.assertEqual(cache.get('a', None), None)
+
+        cache.set('huge', 'x' * 11)
+        self.assertEqual(len(cache), 2)
+
+
+class SlowScope:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def transform(self, fig_dict, format):
+        time.sleep(self.delay)
+        return b'png'
+
+
+class TestRendererPoolTimeout(unittest.TestCase):
+    def setUp(self):
+        patcher = patch('app.services.plot_renderer.PlotlyScope', Mock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_timeout_applies_per_render_not_per_batch(self):
+        pool = KaleidoRendererPool(size=1, timeout=0.2)
+        pool._new_scope = lambda: SlowScope(0.05)
+
+        images = pool.render_many([go.Figure()] * 8)
+
+        self.assertEqual(images, [b'png'] * 8)
+
+    def test_slow_render_times_out(self):
+        pool = KaleidoRendererPool(size=1, timeout=0.05)
+        pool._new_scope = lambda: SlowScope(0.3)
+
+        with self.assertRaises(PlotRenderTimeout):
+            pool.render_many([go.Figure()])
+
+
+@unittest.skipIf(PlotlyScope is None, 'kaleido is not installed')
+class TestKaleidoRendererPool(unittest.TestCase):
+    def test_render_many_keeps_order_and_times_out(self):
+        pool = KaleidoRendererPool(size=2, timeout=60)
+        pool.warm_up()
+        figures = [go.Figure(go.Scatter(y=[1, 2, 3])), go.Figure(go.Scatter(y=[3, 2, 1]))]
+
+        images = pool.render_many(figures)
+
+        self.assertEqual(len(images), 2)
+        self.assertTrue(all(image.startswith(b'\x89PNG') for image in images))
+        with self.assertRaises(PlotRenderTimeout):
+            pool.render_many(figures * 4, timeout=0.001)
+        # Killed renderers are replaced on next use
+        self.assertTrue(pool.render(figures[0]).startswith(b'\x89PNG'))
+
+
+if __name__ == '__main__':
+    unittest.main()
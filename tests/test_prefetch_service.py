@@ -0,0 +1,127 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from app.models import GeocodingResponse
+from app.services.prefetch_service import DecayingCounter, PrefetchScheduler
+from app.services.weather_cache import WeatherResponseCache
+from app.services.weather_service import WeatherService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDecayingCounter(unittest.TestCase):
+    def test_recent_requests_outrank_old_ones(self):
+        clock = FakeClock()
+        counter = DecayingCounter(half_life=60, clock=clock)
+        for _ in range(4):
+            counter.hit('moscow')
+        clock.now += 180  # три периода полураспада: 4 -> 0.5
+        counter.hit('kazan')
+
+        top = counter.top(2)
+        self.assertEqual([key for key, _ in top], ['kazan', 'moscow'])
+        self.assertAlmostEqual(top[1][1], 0.5)
+
+    def test_drops_least_popular_keys_when_full(self):
+        counter = DecayingCounter(half_life=60, max_keys=4, clock=FakeClock())
+        for key, hits in (('a', 5), ('b', 4), ('c', 3), ('d', 2), ('e', 1)):
+            for _ in range(hits):
+                counter.hit(key)
+
+        self.assertEqual(len(counter), 2)
+        self.assertEqual([key for key, _ in counter.top(5)], ['a', 'b'])
+
+
+class TestPrefetchScheduler(unittest.TestCase):
+    def test_refreshes_top_cities_within_budget(self):
+        clock = FakeClock()
+        refreshed = set()
+
+        def prefetch_city(city, lang, lead_time):
+            # Уже обновлённый город свежий и вызовов не тратит
+            if city in refreshed:
+                return 0
+            refreshed.add(city)
+            return 2
+
+        service = Mock(prefetch_city=Mock(side_effect=prefetch_city))
+        scheduler = PrefetchScheduler(
+            weather_service=service, counter=DecayingCounter(half_life=3600, clock=clock),
+            top_n=3, lead_time=90, calls_per_minute=4, clock=clock
+        )
+        scheduler.record(['Moscow', 'moscow', 'Kazan', 'Omsk'], 'en')
+        scheduler.record(['Kazan'], 'en')
+
+        self.assertEqual(scheduler.run_once(), 4)
+        service.prefetch_city.assert_any_call('Moscow', 'en', 90)
+        service.prefetch_city.assert_any_call('Kazan', 'en', 90)
+        self.assertEqual(scheduler.deferred, 1)
+
+        # Квота на текущую минуту исчерпана, Омск ждёт следующей
+        self.assertEqual(scheduler.run_once(), 0)
+        clock.now += 60
+        self.assertEqual(scheduler.run_once(), 2)
+        service.prefetch_city.assert_called_with('Omsk', 'en', 90)
+        self.assertEqual(scheduler.stats()['upstream_calls'], 6)
+
+    def test_failed_city_does_not_stop_the_round(self):
+        clock = FakeClock()
+        service = Mock(prefetch_city=Mock(side_effect=[ValueError('boom'), 1]))
+        scheduler = PrefetchScheduler(weather_service=service, calls_per_minute=10, clock=clock,
+                                      counter=DecayingCounter(half_life=3600, clock=clock))
+        scheduler.record(['A', 'A', 'B'], 'en')
+
+        self.assertEqual(scheduler.run_once(), 1)
+        self.assertEqual(scheduler.prefetched, 1)
+
+
+    def test_failed_city_still_uses_the_budget(self):
+        clock = FakeClock()
+        service = Mock(prefetch_city=Mock(side_effect=ValueError('boom')))
+        scheduler = PrefetchScheduler(weather_service=service, calls_per_minute=2, clock=clock,
+                                      counter=DecayingCounter(half_life=3600, clock=clock))
+        scheduler.record(['A', 'A', 'B'], 'en')
+
+        scheduler.run_once()
+        service.prefetch_city.assert_called_once_with('A', 'en', 120)
+        self.assertEqual(scheduler.deferred, 1)
+
+    def test_city_names_are_forgotten_with_evicted_keys(self):
+        scheduler = PrefetchScheduler(weather_service=Mock(), counter=DecayingCounter(half_life=3600, max_keys=4))
+        scheduler.record([f'City {i}' for i in range(100)], 'en')
+
+        self.assertLessEqual(len(scheduler._names), 4)
+        self.assertEqual(set(scheduler._names), {key for key, _ in scheduler.counter.top(4)})
+
+
+class TestWeatherServicePrefetch(unittest.TestCase):
+    @patch('app.services.weather_service.GeocodingService')
+    def test_refreshes_only_entries_close_to_expiry(self, mock_geocoding):
+        mock_geocoding.return_value.get_coordinates_by_city_name.return_value = GeocodingResponse(
+            name='Moscow', lat=55.75, lon=37.62, country='RU'
+        )
+        clock = FakeClock()
+        cache = WeatherResponseCache(ttls={'weather': 600, 'forecast': 10800}, clock=clock)
+        service = WeatherService(cache=cache)
+        service._fetch_weather = Mock(return_value=SimpleNamespace(dt=None))
+        service._fetch_forecast_columns = Mock(return_value='columns')
+
+        self.assertEqual(service.prefetch_city('Moscow', 'en', lead_time=120), 2)
+        self.assertEqual(service.prefetch_city('Moscow', 'en', lead_time=120), 0)
+
+        clock.now += 500  # текущей погоде осталось 100 секунд, прогнозу — почти три часа
+        self.assertEqual(service.prefetch_city('Moscow', 'en', lead_time=120), 1)
+        self.assertEqual(service._fetch_weather.call_count, 2)
+        self.assertEqual(service._fetch_forecast_columns.call_count, 1)
+        self.assertEqual(cache.fresh_for('weather', 55.75, 37.62, 'en'), 600)
+
+
+if __name__ == '__main__':
+    unittest.main()
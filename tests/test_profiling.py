@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from app import create_app
+from app.services.metrics import collect_stages, timed
+from app.services.profiling import RequestProfile
+from config import Config
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def make_client(self, **settings):
+        settings = {'PROFILING_ENABLED': True, 'PROFILING_TOKEN': None, 'PROFILING_SAMPLE_RATE': 0.0,
+                    'PROFILING_DIR': self.directory, **settings}
+        with patch.multiple(Config, **settings):
+            app = create_app()
+        app.config['TESTING'] = True
+        return app.test_client()
+
+    def test_header_writes_profile_and_summary(self):
+        response = self.make_client().get('/weather?lang=en', headers={'X-Profile': '1'})
+
+        profile_id = response.headers['X-Profile-Id']
+        self.assertTrue(os.path.exists(os.path.join(self.directory, f'{profile_id}.prof')))
+        with open(os.path.join(self.directory, f'{profile_id}.json'), encoding='utf-8') as f:
+            summary = json.load(f)
+        self.assertEqual(summary['path'], '/weather?lang=en')
+        self.assertEqual(summary['status'], 200)
+        self.assertFalse(summary['sampled'])
+        self.assertTrue(summary['top_functions'])
+
+    def test_header_is_ignored_without_the_gate(self):
+        response = self.make_client(PROFILING_ENABLED=False).get('/weather?profile=1')
+
+        self.assertNotIn('X-Profile-Id', response.headers)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_token_must_match(self):
+        client = self.make_client(PROFILING_TOKEN='secret')
+
+        self.assertNotIn('X-Profile-Id', client.get('/weather', headers={'X-Profile': '1'}).headers)
+        self.assertIn('X-Profile-Id', client.get('/weather', headers={'X-Profile': 'secret'}).headers)
+
+    def test_only_weather_page_is_profiled(self):
+        response = self.make_client(PROFILING_SAMPLE_RATE=1.0).get('/metrics', headers={'X-Profile': '1'})
+
+        self.assertNotIn('X-Profile-Id', response.headers)
+
+    def test_oldest_profiles_are_deleted(self):
+        client = self.make_client(PROFILING_MAX_FILES=2)
+        for _ in range(4):
+            client.get('/weather', headers={'X-Profile': '1'})
+
+        self.assertEqual(len([name for name in os.listdir(self.directory) if name.endswith('.json')]), 2)
+        self.assertEqual(len([name for name in os.listdir(self.directory) if name.endswith('.prof')]), 2)
+
+    def test_worker_threads_are_merged_into_the_profile(self):
+        def work():
+            with timed('worker_stage'):
+                sum(range(1000))
+
+        profile = RequestProfile()
+        profile.start()
+        worker = threading.Thread(target=profile.wrap(work))
+        worker.start()
+        worker.join()
+        duration = profile.stop()
+        with open(profile.write(self.directory, 'GET', '/weather', 200, duration), encoding='utf-8') as f:
+            summary = json.load(f)
+
+        self.assertEqual(summary['worker_threads'], 1)
+        self.assertEqual(summary['stages']['worker_stage']['calls'], 1)
+        self.assertTrue(any('work' in row['function'] for row in summary['top_functions']))
+
+    def test_sample_rate_profiles_without_asking(self):
+        response = self.make_client(PROFILING_ENABLED=False, PROFILING_SAMPLE_RATE=1.0).get('/weather')
+
+        with open(os.path.join(self.directory, f"{response.headers['X-Profile-Id']}.json"), encoding='utf-8') as f:
+            self.assertTrue(json.load(f)['sampled'])
+
+    def test_stages_are_collected_with_metrics_disabled(self):
+        with patch.object(Config, 'METRICS_ENABLED', False), collect_stages() as stages:
+            with timed('parse_weather'):
+                pass
+            with timed('parse_weather'):
+                pass
+
+        self.assertEqual(len(stages['parse_weather']), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
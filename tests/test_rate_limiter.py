@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from app.services.rate_limiter import (Priority, RateLimiter, RateLimitExceeded, TokenBucket, is_throttled,
+                                       request_priority)
+from app.services.weather_service import WeatherAPIException, WeatherService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_refills_at_rate_up_to_capacity(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=2, clock=clock)
+        bucket.take()
+        bucket.take()
+        self.assertEqual(bucket.wait_time(), 1)
+
+        clock.now += 10
+        self.assertEqual(bucket.wait_time(), 0)
+        self.assertEqual(bucket.tokens, 2)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_day_bucket_limits_after_minute_bucket_refills(self):
+        clock = FakeClock()
+        limiter = RateLimiter({'weather': (60, 2)}, max_wait=0, clock=clock)
+        limiter.acquire('weather')
+        limiter.acquire('weather')
+
+        clock.now += 60
+        with self.assertRaises(RateLimitExceeded):
+            limiter.acquire('weather')
+        self.assertEqual(limiter.stats()['rejected'], 1)
+
+    def test_unknown_endpoint_is_not_limited(self):
+        limiter = RateLimiter({'weather': (1, 0)}, max_wait=0)
+        for _ in range(5):
+            limiter.acquire('onecall')
+
+    def test_wait_queue_is_bounded(self):
+        limiter = RateLimiter({'weather': (1, 0)}, max_waiting=0)
+        with self.assertRaises(RateLimitExceeded):
+            limiter.acquire('weather')
+
+    def test_batch_calls_wait_longer_than_interactive(self):
+        # 600 вызовов в минуту: новый токен каждые 0.1 секунды
+        limiter = RateLimiter({'weather': (600, 0)}, max_wait=0, background_max_wait=5)
+        for _ in range(600):
+            limiter.acquire('weather')
+
+        with self.assertRaises(RateLimitExceeded):
+            limiter.acquire('weather')
+        limiter.acquire('weather', Priority.BATCH)
+        self.assertEqual(limiter.stats()['waited'], 1)
+
+    def test_wrapped_rate_limit_errors_are_recognized(self):
+        try:
+            try:
+                raise RateLimitExceeded("No quota")
+            except RateLimitExceeded as e:
+                raise WeatherAPIException(str(e))
+        except WeatherAPIException as e:
+            self.assertTrue(is_throttled(e))
+        self.assertFalse(is_throttled(WeatherAPIException("HTTP 500")))
+
+    def test_interactive_calls_go_before_batch(self):
+        # 600 вызовов в минуту: новый токен каждые 0.1 секунды
+        limiter = RateLimiter({'weather': (600, 0)}, max_wait=5)
+        for _ in range(600):
+            limiter.acquire('weather')
+
+        order = []
+        ready = threading.Barrier(3)
+
+        def call(name, priority):
+            ready.wait()
+            if priority == Priority.INTERACTIVE:
+                time.sleep(0.02)  # встаёт в очередь позже пакетного вызова
+            with request_priority(priority):
+                limiter.acquire('weather')
+            order.append(name)
+
+        threads = [threading.Thread(target=call, args=('batch', Priority.BATCH)),
+                   threading.Thread(target=call, args=('interactive', Priority.INTERACTIVE))]
+        for thread in threads:
+            thread.start()
+        ready.wait()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(order, ['interactive', 'batch'])
+        self.assertEqual(limiter.stats()['waiting'], 0)
+
+    def test_async_acquire_waits_for_a_token(self):
+        limiter = RateLimiter({'geo': (600, 0)}, max_wait=5)
+        for _ in range(600):
+            limiter.acquire('geo')
+
+        started = time.monotonic()
+        asyncio.run(limiter.acquire_async('geo'))
+        self.assertGreater(time.monotonic() - started, 0.05)
+        self.assertEqual(limiter.stats()['waited'], 1)
+
+
+class TestServiceThrottling(unittest.TestCase):
+    @patch('app.services.weather_service.http_get')
+    @patch('app.services.weather_service.get_rate_limiter')
+    def test_exhausted_quota_becomes_api_exception(self, mock_limiter, mock_get):
+        mock_limiter.return_value = RateLimiter({'weather': (1, 0)}, max_waiting=0)
+
+        with self.assertRaises(WeatherAPIException):
+            WeatherService()._make_request('weather', {})
+        mock_get.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
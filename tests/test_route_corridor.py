@@ -0,0 +1,104 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from app.models import GeocodingResponse, OpenWeatherResponse
+from app.services.route_corridor_service import (CorridorPoint, RouteCorridorService, great_circle_distance_km,
+                                                 plan_corridor, sample_great_circle, snap_to_grid)
+from app.services.weather_analyzer_service import WeatherSeverity
+from app.services.weather_service import WeatherAPIException
+from config import Config
+
+MOSCOW = GeocodingResponse(name='Moscow', lat=55.7504461, lon=37.6174943, country='RU')
+SAINT_PETERSBURG = GeocodingResponse(name='Saint Petersburg', lat=59.938732, lon=30.316229, country='RU')
+VLADIVOSTOK = GeocodingResponse(name='Vladivostok', lat=43.1150678, lon=131.8855768, country='RU')
+
+
+def make_weather(wind: float = 3.0) -> OpenWeatherResponse:
+    return OpenWeatherResponse(
+        main={"temp": 15.0, "feels_like": 14.0, "pressure": 1012, "humidity": 50},
+        wind={"speed": wind}
+    )
+
+
+class TestCorridorGeometry(unittest.TestCase):
+    def test_distance(self):
+        distance = great_circle_distance_km((MOSCOW.lat, MOSCOW.lon), (SAINT_PETERSBURG.lat, SAINT_PETERSBURG.lon))
+
+        self.assertAlmostEqual(distance, 634, delta=5)
+
+    def test_samples_include_both_ends_at_requested_spacing(self):
+        points = sample_great_circle((MOSCOW.lat, MOSCOW.lon), (SAINT_PETERSBURG.lat, SAINT_PETERSBURG.lon),
+                                     spacing_km=50, max_points=100)
+
+        self.assertEqual(len(points), 14)
+        self.assertAlmostEqual(points[0].lat, MOSCOW.lat)
+        self.assertAlmostEqual(points[-1].lon, SAINT_PETERSBURG.lon)
+        self.assertLessEqual(points[1].distance_km, 50)
+
+    def test_long_route_is_bounded(self):
+        points = plan_corridor(MOSCOW, VLADIVOSTOK, spacing_km=10, max_points=40)
+
+        self.assertLessEqual(len(points), 40)
+
+    def test_points_stay_within_weather_quota(self):
+        with patch.object(Config, 'RATE_LIMIT_WEATHER_PER_MINUTE', 12):
+            points = plan_corridor(MOSCOW, VLADIVOSTOK, spacing_km=10, max_points=40)
+
+        self.assertLessEqual(len(points), 10)
+
+    def test_grid_merges_nearby_points(self):
+        points = [CorridorPoint(55.71, 37.61, 0), CorridorPoint(55.74, 37.64, 3), CorridorPoint(56.1, 37.6, 40)]
+
+        snapped = snap_to_grid(points, 0.25)
+
+        self.assertEqual([(point.lat, point.lon) for point in snapped], [(55.625, 37.625), (56.125, 37.625)])
+
+
+class TestRouteCorridorService(unittest.TestCase):
+    def test_fetches_each_waypoint_once_and_analyzes_together(self):
+        geocoding_service = Mock()
+        geocoding_service.get_coordinates_by_city_name.side_effect = lambda city: {
+            'Moscow': MOSCOW, 'Saint Petersburg': SAINT_PETERSBURG
+        }[city]
+        weather_service = Mock()
+        weather_service.get_weather_by_coordinates.side_effect = (
+            lambda lat, lon, lang: make_weather(wind=16.0 if lat > 58 else 3.0)
+        )
+        service = RouteCorridorService(weather_service=weather_service, geocoding_service=geocoding_service)
+
+        corridor = service.get_corridor_weather('Moscow', 'Saint Petersburg', spacing_km=50)
+
+        coordinates = [call.args[:2] for call in weather_service.get_weather_by_coordinates.call_args_list]
+        self.assertEqual(len(coordinates), len(set(coordinates)))
+        self.assertEqual(len(coordinates), len(corridor.points))
+        self.assertEqual(corridor.analysis.severity, WeatherSeverity.EXTREME)
+        self.assertEqual(corridor.analysis.worst_window.end, len(corridor.points) - 1)
+        self.assertEqual(corridor.analysis.timeline[0], WeatherSeverity.NORMAL.value)
+
+    def test_failed_waypoint_is_left_out(self):
+        geocoding_service = Mock()
+        geocoding_service.get_coordinates_by_city_name.side_effect = lambda city: {
+            'Moscow': MOSCOW, 'Saint Petersburg': SAINT_PETERSBURG
+        }[city]
+        weather_service = Mock()
+        failed = []
+
+        def get_weather(lat, lon, lang):
+            if not failed:
+                failed.append((lat, lon))
+                raise WeatherAPIException('Rate limit exceeded')
+            return make_weather()
+
+        weather_service.get_weather_by_coordinates.side_effect = get_weather
+        service = RouteCorridorService(weather_service=weather_service, geocoding_service=geocoding_service)
+
+        with patch.object(Config, 'WEATHER_MAX_WORKERS', 1):
+            corridor = service.get_corridor_weather('Moscow', 'Saint Petersburg', spacing_km=50)
+
+        self.assertEqual(corridor.skipped, 1)
+        self.assertEqual(len(corridor.points), len(corridor.weather))
+        self.assertNotIn(failed[0], [(point.lat, point.lon) for point in corridor.points])
+
+
+if __name__ == '__main__':
+    unittest.main()
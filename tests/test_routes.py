@@ -0,0 +1,170 @@
+import json
+import time
+import unittest
+from unittest.mock import patch
+
+from app import create_app
+from app.models import OpenWeatherResponse, HourlyForecast, Main, Wind, Weather, WeatherBundle, GeocodingResponse
+
+
+def make_weather(name: str) -> OpenWeatherResponse:
+    return OpenWeatherResponse(
+        main=Main(temp=20.0, feels_like=20.0, pressure=1013, humidity=50),
+        wind=Wind(speed=5.0),
+        weather=[Weather(id=800, main='Clear', description='clear sky', icon='01d')],
+        visibility=10000,
+        dt=1605182400,
+        name=name
+    )
+
+
+def make_bundle(name: str) -> WeatherBundle:
+    return WeatherBundle(
+        location=GeocodingResponse(name=name, lat=55.75, lon=37.62, country='RU'),
+        current=make_weather(name),
+        hourly=HourlyForecast.from_payload({'cod': '200', 'list': [make_weather(name).model_dump(by_alias=True)]})
+    )
+
+
+class TestWeatherRoute(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+
+    @patch('app.routes.weather_routes.create_weather_plots', side_effect=lambda plots: [''] * len(plots))
+    @patch('app.services.weather_service.WeatherService.get_weather_bundle_by_city')
+    def test_concurrent_cities_keep_order(self, mock_bundle, mock_plots):
+        # The first city answers slowest, so completion order differs from input order
+        delays = {'Alpha': 0.2, 'Beta': 0.1, 'Gamma': 0.0}
+
+        def bundle(city, lang='en'):
+            time.sleep(delays[city])
+            return make_bundle(city)
+
+        mock_bundle.side_effect = bundle
+        self.app.config['WEATHER_MAX_WORKERS'] = 3
+
+        response = self.client.post('/weather?lang=en', json={'cities': ['Alpha', 'Beta', 'Gamma']})
+        html = response.get_data(as_text=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(html.index('Alpha'), html.index('Beta'))
+        self.assertLess(html.index('Beta'), html.index('Gamma'))
+        # All six plots of the request are rendered in a single batch
+        mock_plots.assert_called_once()
+        self.assertEqual([kind for kind, _, _ in mock_plots.call_args.args[0]], ['temp', 'wind'] * 3)
+
+    @patch('app.routes.weather_routes.create_weather_plots')
+    @patch('app.services.weather_service.WeatherService.get_weather_bundle_by_city')
+    def test_json_plot_mode_skips_rasterization(self, mock_bundle, mock_plots):
+        mock_bundle.side_effect = lambda city, lang='en': make_bundle(city)
+
+        response = self.client.post('/weather?lang=en', json={'cities': ['Alpha'], 'plot_mode': 'json'})
+        html = response.get_data(as_text=True)
+
+        self.assertEqual(response.status_code, 200)
+        mock_plots.assert_not_called()
+        self.assertIn('plotly', html)
+        self.assertIn("renderSeriesPlots('1'", html)
+        self.assertNotIn('data:image/png', html)
+
+    @patch('app.services.weather_service.WeatherService.get_weather_bundle_by_city')
+    def test_upstream_error_renders_message(self, mock_bundle):
+        mock_bundle.side_effect = ValueError('boom')
+
+        response = self.client.post('/weather?lang=en', json={'cities': ['Alpha', 'Beta']})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Unable to fetch weather data', response.get_data(as_text=True))
+
+
+
+def parse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for chunk in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in chunk.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+class TestWeatherStreamRoute(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WEATHER_MAX_WORKERS'] = 3
+        self.client = self.app.test_client()
+
+    @patch('app.routes.weather_routes.create_weather_plots', side_effect=lambda plots: [''] * len(plots))
+    @patch('app.services.weather_service.WeatherService.get_weather_bundle_by_city')
+    def test_cards_stream_in_completion_order(self, mock_bundle, mock_plots):
+        delays = {'Alpha': 0.2, 'Beta': 0.0}
+
+        def bundle(city, lang='en'):
+            time.sleep(delays[city])
+            return make_bundle(city)
+
+        mock_bundle.side_effect = bundle
+
+        response = self.client.post('/weather/stream?lang=en', json={'cities': ['Alpha', 'Beta']})
+        events = parse_events(response.get_data(as_text=True))
+
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        self.assertEqual([(event, data.get('index')) for event, data in events],
+                         [('card', 2), ('card', 1), ('done', None)])
+        self.assertIn('Weather in Beta', events[0][1]['html'])
+        self.assertIn('id="details-2"', events[0][1]['html'])
+        # Each card rasterizes its own plots so it does not wait for the others
+        self.assertEqual(mock_plots.call_count, 2)
+
+    @patch('app.services.weather_service.WeatherService.get_weather_bundle_by_city')
+    def test_failed_city_does_not_stop_stream(self, mock_bundle):
+        def bundle(city, lang='en'):
+            if city == 'Alpha':
+                raise ValueError('boom')
+            return make_bundle(city)
+
+        mock_bundle.side_effect = bundle
+
+        response = self.client.post('/weather/stream?lang=en', json={'cities': ['Alpha', 'Beta'], 'plot_mode': 'json'})
+        events = dict((data.get('index'), (event, data)) for event, data in parse_events(response.get_data(as_text=True)))
+
+        self.assertEqual(events[1][0], 'card-error')
+        self.assertEqual(events[1][1]['message'], 'Unable to fetch weather data')
+        self.assertEqual(events[2][0], 'card')
+        self.assertEqual(events[2][1]['series']['temp'], [20.0])
+
+    @patch('app.services.weather_service.WeatherService.get_weather_bundle_by_city')
+    def test_card_shows_the_geocoded_city_name(self, mock_bundle):
+        # Upstream named the centre of the cache cell after a neighbouring town
+        bundle = make_bundle('Neighbourville')
+        mock_bundle.return_value = bundle.model_copy(update={'location': GeocodingResponse(
+            name='Smalltown', local_names={'ru': 'Городок'}, lat=55.75, lon=37.62, country='RU')})
+
+        html = self.client.post('/weather?lang=ru', json={'cities': ['Smalltown'], 'plot_mode': 'json'}).get_data(as_text=True)
+
+        self.assertIn('Городок', html)
+        self.assertNotIn('Neighbourville', html)
+
+    @patch('app.services.weather_service.WeatherService.get_weather_bundle_by_city')
+    def test_stream_rejects_invalid_cities(self, mock_bundle):
+        for body in ({'cities': None}, {'cities': 'Alpha'}, {'cities': []}, {'cities': ['Alpha', '']},
+                     {'cities': [1]}, ['Alpha']):
+            with self.subTest(body=body):
+                response = self.client.post('/weather/stream?lang=en', json=body)
+                self.assertEqual(response.status_code, 400)
+        mock_bundle.assert_not_called()
+
+    @patch('app.services.weather_service.WeatherService.get_weather_bundle_by_city')
+    def test_stream_cities_are_capped(self, mock_bundle):
+        self.app.config['API_MAX_CITIES'] = 2
+
+        response = self.client.post('/weather/stream?lang=en', json={'cities': ['Alpha', 'Beta', 'Gamma']})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['error'], 'Too many cities')
+        mock_bundle.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from app.services.singleflight import SingleFlight
+from app.services.weather_cache import WeatherResponseCache
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'result'
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: flight.do('key', slow), range(8)))
+
+        self.assertEqual(results, ['result'] * 8)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.shared, 7)
+
+    def test_error_is_shared_and_not_remembered(self):
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def failing():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError('upstream failed')
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(flight.do, 'key', failing)
+            started.wait(1)
+            follower = executor.submit(flight.do, 'key', failing)
+            with self.assertRaises(ValueError):
+                leader.result()
+            with self.assertRaises(ValueError):
+                follower.result()
+
+        # The failed call is forgotten, the next one runs again
+        self.assertEqual(flight.do('key', lambda: 'retry'), 'retry')
+
+    def test_weather_cache_coalesces_misses(self):
+        cache = WeatherResponseCache(ttls={'weather': 600, 'forecast': 10800})
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return SimpleNamespace(dt=None)
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(
+                lambda _: cache.get_or_fetch('weather', 55.75, 37.62, 'en', fetch), range(6)
+            ))
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, Mock
+
+from app.models import GeocodingResponse, OpenWeatherResponse
+from app.services.weather_analyzer_service import WeatherAnalyzerService
+from app.services.weather_service import WeatherAPIException
+from telegram_bot import build_route_reply
+
+MOSCOW = GeocodingResponse(name='Moscow', lat=55.7504461, lon=37.6174943, country='RU')
+SAINT_PETERSBURG = GeocodingResponse(name='Saint Petersburg', lat=59.938732, lon=30.316229, country='RU')
+
+
+def make_weather() -> OpenWeatherResponse:
+    return OpenWeatherResponse(
+        main={"temp": 15.0, "feels_like": 14.0, "pressure": 1012, "humidity": 50},
+        wind={"speed": 3.0},
+        weather=[{"id": 800, "main": "Clear", "description": "clear sky", "icon": "01d"}]
+    )
+
+
+class TestBuildRouteReply(unittest.TestCase):
+    def setUp(self):
+        self.weather_service = Mock()
+        self.weather_service.get_weather_bundle_by_city = AsyncMock(side_effect=lambda city: Mock(
+            location=MOSCOW if city == 'Moscow' else SAINT_PETERSBURG, current=make_weather()
+        ))
+        self.weather_service.get_weather_by_coordinates = AsyncMock(return_value=make_weather())
+
+    def test_corridor_is_opt_in(self):
+        reply = asyncio.run(build_route_reply(self.weather_service, WeatherAnalyzerService(),
+                                              'Moscow', 'Saint Petersburg'))
+
+        self.assertNotIn('В пути', reply)
+        self.weather_service.get_weather_by_coordinates.assert_not_called()
+
+    def test_failed_corridor_point_is_dropped(self):
+        failed = []
+
+        def get_weather(lat, lon):
+            if not failed:
+                failed.append((lat, lon))
+                raise WeatherAPIException('Rate limit exceeded')
+            return make_weather()
+
+        self.weather_service.get_weather_by_coordinates.side_effect = get_weather
+
+        reply = asyncio.run(build_route_reply(self.weather_service, WeatherAnalyzerService(),
+                                              'Moscow', 'Saint Petersburg', corridor=True))
+
+        points = self.weather_service.get_weather_by_coordinates.await_count
+        self.assertIn(f'В пути ({points - 1} точек)', reply)
+
+
+if __name__ == '__main__':
+    unittest.main()
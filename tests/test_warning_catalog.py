@@ -0,0 +1,42 @@
+import unittest
+from unittest.mock import patch
+
+from app import create_app
+from app.services import weather_analyzer_service
+from app.services.weather_analyzer_service import WeatherAnalyzerService, WeatherSeverity, get_warning_catalog
+
+
+class TestWarningCatalog(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.analyzer = WeatherAnalyzerService()
+
+    def test_catalogs_are_per_locale(self):
+        with self.app.test_request_context('/?lang=en'):
+            english = get_warning_catalog()
+            self.assertIs(get_warning_catalog(), english)
+        with self.app.test_request_context('/?lang=ru'):
+            russian = get_warning_catalog()
+
+        self.assertEqual(english.conditions['heavy_snow'], 'Heavy snow')
+        self.assertNotEqual(russian.conditions['heavy_snow'], english.conditions['heavy_snow'])
+        with self.assertRaises(TypeError):
+            english.conditions['heavy_snow'] = ''
+
+    def test_descriptions_are_memoized(self):
+        with self.app.test_request_context('/?lang=en'):
+            first = self.analyzer._describe(WeatherSeverity.EXTREME, ['extreme_wind', 'heavy_rain'])
+            with patch('app.services.weather_analyzer_service._') as mock_gettext:
+                second = self.analyzer._describe(WeatherSeverity.EXTREME, ['extreme_wind', 'heavy_rain'])
+
+        self.assertIs(first, second)
+        mock_gettext.assert_not_called()
+        self.assertEqual(
+            first,
+            "Warning: Extreme weather conditions detected!\nDetected conditions: Dangerous wind speed, Heavy rain"
+        )
+        self.assertGreater(weather_analyzer_service._description.cache_info().hits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()